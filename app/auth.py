@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import cachetools
 import httpx
@@ -12,6 +15,8 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 
+from app.services.metrics import instrumented_transport
+
 
 @dataclass
 class AuthenticatedUser:
@@ -21,8 +26,21 @@ class AuthenticatedUser:
     claims: Dict[str, Any]
 
 
-# JWKS cache with 1-hour TTL
-_JWKS_CACHE: cachetools.TTLCache[str, Dict[str, Any]] = cachetools.TTLCache(maxsize=1, ttl=3600)
+# Seconds a fetched JWKS is served before it is refreshed in the background
+JWKS_TTL_SECONDS = int(os.getenv("AUTH_JWKS_TTL_SECONDS", "3600"))
+# The lifespan refresher fetches a new key set at this fraction of the TTL
+JWKS_REFRESH_FRACTION = 0.8
+# Fetches (unknown kids, refreshes after a failure) start at most this often
+JWKS_MIN_REFETCH_SECONDS = 30
+
+# Verified claims keyed by SHA-256 of the token, each kept until the token's
+# `exp` (capped so a key dropped from the JWKS stops being honoured soon)
+CLAIMS_CACHE_MAX_SECONDS = int(os.getenv("AUTH_CLAIMS_CACHE_MAX_SECONDS", "900"))
+_CLAIMS_CACHE: cachetools.TLRUCache = cachetools.TLRUCache(
+    maxsize=int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "4096")),
+    ttu=lambda _key, value, now: min(value[2], now + CLAIMS_CACHE_MAX_SECONDS),
+    timer=time.time,
+)
 
 # Security scheme
 security = HTTPBearer(auto_error=False)
@@ -51,20 +69,152 @@ def get_jwks_url() -> str:
     raise AuthError("GLOBAL_AUTH_JWKS_URL or CLERK_FRONTEND_API must be configured")
 
 
+class JWKSCache:
+    """
+    Clerk signing keys indexed by kid.
+
+    A refresher task (start(), run from the app lifespan) fetches a new key
+    set at JWKS_REFRESH_FRACTION of the TTL, so requests normally never see
+    it stale. A stale key set keeps being served while a single background
+    task refreshes it, and only a cold start or an unknown kid waits for the
+    network; concurrent waiters share one fetch. After any fetch, the next
+    one starts no sooner than JWKS_MIN_REFETCH_SECONDS later, so a Clerk
+    outage costs one fetch per interval rather than one per request.
+    """
+
+    def __init__(self, ttl_seconds: int = JWKS_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.jwks: Dict[str, Any] = {}
+        self.keys: Dict[str, Dict[str, Any]] = {}
+        self.fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self.fetched_at >= self.ttl_seconds
+
+    def _fetching(self) -> bool:
+        return self._inflight is not None and not self._inflight.done()
+
+    def _may_refetch(self) -> bool:
+        return time.monotonic() - self._last_attempt >= JWKS_MIN_REFETCH_SECONDS
+
+    async def _fetch(self) -> Dict[str, Any]:
+        self._last_attempt = time.monotonic()
+        async with httpx.AsyncClient(timeout=5, transport=instrumented_transport("clerk")) as client:
+            response = await client.get(get_jwks_url())
+            response.raise_for_status()
+            jwks = response.json()
+
+        keys = {k.get("kid"): k for k in jwks.get("keys", [])}
+        retired = set(self.keys) - set(keys)
+        self.jwks, self.keys = jwks, keys
+        self.fetched_at = time.monotonic()
+        if retired:
+            forget_verified_tokens(kids=retired)
+        return jwks
+
+    def refresh(self) -> asyncio.Task:
+        """Start a fetch, or join the one already running."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        return self._inflight
+
+    def _refresh_in_background(self):
+        if self._fetching() or not self._may_refetch():
+            return
+        task = self.refresh()
+
+        def _log_failure(t: asyncio.Task):
+            if not t.cancelled() and t.exception() is not None:
+                print(f"JWKS background refresh failed: {t.exception()}", flush=True)
+
+        task.add_done_callback(_log_failure)
+
+    async def get_jwks(self) -> Dict[str, Any]:
+        if not self.keys:
+            if not self._fetching() and not self._may_refetch():
+                raise AuthError("JWKS unavailable (last fetch failed)")
+            return await asyncio.shield(self.refresh())
+        if self._stale():
+            self._refresh_in_background()
+        return self.jwks
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        await self.get_jwks()
+        key = self.keys.get(kid)
+        if key is None and self._may_refetch():
+            # Possibly a newly rotated key
+            await asyncio.shield(self.refresh())
+            key = self.keys.get(kid)
+        return key
+
+    # ------------------------------------------------------------------
+    # Proactive refresh
+    # ------------------------------------------------------------------
+    def start(self):
+        """Start the refresher task on the running loop; idempotent."""
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop(), name="jwks-refresher")
+
+    async def stop(self):
+        task, self._refresher = self._refresher, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _refresh_loop(self):
+        while True:
+            # Before expiry after a success; JWKS_MIN_REFETCH_SECONDS after a failure
+            due = max(
+                self.fetched_at + self.ttl_seconds * JWKS_REFRESH_FRACTION,
+                self._last_attempt + JWKS_MIN_REFETCH_SECONDS
+            )
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await asyncio.shield(self.refresh())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"JWKS refresh failed (retrying in {JWKS_MIN_REFETCH_SECONDS}s): {e}", flush=True)
+
+
+_JWKS = JWKSCache()
+
+
+def start_jwks_refresher():
+    """Keep the Clerk key set fresh from the app lifespan (no-op when Clerk is not configured)."""
+    try:
+        get_jwks_url()
+    except AuthError:
+        return
+    _JWKS.start()
+
+
+async def stop_jwks_refresher():
+    await _JWKS.stop()
+
+
 async def _fetch_jwks() -> Dict[str, Any]:
     """Fetch JWKS from Clerk with caching."""
-    cached = _JWKS_CACHE.get("jwks")
-    if cached:
-        return cached
+    return await _JWKS.get_jwks()
 
-    jwks_url = get_jwks_url()
 
-    async with httpx.AsyncClient(timeout=5) as client:
-        response = await client.get(jwks_url)
-        response.raise_for_status()
-        jwks = response.json()
-        _JWKS_CACHE["jwks"] = jwks
-        return jwks
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def forget_verified_tokens(kids: Optional[Set[str]] = None):
+    """Drop cached verifications (all of them, or those signed by `kids`)."""
+    if kids is None:
+        _CLAIMS_CACHE.clear()
+        return
+    for cache_key, (_, kid, _) in list(_CLAIMS_CACHE.items()):
+        if kid in kids:
+            _CLAIMS_CACHE.pop(cache_key, None)
 
 
 async def verify_clerk_token(token: str) -> AuthenticatedUser:
@@ -83,17 +233,20 @@ async def verify_clerk_token(token: str) -> AuthenticatedUser:
     if not token:
         raise AuthError("Missing bearer token")
 
+    cache_key = _token_cache_key(token)
+    cached = _CLAIMS_CACHE.get(cache_key)
+    if cached is not None:
+        user = cached[0]
+        return AuthenticatedUser(user_id=user.user_id, email=user.email, claims=dict(user.claims))
+
     try:
         unverified_header = jwt.get_unverified_header(token)
     except Exception as exc:
         raise AuthError("Invalid token header") from exc
 
     # Fetch JWKS and find matching key
-    jwks = await _fetch_jwks()
-    key = next(
-        (k for k in jwks.get("keys", []) if k.get("kid") == unverified_header.get("kid")),
-        None
-    )
+    kid = unverified_header.get("kid")
+    key = await _JWKS.get_key(kid)
     if not key:
         raise AuthError("Unable to find matching JWK")
 
@@ -133,11 +286,17 @@ async def verify_clerk_token(token: str) -> AuthenticatedUser:
     if not user_id:
         raise AuthError("Token missing subject")
 
-    return AuthenticatedUser(
+    user = AuthenticatedUser(
         user_id=user_id,
         email=claims.get("email"),
         claims=claims
     )
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)) and exp > time.time():
+        _CLAIMS_CACHE[cache_key] = (
+            AuthenticatedUser(user_id=user_id, email=user.email, claims=dict(claims)), kid, exp
+        )
+    return user
 
 
 async def get_current_user(
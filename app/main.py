@@ -1,31 +1,50 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Request
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
-from app.models.schemas import RAGSearchRequest, RAGResult, RAGPhase
-from app.services.vertex_search import get_vertex_engine
+from fastapi.responses import FileResponse, PlainTextResponse, RedirectResponse, StreamingResponse
+from app.models.schemas import (
+    RAGSearchRequest, RAGResult, RAGPhase,
+    RAGBatchSearchRequest, RAGBatchSearchItem, RAGBatchSearchResponse
+)
+from app.services.vertex_search import DOCUMENT_FIELDS, get_vertex_engine, get_async_vertex_engine
 from app.services.google_docs import get_google_docs_service
-from app.services.llm_categorizer import categorize_with_llm, categorize_with_keywords, STANDARD_CATEGORIES
+from app.services.llm_categorizer import (
+    categorize_with_llm, categorize_with_keywords, categorization_stats, close_llm_categorizer, STANDARD_CATEGORIES
+)
 from app.client_id import normalize_client_id, is_canonical_client_id
 from typing import List, Optional, Dict, Any
 from pathlib import Path
 from pydantic import BaseModel
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
 import os
-import sys
 import json
 import uuid
 import shutil
-import httpx
-import io
+import zlib
 from dotenv import load_dotenv
 
 # Clerk authentication support (optional - routes can use Depends(get_current_user))
-from app.auth import AuthenticatedUser, get_current_user, get_current_user_optional
+from app.auth import (
+    AuthenticatedUser, get_current_user, get_current_user_optional, start_jwks_refresher, stop_jwks_refresher
+)
 
-# PDF and DOCX parsing
-from pypdf import PdfReader
-import docx
+# PDF and DOCX parsing (runs in a worker process pool, off the event loop)
+from app.services.extraction import ExtractionError, get_extraction_service
+from app.services.streaming_ingestion import StreamingIngestionPipeline
+from app.services.orchestrator import get_orchestrator_client
+from app.services.client_registry import ClientRegistry
+from app.services.firestore_clients import FIRESTORE_AVAILABLE, get_firestore_clients
+from app.services.pipeline_routers import LazyPipelineRouters
+from app.services.metrics import REGISTRY
+from app.services.profiling import get_request_profiler, internal_key_valid
+from app.services.cursors import InvalidCursor
+from app.services.json_response import FastJSONResponse, ndjson_line
+from app.services.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from app.services.deferred_categorization import DeferredCategorizer
+from app.services.upload_jobs import JobFailed, JobQueueFull, UploadJob, get_upload_job_manager, sse_format
+from app.services.chunking import DEFAULT_MIN_CHUNK_SIZE, DEFAULT_MAX_CHUNK_SIZE, DEFAULT_OVERLAP, iter_chunks
 
 load_dotenv()
 
@@ -35,8 +54,8 @@ ORCHESTRATOR_URL = os.getenv("ORCHESTRATOR_URL", "https://app.emailpilot.ai")
 INTERNAL_SERVICE_KEY = os.getenv("INTERNAL_SERVICE_KEY", "")
 
 # Firestore integration for shared clients
-try:
-    from google.cloud import firestore
+# (the client itself is created in app/services/firestore_clients.py)
+if FIRESTORE_AVAILABLE:
     FIRESTORE_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "emailpilot-438321")
 
     # Set up credentials if not already set
@@ -51,49 +70,72 @@ try:
             if key_path.exists():
                 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = str(key_path)
                 break
-
-    FIRESTORE_AVAILABLE = True
-except ImportError:
-    FIRESTORE_AVAILABLE = False
+else:
     FIRESTORE_PROJECT = None
 
-from app.middleware import GlobalAuthMiddleware
+from app.middleware import CompressionMiddleware, GlobalAuthMiddleware, MetricsMiddleware, ProfilingMiddleware
+
+# How often the document catalog is fully reconciled against Vertex AI
+CATALOG_RECONCILE_INTERVAL_SECONDS = int(os.getenv("CATALOG_RECONCILE_INTERVAL_SECONDS", "900"))
+# Pipeline routers are imported on first use (false = import all at startup)
+PIPELINE_LAZY_LOAD = os.getenv("PIPELINE_LAZY_LOAD", "true").lower() in ("true", "1", "yes")
+# Seconds after startup before the remaining pipelines are imported in the
+# background (negative disables the warmup)
+PIPELINE_WARMUP_DELAY_SECONDS = float(os.getenv("PIPELINE_WARMUP_DELAY_SECONDS", "1"))
+# Default for uploads that do not pass defer_categorization: write chunks with
+# the keyword category and patch in the LLM category in the background
+DEFER_CATEGORIZATION = os.getenv("DEFER_CATEGORIZATION", "false").lower() in ("true", "1", "yes")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background maintenance on startup and flush state on shutdown."""
+    import threading
+
+    # Bootstrap the catalog off the request path so the first listing is fast
+    if not engine.catalog.is_bootstrapped:
+        threading.Thread(target=engine._ensure_catalog, name="document-catalog-bootstrap", daemon=True).start()
+    stop_reconcile = engine.catalog.start_periodic_reconcile(
+        engine.reconcile_catalog, CATALOG_RECONCILE_INTERVAL_SECONDS
+    )
+    extraction_service.warm_up()
+    upload_jobs.start()
+    start_jwks_refresher()
+    await orchestrator.start()
+    if FIRESTORE_AVAILABLE:
+        firestore_clients.start()
+    warmup = None
+    if PIPELINE_LAZY_LOAD and PIPELINE_WARMUP_DELAY_SECONDS >= 0:
+        # Starts once the app is serving, so /health answers before the imports
+        warmup = asyncio.create_task(pipeline_routers.warm_up(PIPELINE_WARMUP_DELAY_SECONDS))
+    try:
+        yield
+    finally:
+        if warmup is not None:
+            warmup.cancel()
+        stop_reconcile.set()
+        await stop_jwks_refresher()
+        await upload_jobs.stop()
+        await deferred_categorizer.stop()
+        engine.catalog.persist()
+        await async_engine.close()
+        await orchestrator.close()
+        await close_llm_categorizer()
+        firestore_clients.stop()
+        extraction_service.shutdown()
 
 app = FastAPI(
     title="EmailPilot RAG Service",
-    root_path=os.getenv("FASTAPI_ROOT_PATH", "")
+    root_path=os.getenv("FASTAPI_ROOT_PATH", ""),
+    lifespan=lifespan,
+    # orjson rendering for every route, pipelines included
+    default_response_class=FastJSONResponse
 )
 
-# Add Global Auth Middleware FIRST
+# Add Global Auth Middleware FIRST (also sets the AI tracking context)
 app.add_middleware(GlobalAuthMiddleware)
 
-from app.services.ai.tracker import TrackingContext
-
-@app.middleware("http")
-async def tracking_context_middleware(request: Request, call_next):
-    """
-    Middleware to inject user/org context into the AI tracking system.
-    Runs AFTER GlobalAuthMiddleware, so request.state.user is available.
-    Also checks X-Tracking-User-Id/Org-Id headers for service-to-service calls.
-    """
-    user_id = None
-    org_id = None
-    
-    # Priority 1: Tracking headers (explicit propagation)
-    if request.headers.get("X-Tracking-User-Id"):
-        user_id = request.headers.get("X-Tracking-User-Id")
-        org_id = request.headers.get("X-Tracking-Org-Id")
-    
-    # Priority 2: Authenticated User (if not set by headers)
-    if not user_id and hasattr(request.state, "user") and request.state.user:
-        user_id = request.state.user.get("user_id") or request.state.user.get("id")
-        org_id = request.state.user.get("org_id")
-        
-    # Start tracking context for this request
-    # This sets ContextVars that LangSmith/LangChain will pick up
-    async with TrackingContext(user_id=user_id, org_id=org_id):
-        response = await call_next(request)
-        return response
+# Opt-in request profiling for internal callers (wraps auth)
+app.add_middleware(ProfilingMiddleware)
 
 # CORS middleware - custom domain URLs only
 app.add_middleware(
@@ -121,7 +163,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for JSON and text bodies (skips pre-encoded bodies and SSE)
+app.add_middleware(CompressionMiddleware)
+
+# Request metrics (outermost, so latency includes auth, CORS and compression)
+app.add_middleware(MetricsMiddleware)
+
 engine = get_vertex_engine()
+# Non-blocking engine for async routes (shares config and catalog with `engine`)
+async_engine = get_async_vertex_engine(engine)
+extraction_service = get_extraction_service()
+streaming_pipeline = StreamingIngestionPipeline(async_engine)
+# Bounded worker pool for job-mode uploads (started in lifespan)
+upload_jobs = get_upload_job_manager()
+# Background LLM passes of uploads written with a provisional keyword category
+deferred_categorizer = DeferredCategorizer(async_engine)
+# Pooled Orchestrator HTTP client (opened/closed in lifespan)
+orchestrator = get_orchestrator_client(ORCHESTRATOR_URL, INTERNAL_SERVICE_KEY)
+# Shared Firestore client + snapshot-listener mirror of `clients` (started in lifespan)
+firestore_clients = get_firestore_clients(FIRESTORE_PROJECT)
 google_docs = get_google_docs_service()
 
 # Paths
@@ -134,6 +194,9 @@ DOCUMENTS_DIR = DATA_DIR / "documents"
 DATA_DIR.mkdir(exist_ok=True)
 DOCUMENTS_DIR.mkdir(exist_ok=True)
 
+# Locally created clients, parsed once and reloaded only when the file changes
+client_registry = ClientRegistry(CLIENTS_FILE)
+
 # ============================================================================
 # MODELS
 # ============================================================================
@@ -187,16 +250,12 @@ def merge_tags(*tag_lists: List[str]) -> List[str]:
 # CLIENT STORAGE HELPERS
 # ============================================================================
 def load_clients() -> Dict[str, Any]:
-    """Load local clients from JSON file"""
-    if CLIENTS_FILE.exists():
-        with open(CLIENTS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+    """Load local clients (copy of the in-memory registry)"""
+    return client_registry.snapshot()
 
 def save_clients(clients: Dict[str, Any]):
-    """Save local clients to JSON file"""
-    with open(CLIENTS_FILE, 'w') as f:
-        json.dump(clients, f, indent=2)
+    """Save local clients to JSON file (atomic replace)"""
+    client_registry.replace_all(clients)
 
 def get_client_doc_count(client_id: str) -> int:
     """Get document count for a client from Vertex AI"""
@@ -212,30 +271,22 @@ def get_client_doc_count(client_id: str) -> int:
             return len(list(client_dir.glob("*.json")))
         return 0
 
+async def fill_document_counts(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Set "document_count" on client rows with one grouped catalog lookup."""
+    client_ids = [row["client_id"] for row in rows]
+    try:
+        counts = await async_engine.get_client_document_counts(client_ids)
+    except Exception:
+        counts = {client_id: get_client_doc_count(client_id) for client_id in client_ids}
+    for row in rows:
+        row["document_count"] = counts.get(row["client_id"], 0)
+    return rows
+
 def load_firestore_clients() -> List[Dict[str, Any]]:
     """Load clients from Firestore (shared across EmailPilot ecosystem)"""
     if not FIRESTORE_AVAILABLE:
         return []
-
-    try:
-        db = firestore.Client(project=FIRESTORE_PROJECT)
-        clients = []
-
-        for doc in db.collection('clients').stream():
-            client_data = doc.to_dict()
-            clients.append({
-                "client_id": doc.id,
-                "name": client_data.get("client_name") or client_data.get("name") or doc.id,
-                "description": client_data.get("description", ""),
-                "created_at": client_data.get("created_at", ""),
-                "industry": client_data.get("industry", ""),
-                "source": "firestore"
-            })
-
-        return clients
-    except Exception as e:
-        print(f"Firestore client load error: {e}")
-        return []
+    return firestore_clients.list_clients()
 
 # Cache for orchestrator clients (simple in-memory cache)
 _orchestrator_client_cache = {"clients": [], "timestamp": 0}
@@ -289,8 +340,7 @@ async def is_valid_client_async(client_id: str) -> bool:
         return False
 
     # Check local first (fast)
-    local_clients = load_clients()
-    if client_id in local_clients:
+    if client_id in client_registry:
         return True
 
     # Check orchestrator clients (cached)
@@ -298,11 +348,9 @@ async def is_valid_client_async(client_id: str) -> bool:
     if client_id in orchestrator_ids:
         return True
 
-    # Fallback to Firestore (slow, might fail)
-    firestore_clients = load_firestore_clients()
-    for fc in firestore_clients:
-        if fc["client_id"] == client_id:
-            return True
+    # Fallback to the in-memory Firestore mirror
+    if FIRESTORE_AVAILABLE and client_id in firestore_clients:
+        return True
 
     return False
 
@@ -312,8 +360,7 @@ def is_valid_client(client_id: str) -> bool:
     if not client_id:
         return False
     # Check local first
-    local_clients = load_clients()
-    if client_id in local_clients:
+    if client_id in client_registry:
         return True
 
     # For sync context, check if client_id looks valid (slug format)
@@ -326,19 +373,90 @@ def is_valid_client(client_id: str) -> bool:
     return False
 
 @app.post("/api/rag/search", response_model=List[RAGResult])
-def search_rag(request: RAGSearchRequest):
+async def search_rag(request: RAGSearchRequest, cache: Optional[str] = None):
+    """
+    Phase-aware search. Identical requests are served from the result cache;
+    pass `?cache=bypass` to force a fresh Vertex AI query.
+    """
     try:
-        # Now we call it synchronously (no await needed)
-        results = engine.search(request)
-        return results
+        results = await async_engine.search(request, use_cache=cache != "bypass")
+        # Already RAGResult models: serialize without re-validating
+        return FastJSONResponse(results)
     except Exception as e:
         print(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@app.post("/api/rag/search/batch", response_model=RAGBatchSearchResponse)
+async def search_rag_batch(batch: RAGBatchSearchRequest, cache: Optional[str] = None):
+    """
+    Run several searches in one round trip. Sub-requests execute concurrently
+    (bounded by max_concurrency), identical ones are deduplicated, and each
+    result carries its own latency and error so one failure never fails the batch.
+    """
+    import time
+    started = time.perf_counter()
+    outcomes = await async_engine.search_many(
+        batch.requests,
+        max_concurrency=batch.max_concurrency,
+        use_cache=cache != "bypass"
+    )
+    items = [
+        RAGBatchSearchItem(
+            index=i,
+            results=results,
+            latency_ms=latency_ms,
+            error=error,
+            deduplicated=deduplicated
+        )
+        for i, (results, error, latency_ms, deduplicated) in enumerate(outcomes)
+    ]
+    return FastJSONResponse(RAGBatchSearchResponse(
+        results=items,
+        total_latency_ms=round((time.perf_counter() - started) * 1000, 2)
+    ))
+
+@app.get("/api/rag/cache/stats")
+def search_cache_stats():
+    """Hit/miss counters for the search result cache."""
+    return engine.search_cache.stats()
+
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "vertex-rag"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of request and upstream metrics."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+def require_internal_caller(request: Request):
+    if not internal_key_valid(request.headers.get("X-Internal-Service-Key")):
+        raise HTTPException(status_code=403, detail="Profiles require a valid X-Internal-Service-Key")
+
+@app.get("/api/profiles", include_in_schema=False)
+def list_profiles(request: Request):
+    """Recent request profiles (newest first), without stacks."""
+    require_internal_caller(request)
+    return {"profiles": get_request_profiler().store.list()}
+
+@app.get("/api/profiles/{profile_id}", include_in_schema=False)
+def get_profile(profile_id: str, request: Request):
+    """Profile summary: upstream spans, per-upstream breakdown and top stacks."""
+    require_internal_caller(request)
+    profile = get_request_profiler().store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
+
+@app.get("/api/profiles/{profile_id}/collapsed", include_in_schema=False)
+def get_profile_collapsed(profile_id: str, request: Request):
+    """Collapsed stacks for flamegraph.pl / speedscope."""
+    require_internal_caller(request)
+    profile = get_request_profiler().store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.collapsed())
+
 @app.get("/auth/config")
 def auth_config():
     """
@@ -385,24 +503,7 @@ async def get_current_user_info(user: AuthenticatedUser = Depends(get_current_us
 # ============================================================================
 async def fetch_orchestrator_clients() -> List[Dict[str, Any]]:
     """Fetch clients from EmailPilot Orchestrator API using internal secure endpoint"""
-    try:
-        headers = {}
-        if INTERNAL_SERVICE_KEY:
-            headers["X-Internal-Service-Key"] = INTERNAL_SERVICE_KEY
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{ORCHESTRATOR_URL}/api/internal/clients",
-                headers=headers,
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("clients", [])
-            else:
-                print(f"Orchestrator fetch failed: {response.status_code} - {response.text[:200]}")
-    except Exception as e:
-        print(f"Orchestrator fetch error: {e}")
-    return []
+    return await orchestrator.fetch_internal_clients()
 
 def filter_active_clients(clients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Filter for active/LIVE clients only (matches calendar app pattern)"""
@@ -456,11 +557,13 @@ async def list_orchestrator_clients(request: Request, include_inactive: bool = F
             "timezone": metadata.get("timezone", ""),
             "client_voice": metadata.get("client_voice", ""),
             "client_background": metadata.get("client_background", ""),
-            "document_count": get_client_doc_count(client_id),
+            "document_count": 0,
             "is_demo": client.get("is_demo", False),
             "source": "orchestrator"
         })
 
+    await fill_document_counts(result)
+
     # Sort by name
     result.sort(key=lambda x: x.get("name", "").lower())
 
@@ -472,47 +575,46 @@ async def list_orchestrator_clients(request: Request, include_inactive: bool = F
 async def fetch_user_filtered_clients(request: Request) -> List[Dict[str, Any]]:
     """
     Fetch clients from Orchestrator's /api/clients endpoint with auth forwarding.
-    This ensures user permission filtering is applied.
+    This ensures user permission filtering is applied. Responses are cached
+    briefly per token and concurrent page loads share one upstream request.
     """
-    try:
-        headers = {}
-
-        # Forward auth header if present
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            headers["Authorization"] = auth_header
-
-        # Also forward SSO cookie if present
-        sso_cookie = request.cookies.get("emailpilot_clerk_jwt")
-        if sso_cookie and not auth_header:
-            headers["Authorization"] = f"Bearer {sso_cookie}"
-
-        # NOTE: Internal service key is intentionally NOT forwarded here.
-        # User requests must be filtered by the user's actual permissions.
-        # Adding X-Internal-Service-Key would grant super_admin access and bypass filtering.
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{ORCHESTRATOR_URL}/api/clients",  # User-filtered endpoint
-                headers=headers,
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                # Orchestrator returns a list directly
-                return data if isinstance(data, list) else data.get("clients", [])
-            else:
-                print(f"Orchestrator /api/clients fetch failed: {response.status_code} - {response.text[:200]}")
-    except Exception as e:
-        print(f"Orchestrator /api/clients fetch error: {e}")
-    return []
+    # Forward auth header if present
+    auth_header = request.headers.get("Authorization")
 
+    # Also forward SSO cookie if present
+    sso_cookie = request.cookies.get("emailpilot_clerk_jwt")
+    if sso_cookie and not auth_header:
+        auth_header = f"Bearer {sso_cookie}"
+
+    # NOTE: Internal service key is intentionally NOT forwarded here.
+    # User requests must be filtered by the user's actual permissions.
+    # Adding X-Internal-Service-Key would grant super_admin access and bypass filtering.
+    return await orchestrator.fetch_user_clients(auth_header)
+
+
+# Client lists differ per caller, so shared caches must key on credentials
+CLIENT_LIST_VARY = ("Authorization", "Cookie")
 
 @app.get("/api/clients")
 async def list_clients(request: Request):
     """
     List all clients filtered by user permissions.
 
+    The ETag is a hash of the body (the list depends on the caller's
+    orchestrator permissions), so a matching If-None-Match gets a bodyless 304.
+    """
+    result = await build_client_list(request)
+    etag = make_etag("clients", result)
+    if etag_matches(request, etag):
+        return not_modified(etag, vary=CLIENT_LIST_VARY)
+    response = FastJSONResponse(result)
+    set_cache_headers(response, etag, vary=CLIENT_LIST_VARY)
+    return response
+
+async def build_client_list(request: Request) -> Dict[str, Any]:
+    """
+    Client list for the caller.
+
     Proxies to orchestrator's /api/clients endpoint which handles:
     - Super admins see ALL clients
     - Regular users see only assigned clients + demo clients
@@ -540,10 +642,11 @@ async def list_clients(request: Request):
                 "industry": client.get("industry", ""),
                 "status": client.get("status", "LIVE"),
                 "description": client.get("description", ""),
-                "document_count": get_client_doc_count(client_id),
+                "document_count": 0,
                 "is_demo": client.get("is_demo", False),
                 "source": "orchestrator"
             })
+        await fill_document_counts(result)
         result.sort(key=lambda x: x.get("name", "").lower())
         return {"clients": result, "total": len(result)}
 
@@ -564,8 +667,7 @@ async def list_clients(request: Request):
     seen_ids = set()
 
     # First, load Firestore clients (shared across EmailPilot ecosystem)
-    firestore_clients = load_firestore_clients()
-    for client in firestore_clients:
+    for client in load_firestore_clients():
         client_id = client["client_id"]
         if client_id not in seen_ids:
             result.append({
@@ -574,7 +676,7 @@ async def list_clients(request: Request):
                 "description": client.get("description", ""),
                 "created_at": client.get("created_at", ""),
                 "industry": client.get("industry", ""),
-                "document_count": get_client_doc_count(client_id),
+                "document_count": 0,
                 "source": "firestore"
             })
             seen_ids.add(client_id)
@@ -588,11 +690,13 @@ async def list_clients(request: Request):
                 "name": client_data.get("name", client_id),
                 "description": client_data.get("description", ""),
                 "created_at": client_data.get("created_at", ""),
-                "document_count": get_client_doc_count(client_id),
+                "document_count": 0,
                 "source": "local"
             })
             seen_ids.add(client_id)
 
+    await fill_document_counts(result)
+
     # Sort by name
     result.sort(key=lambda x: x.get("name", "").lower())
 
@@ -601,8 +705,6 @@ async def list_clients(request: Request):
 @app.post("/api/clients")
 def create_client(client: ClientCreate):
     """Create a new client"""
-    clients = load_clients()
-
     # Generate client ID from name
     client_id = normalize_client_id(client.name)
     if not is_canonical_client_id(client_id):
@@ -611,15 +713,13 @@ def create_client(client: ClientCreate):
             detail="client_id must be kebab-case (lowercase letters, digits, hyphens)"
         )
 
-    if client_id in clients:
-        raise HTTPException(status_code=400, detail=f"Client '{client_id}' already exists")
-
-    clients[client_id] = {
+    client_data = {
         "name": client.name,
         "description": client.description or "",
         "created_at": datetime.utcnow().isoformat()
     }
-    save_clients(clients)
+    if not client_registry.add(client_id, client_data):
+        raise HTTPException(status_code=400, detail=f"Client '{client_id}' already exists")
 
     # Create document directory for client
     (DOCUMENTS_DIR / client_id).mkdir(exist_ok=True)
@@ -628,7 +728,7 @@ def create_client(client: ClientCreate):
         "client_id": client_id,
         "name": client.name,
         "description": client.description,
-        "created_at": clients[client_id]["created_at"],
+        "created_at": client_data["created_at"],
         "document_count": 0
     }
 
@@ -636,11 +736,10 @@ def create_client(client: ClientCreate):
 def get_client(client_id: str):
     """Get a specific client"""
     client_id = require_canonical_client_id(client_id)
-    clients = load_clients()
-    if client_id not in clients:
+    client_data = client_registry.get(client_id)
+    if client_data is None:
         raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
 
-    client_data = clients[client_id]
     return {
         "client_id": client_id,
         "name": client_data.get("name", client_id),
@@ -653,8 +752,7 @@ def get_client(client_id: str):
 def delete_client(client_id: str):
     """Delete a client and all their documents"""
     client_id = require_canonical_client_id(client_id)
-    clients = load_clients()
-    if client_id not in clients:
+    if client_id not in client_registry:
         raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
 
     # Delete client documents
@@ -663,94 +761,128 @@ def delete_client(client_id: str):
         shutil.rmtree(client_dir)
 
     # Remove from clients
-    del clients[client_id]
-    save_clients(clients)
+    client_registry.remove(client_id)
 
     return {"message": f"Client '{client_id}' deleted successfully"}
 
 # ============================================================================
-# FILE PARSING HELPERS
+# TEXT CHUNKING HELPERS
 # ============================================================================
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    """Extract text content from a PDF file."""
-    reader = PdfReader(io.BytesIO(file_bytes))
-    text_content = ""
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text_content += page_text + "\n"
-    return text_content
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    """Extract text content from a DOCX file."""
-    doc = docx.Document(io.BytesIO(file_bytes))
-    text_content = ""
-    for para in doc.paragraphs:
-        if para.text.strip():
-            text_content += para.text + "\n"
-    return text_content
-
-def extract_text_from_file(filename: str, file_bytes: bytes) -> str:
-    """Extract text from file based on extension."""
-    filename_lower = filename.lower()
-
-    if filename_lower.endswith(".pdf"):
-        return extract_text_from_pdf(file_bytes)
-    elif filename_lower.endswith(".docx"):
-        return extract_text_from_docx(file_bytes)
-    else:
-        # Plain text files (txt, md, etc.)
-        try:
-            return file_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            return file_bytes.decode('latin-1')
-
-def chunk_text(text: str, min_chunk_size: int = 100, max_chunk_size: int = 2000) -> List[str]:
+def chunk_text(
+    text: str,
+    min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE,
+    max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    content_defined: bool = False
+) -> List[str]:
     """
     Split text into chunks for better RAG retrieval.
-    Uses paragraph boundaries when possible.
+    Uses paragraph boundaries when possible, sentence boundaries for oversized
+    paragraphs (see app.services.chunking). Sourced documents use
+    content-defined boundaries so a later replace only rewrites edited chunks.
     """
-    # Split by double newlines (paragraphs)
-    paragraphs = text.split("\n\n")
-
-    chunks = []
-    current_chunk = ""
-
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-
-        # If adding this paragraph exceeds max size, save current and start new
-        if len(current_chunk) + len(para) > max_chunk_size and current_chunk:
-            if len(current_chunk) >= min_chunk_size:
-                chunks.append(current_chunk.strip())
-            current_chunk = para
-        else:
-            current_chunk += "\n\n" + para if current_chunk else para
-
-    # Don't forget the last chunk
-    if current_chunk and len(current_chunk) >= min_chunk_size:
-        chunks.append(current_chunk.strip())
-
-    # If no chunks were created (text too short), use the whole text
-    if not chunks and text.strip():
-        chunks.append(text.strip())
-
-    return chunks
+    return list(iter_chunks(text, min_chunk_size, max_chunk_size, overlap, content_defined))
 
 # ============================================================================
 # DOCUMENT MANAGEMENT ENDPOINTS
 # ============================================================================
 @app.get("/api/documents/{client_id}")
-def list_documents(client_id: str, page: int = 1, limit: int = 20):
-    """List documents for a client from Vertex AI data store"""
+async def list_documents(
+    request: Request,
+    client_id: str,
+    page: int = 1,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    List documents for a client from Vertex AI data store, ordered by title.
+
+    Pass `cursor=` (empty for the first page, then each response's
+    next_cursor) for cursor paging; `page` is kept for existing callers.
+    `fields=id,title,size` returns only those document keys. Responses carry
+    an ETag from the client's catalog version; If-None-Match gets a 304.
+    """
     client_id = require_canonical_client_id(client_id)
     if not is_valid_client(client_id):
         raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
+    if page < 1 or limit < 1:
+        raise HTTPException(status_code=400, detail="page and limit must be >= 1")
+
+    field_list = None
+    if fields:
+        field_list = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(field_list) - set(DOCUMENT_FIELDS))
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(DOCUMENT_FIELDS)}"
+            )
+
+    # Unchanged since the caller's copy: answer before doing any listing work
+    etag = make_etag(
+        "documents", client_id, engine.client_version(client_id), page, limit, cursor, field_list, weak=True
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
 
     # Fetch documents from Vertex AI
-    return engine.list_documents(client_id, page, limit)
+    try:
+        result = await async_engine.list_documents(client_id, page, limit, cursor=cursor, fields=field_list)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = FastJSONResponse(result)
+    if "error" not in result:
+        set_cache_headers(response, etag)
+    return response
+
+def gzip_stream(chunks):
+    """Gzip an async byte stream, flushing after every chunk so nothing is held back."""
+    async def compressed():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        async for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+    return compressed()
+
+@app.get("/api/documents/{client_id}/export")
+async def export_documents(client_id: str, cursor: Optional[str] = None, gzip: bool = False):
+    """
+    Stream all of a client's documents with full content as NDJSON.
+
+    One line per document: {"type": "document", "cursor": ..., "document": {...}}.
+    The stream ends with {"type": "end", "exported": N}, or with
+    {"type": "error", ...} if Vertex AI fails midway. To resume, pass the
+    cursor of the last document line received. gzip=true compresses the
+    stream (Content-Encoding: gzip).
+    """
+    client_id = require_canonical_client_id(client_id)
+    if not is_valid_client(client_id):
+        raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
+    try:
+        async_engine.export_position(client_id, cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def lines():
+        exported = 0
+        last_cursor = cursor
+        try:
+            async for document, next_cursor in async_engine.export_documents(client_id, cursor):
+                exported += 1
+                last_cursor = next_cursor
+                yield ndjson_line({"type": "document", "cursor": next_cursor, "document": document})
+        except Exception as e:
+            print(f"[Export] {client_id} failed after {exported} documents: {e}", flush=True)
+            yield ndjson_line({"type": "error", "error": str(e), "exported": exported, "cursor": last_cursor})
+            return
+        yield ndjson_line({"type": "end", "exported": exported})
+
+    if gzip:
+        return StreamingResponse(
+            gzip_stream(lines()), media_type="application/x-ndjson", headers={"Content-Encoding": "gzip"}
+        )
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 # SECURITY: Allowed file types for document upload
 ALLOWED_UPLOAD_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt", ".md", ".html", ".htm", ".json", ".csv"}
@@ -804,14 +936,132 @@ def validate_upload_file(file: UploadFile, file_bytes: bytes) -> tuple:
     return True, ""
 
 
+def replace_summary(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace-mode details from a replace_documents result."""
+    return {
+        "unchanged": results.get("documents_unchanged", 0),
+        "deleted": results.get("documents_deleted", 0),
+        "stale_document_ids": results.get("stale_document_ids")
+    }
+
+
+async def upload_document_streaming(
+    client_id: str,
+    filename: str,
+    file_bytes: bytes,
+    doc_title: str,
+    source_type: Optional[str],
+    auto_categorize: bool,
+    manual_tags: List[str],
+    replace: bool = False,
+    job: Optional[UploadJob] = None,
+    defer_categorization: bool = False
+) -> Dict[str, Any]:
+    """Streaming variant of upload_document: pages -> chunks -> writes, overlapped."""
+    categorization = {"method": "manual", "category": source_type, "confidence": 1.0, "keywords": []}
+    deferred_sample = None
+    provisional = not source_type and auto_categorize and defer_categorization
+
+    async def categorize(sample: str):
+        nonlocal deferred_sample
+        if not sample.strip():
+            raise HTTPException(status_code=400, detail="No text content could be extracted from the file")
+        if source_type:
+            return source_type, 1.0, []
+        if provisional:
+            # Provisional category now; the LLM pass runs after the stream is written
+            category, confidence = categorize_with_keywords(sample, doc_title)
+            categorization.update({"method": "keyword", "category": category, "confidence": confidence, "deferred": True})
+            deferred_sample = sample
+            return category, confidence, []
+        if auto_categorize:
+            # categorize_with_llm only reads the first few thousand characters anyway
+            category, confidence, keywords = await categorize_with_llm(sample, doc_title)
+            categorization.update({"method": "llm", "category": category, "confidence": confidence, "keywords": keywords})
+            return category, confidence, keywords
+        categorization["category"] = "general"
+        return "general", 1.0, []
+
+    async def resolve_category(sample: str):
+        if job is None:
+            return await categorize(sample)
+        job.set_stage("categorizing")
+        category, confidence, keywords = await categorize(sample)
+        # Extraction continues while chunks are written
+        job.set_stage("writing", category=category)
+        return category, confidence, keywords
+
+    if job is not None:
+        job.set_stage("extracting")
+    try:
+        summary = await streaming_pipeline.run(
+            client_id=client_id,
+            pages=extraction_service.iter_pages(filename, file_bytes),
+            title=doc_title,
+            source=filename,
+            resolve_category=resolve_category,
+            tags=manual_tags,
+            replace=replace,
+            progress=job.update if job is not None else None,
+            provisional=provisional
+        )
+    except ExtractionError as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
+
+    if not summary["document_ids"]:
+        errors = "; ".join(f"{doc_id}: {msg}" for doc_id, msg in summary["errors"].items())
+        raise HTTPException(status_code=500, detail=f"Failed to upload: {errors or 'No documents created'}")
+    if deferred_sample is not None:
+        # Chunk text is no longer held; the pass reads it back from Vertex AI.
+        # Chunks a replace kept were not written under the provisional category.
+        deferred_categorizer.schedule(
+            client_id, summary["written_document_ids"], doc_title, deferred_sample, summary["category"], manual_tags
+        )
+
+    errors = [f"{doc_id}: {msg}" for doc_id, msg in summary["errors"].items()]
+    response = {
+        "message": f"Document streamed to Vertex AI ({len(summary['document_ids'])} chunks from {summary['pages']} pages)",
+        "document": {
+            "id": summary["document_ids"][0],
+            "client_id": client_id,
+            "title": doc_title,
+            "source_type": summary["category"],
+            "tags": summary["tags"],
+            "size": summary["size"],
+            "source": "vertex_ai"
+        },
+        "chunks_created": len(summary["document_ids"]) - summary.get("unchanged", 0),
+        "errors": errors or None,
+        "streaming": {
+            "pages": summary["pages"],
+            "parts": summary["chunks"],
+            "batches": summary["batches"],
+            "first_write_ms": summary["first_write_ms"],
+            "total_ms": summary["total_ms"]
+        },
+        "categorization": categorization
+    }
+    if replace:
+        response["replace"] = {
+            "unchanged": summary["unchanged"],
+            "deleted": summary["deleted"],
+            "stale_document_ids": summary["stale_document_ids"]
+        }
+    return response
+
 @app.post("/api/documents/{client_id}/upload")
 async def upload_document(
     client_id: str,
+    request: Request,
     file: UploadFile = File(...),
     title: Optional[str] = Form(None),
     source_type: Optional[str] = Form(None),
     auto_categorize: bool = Form(True),  # NEW: Auto-categorize by default
-    tags: Optional[str] = Form("")
+    tags: Optional[str] = Form(""),
+    stream: bool = Form(False),
+    replace: bool = Form(False),
+    job: bool = Form(False),
+    defer_categorization: Optional[bool] = Form(None)
 ):
     """
     Upload a document for a client to Vertex AI (supports PDF, DOCX, and text files).
@@ -819,6 +1069,25 @@ async def upload_document(
     If auto_categorize=True and source_type is not provided, uses LLM to automatically
     determine the most appropriate category based on content analysis.
 
+    If stream=True, the file is extracted page by page and chunks are written as
+    they are produced (see StreamingIngestionPipeline) instead of after the whole
+    document has been parsed.
+
+    If replace=True, the upload replaces the previously uploaded version with
+    the same filename: only new or changed chunks are written and chunks that
+    are no longer present are deleted.
+
+    If job=True, the file is validated and queued and the response is 202 with a
+    job ID; extraction, categorization and the writes run in the upload job
+    pool. Progress is served by /api/jobs/{job_id} and, as server-sent events,
+    by /api/jobs/{job_id}/events.
+
+    If defer_categorization=True (default: DEFER_CATEGORIZATION), chunks are
+    written under the keyword-matched category without waiting for the LLM;
+    a background pass then patches the LLM category and keyword tags onto them.
+    With replace=True as well, unchanged chunks keep their stored category and
+    tags; only new chunks are written provisionally and patched.
+
     SECURITY: File type and size validation enforced.
     """
     client_id = require_canonical_client_id(client_id)
@@ -834,28 +1103,95 @@ async def upload_document(
     if not is_valid:
         raise HTTPException(status_code=400, detail=f"File validation failed: {error_msg}")
 
-    # Extract text based on file type
+    ingest = upload_document_streaming if stream else ingest_upload
+    upload_args = {
+        "client_id": client_id,
+        "filename": filename,
+        "file_bytes": file_bytes,
+        "doc_title": title or filename,
+        "source_type": source_type,
+        "auto_categorize": auto_categorize,
+        "manual_tags": parse_tags(tags),
+        "replace": replace,
+        "defer_categorization": DEFER_CATEGORIZATION if defer_categorization is None else defer_categorization
+    }
+    if not job:
+        return await ingest(**upload_args)
+
+    async def run(upload_job: UploadJob) -> Dict[str, Any]:
+        try:
+            return await ingest(**upload_args, job=upload_job)
+        except HTTPException as e:
+            raise JobFailed(str(e.detail), e.status_code)
+
     try:
-        text_content = extract_text_from_file(filename, file_bytes)
-    except Exception as e:
+        upload_job = upload_jobs.submit(client_id, filename, title or filename, run)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Upload queue is full: {e}", headers={"Retry-After": "30"})
+    status_url = f"{request.scope.get('root_path', '')}/api/jobs/{upload_job.id}"
+    return FastJSONResponse(
+        {
+            "message": "Upload accepted; poll status_url or follow events_url for progress",
+            "job_id": upload_job.id,
+            "status": upload_job.stage,
+            "status_url": status_url,
+            "events_url": f"{status_url}/events"
+        },
+        status_code=202,
+        headers={"Location": status_url}
+    )
+
+async def ingest_upload(
+    client_id: str,
+    filename: str,
+    file_bytes: bytes,
+    doc_title: str,
+    source_type: Optional[str],
+    auto_categorize: bool,
+    manual_tags: List[str],
+    replace: bool = False,
+    job: Optional[UploadJob] = None,
+    defer_categorization: bool = False
+) -> Dict[str, Any]:
+    """
+    Extract, chunk, categorize and write one uploaded file (the non-streaming
+    upload path). With `job`, stage changes and write progress are recorded
+    on it. With `defer_categorization`, chunks are written under the keyword
+    category and the LLM category is patched in afterwards (DeferredCategorizer).
+    """
+    # Extract text based on file type (in the extraction worker pool)
+    if job is not None:
+        job.set_stage("extracting")
+    try:
+        text_content = await extraction_service.extract(filename, file_bytes)
+    except ExtractionError as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
 
     if not text_content.strip():
         raise HTTPException(status_code=400, detail="No text content could be extracted from the file")
 
     # Chunk the text for better RAG retrieval
-    chunks = chunk_text(text_content)
-    doc_title = title or filename
+    # Off the event loop: a large document takes a noticeable fraction of a second
+    chunks = await asyncio.to_thread(chunk_text, text_content, content_defined=True)
+    if job is not None:
+        job.update(characters=len(text_content), chunks=len(chunks))
 
     # Determine category - use LLM if auto_categorize and no source_type provided
     category = source_type
     categorization_method = "manual"
     categorization_confidence = 1.0
     generated_keywords = []
-    manual_tags = parse_tags(tags)
-
-    if not category and auto_categorize:
+    deferred = False
+
+    if not category and auto_categorize and defer_categorization:
+        # Provisional keyword category; the LLM pass runs after the write
+        category, categorization_confidence = categorize_with_keywords(text_content, doc_title)
+        categorization_method = "keyword"
+        deferred = True
+    elif not category and auto_categorize:
         # Use LLM to auto-categorize based on content and generate keywords
+        if job is not None:
+            job.set_stage("categorizing")
         category, categorization_confidence, generated_keywords = await categorize_with_llm(text_content, doc_title)
         categorization_method = "llm"
     elif not category:
@@ -863,72 +1199,65 @@ async def upload_document(
 
     combined_tags = merge_tags(manual_tags, generated_keywords)
 
-    # Upload chunks to Vertex AI
-    if len(chunks) == 1:
-        # Single chunk - upload as one document
-        result = engine.create_document(
-            client_id=client_id,
-            content=chunks[0],
-            title=doc_title,
-            category=category,
-            source=filename,
-            tags=combined_tags
+    # Upload chunks to Vertex AI through the bulk ingestion path
+    progress = None
+    if job is not None:
+        job.set_stage("writing", category=category, chunks_written=0, chunks_total=len(chunks))
+        # chunks_total drops to the number of distinct (or, with replace, changed) chunks
+        progress = lambda written, total: job.update(chunks_written=written, chunks_total=total)
+    ingest_kwargs = dict(
+        client_id=client_id,
+        chunks=chunks,
+        title=doc_title,
+        category=category,  # Use the determined category (manual, LLM, or default)
+        source=filename,
+        tags=combined_tags,
+        progress=progress
+    )
+    if replace:
+        # A provisional category is only written to new chunks; unchanged ones keep theirs
+        results = await async_engine.replace_documents(
+            **ingest_kwargs, generated_tags=generated_keywords, provisional=deferred
         )
-        if not result.get("success"):
-            raise HTTPException(status_code=500, detail=f"Failed to upload: {result.get('error')}")
-
-        return {
-            "message": "Document uploaded to Vertex AI successfully",
-            "document": {
-                "id": result.get("document_id"),
-                "client_id": client_id,
-                "title": result.get("title"),
-                "source_type": result.get("category"),
-                "tags": combined_tags,
-                "size": result.get("size"),
-                "source": "vertex_ai"
-            },
-            "chunks_created": 1,
-            "categorization": {
-                "method": categorization_method,
-                "category": category,
-                "confidence": categorization_confidence,
-                "keywords": generated_keywords
-            }
-        }
     else:
-        # Multiple chunks - upload each as separate document
-        results = engine.import_documents(
-            client_id=client_id,
-            chunks=chunks,
-            title=doc_title,
-            category=category,  # Use the determined category (manual, LLM, or default)
-            source=filename,
-            tags=combined_tags
+        results = await async_engine.import_documents(**ingest_kwargs)
+
+    if not results.get("success"):
+        raise HTTPException(status_code=500, detail=f"Failed to upload: {results.get('error')}")
+    if deferred:
+        deferred_ids = results.get("written_document_ids", results["document_ids"])
+        contents = {engine.document_id_for(client_id, chunk, filename): chunk for chunk in chunks}
+        deferred_categorizer.schedule(
+            client_id, deferred_ids, doc_title, text_content, category, manual_tags,
+            contents={doc_id: contents[doc_id] for doc_id in deferred_ids if doc_id in contents}
         )
 
-        if not results.get("success"):
-            raise HTTPException(status_code=500, detail=f"Failed to upload: {results.get('error')}")
-
-        return {
-            "message": f"Document chunked and uploaded to Vertex AI ({results.get('documents_created')} chunks)",
-            "document": {
-                "id": results.get("document_ids", [""])[0],
-                "client_id": client_id,
-                "title": doc_title,
-                "source_type": category,
-                "tags": combined_tags,
-                "size": sum(len(c) for c in chunks),
-                "source": "vertex_ai"
-            },
-            "chunks_created": results.get("documents_created", len(chunks)),
-            "categorization": {
-                "method": categorization_method,
-                "category": category,
-                "confidence": categorization_confidence,
-                "keywords": generated_keywords
-            }
+    chunks_created = results.get("documents_created", len(chunks))
+    response = {
+        "message": "Document uploaded to Vertex AI successfully" if len(chunks) == 1
+                   else f"Document chunked and uploaded to Vertex AI ({chunks_created} chunks)",
+        "document": {
+            "id": results.get("document_ids", [""])[0],
+            "client_id": client_id,
+            "title": doc_title,
+            "source_type": category,
+            "tags": combined_tags,
+            "size": sum(len(c) for c in chunks),
+            "source": "vertex_ai"
+        },
+        "chunks_created": chunks_created,
+        "errors": results.get("errors"),
+        "categorization": {
+            "method": categorization_method,
+            "category": category,
+            "confidence": categorization_confidence,
+            "keywords": generated_keywords,
+            "deferred": deferred
         }
+    }
+    if replace:
+        response["replace"] = replace_summary(results)
+    return response
 
 @app.post("/api/documents/{client_id}/text")
 async def upload_text(
@@ -937,13 +1266,15 @@ async def upload_text(
     title: Optional[str] = Form("Text Document"),
     source_type: Optional[str] = Form(None),
     auto_categorize: bool = Form(True),  # NEW: Auto-categorize by default
-    tags: Optional[str] = Form("")
+    tags: Optional[str] = Form(""),
+    defer_categorization: Optional[bool] = Form(None)
 ):
     """
     Upload text content directly to Vertex AI.
 
     If auto_categorize=True and source_type is not provided, uses LLM to automatically
-    determine the most appropriate category based on content analysis.
+    determine the most appropriate category based on content analysis
+    (in the background after the write with defer_categorization=True).
     """
     client_id = require_canonical_client_id(client_id)
     if not is_valid_client(client_id):
@@ -955,8 +1286,16 @@ async def upload_text(
     categorization_confidence = 1.0
     generated_keywords = []
     manual_tags = parse_tags(tags)
-
-    if not category and auto_categorize:
+    if defer_categorization is None:
+        defer_categorization = DEFER_CATEGORIZATION
+    deferred = False
+
+    if not category and auto_categorize and defer_categorization:
+        # Provisional keyword category; the LLM pass runs after the write
+        category, categorization_confidence = categorize_with_keywords(content, title)
+        categorization_method = "keyword"
+        deferred = True
+    elif not category and auto_categorize:
         # Use LLM to auto-categorize based on content and generate keywords
         category, categorization_confidence, generated_keywords = await categorize_with_llm(content, title)
         categorization_method = "llm"
@@ -966,7 +1305,7 @@ async def upload_text(
     combined_tags = merge_tags(manual_tags, generated_keywords)
 
     # Upload to Vertex AI
-    result = engine.create_document(
+    result = await async_engine.create_document(
         client_id=client_id,
         content=content,
         title=title or "Text Document",
@@ -977,6 +1316,11 @@ async def upload_text(
 
     if not result.get("success"):
         raise HTTPException(status_code=500, detail=f"Failed to upload: {result.get('error')}")
+    if deferred:
+        deferred_categorizer.schedule(
+            client_id, [result["document_id"]], result.get("title"), content, category, manual_tags,
+            contents={result["document_id"]: content}
+        )
 
     return {
         "message": "Text uploaded to Vertex AI successfully",
@@ -993,29 +1337,30 @@ async def upload_text(
             "method": categorization_method,
             "category": category,
             "confidence": categorization_confidence,
-            "keywords": generated_keywords
+            "keywords": generated_keywords,
+            "deferred": deferred
         }
     }
 
 @app.get("/api/documents/{client_id}/{doc_id}")
-def get_document(client_id: str, doc_id: str):
+async def get_document(client_id: str, doc_id: str):
     """Get a specific document from Vertex AI with full content"""
     client_id = require_canonical_client_id(client_id)
     if not is_valid_client(client_id):
         raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
 
-    result = engine.get_document(doc_id)
+    result = await async_engine.get_document(doc_id)
 
     if not result.get("success"):
         raise HTTPException(status_code=404, detail=result.get("error", "Document not found"))
 
-    return result.get("document")
+    return FastJSONResponse(result.get("document"))
 
 @app.delete("/api/documents/{client_id}/{doc_id}")
-def delete_document(client_id: str, doc_id: str):
+async def delete_document(client_id: str, doc_id: str):
     """Delete a document from Vertex AI"""
     client_id = require_canonical_client_id(client_id)
-    result = engine.delete_document(doc_id)
+    result = await async_engine.delete_document(doc_id, client_id=client_id)
 
     if not result.get("success"):
         raise HTTPException(status_code=500, detail=f"Failed to delete: {result.get('error')}")
@@ -1023,6 +1368,57 @@ def delete_document(client_id: str, doc_id: str):
     return {"message": "Document deleted from Vertex AI successfully"}
 
 
+@app.post("/api/catalog/reconcile")
+def reconcile_catalog():
+    """Force a full reconcile of the document catalog against Vertex AI."""
+    try:
+        result = engine.reconcile_catalog()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Catalog reconcile failed: {str(e)}")
+    return {"message": "Document catalog reconciled", **result}
+
+@app.get("/api/jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """Stage, progress counters and (once finished) result or error of an upload job."""
+    upload_job = upload_jobs.get(job_id)
+    if upload_job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return upload_job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def upload_job_events(job_id: str, request: Request, after: int = 0):
+    """
+    Server-sent events for an upload job: every stage change and progress
+    update, replayed from the start (or after Last-Event-ID / `after`) and
+    followed until the job succeeds or fails.
+    """
+    upload_job = upload_jobs.get(job_id)
+    if upload_job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def events():
+        async for event in upload_job.follow(after):
+            # None is a heartbeat: an SSE comment keeps proxies from closing the stream
+            yield sse_format(event) if event is not None else ": keepalive\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/extraction/stats")
+def extraction_stats():
+    """Queue depth and per-format latency of the document extraction pool."""
+    return extraction_service.stats()
+
+@app.get("/api/categorization/stats")
+def get_categorization_stats():
+    """Cache hit rate, batching and token usage of LLM categorization, plus deferred passes."""
+    return {**categorization_stats(), "deferred": deferred_categorizer.stats()}
+
 @app.get("/api/categories")
 def list_categories():
     """
@@ -1046,14 +1442,21 @@ def list_categories():
     }
 
 @app.get("/api/stats/{client_id}")
-def get_client_stats(client_id: str):
-    """Get statistics for a client from Vertex AI"""
+async def get_client_stats(client_id: str, request: Request, response: Response):
+    """Get statistics for a client from Vertex AI (ETag / 304 like the listing)"""
     client_id = require_canonical_client_id(client_id)
     if not is_valid_client(client_id):
         raise HTTPException(status_code=404, detail=f"Client '{client_id}' not found")
 
+    etag = make_etag("stats", client_id, engine.client_version(client_id), weak=True)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     # Fetch stats from Vertex AI
-    return engine.get_client_stats(client_id)
+    stats = await async_engine.get_client_stats(client_id)
+    if "error" not in stats:
+        set_cache_headers(response, etag)
+    return stats
 
 # ============================================================================
 # GOOGLE DOCS OAUTH ENDPOINTS
@@ -1111,6 +1514,7 @@ class GoogleDocImport(BaseModel):
     client_id: str
     source_type: Optional[str] = "general"
     title: Optional[str] = None
+    replace: bool = False  # Replace the previous import of this doc, writing only changed chunks
 
 @app.post("/api/google/import")
 async def import_google_doc(request: GoogleDocImport):
@@ -1135,55 +1539,38 @@ async def import_google_doc(request: GoogleDocImport):
         raise HTTPException(status_code=400, detail="Document is empty or could not extract text")
 
     # Chunk the content
-    chunks = chunk_text(content)
-
-    # Upload to Vertex AI
-    if len(chunks) == 1:
-        result = engine.create_document(
-            client_id=client_id,
-            content=chunks[0],
-            title=doc_title,
-            category=request.source_type or "general",
-            source=f"google_doc:{doc_result.get('doc_id')}"
-        )
-        if not result.get("success"):
-            raise HTTPException(status_code=500, detail=f"Failed to upload: {result.get('error')}")
+    chunks = await asyncio.to_thread(chunk_text, content, content_defined=True)
 
-        return {
-            "message": "Google Doc imported successfully",
-            "document": {
-                "id": result.get("document_id"),
-                "client_id": client_id,
-                "title": doc_title,
-                "source_type": request.source_type,
-                "word_count": doc_result.get("word_count"),
-                "source": "google_docs"
-            },
-            "chunks_created": 1
-        }
-    else:
-        results = engine.import_documents(
-            client_id=client_id,
-            chunks=chunks,
-            title=doc_title,
-            category=request.source_type or "general",
-            source=f"google_doc:{doc_result.get('doc_id')}"
-        )
-        if not results.get("success"):
-            raise HTTPException(status_code=500, detail=f"Failed to upload: {results.get('error')}")
+    # Upload to Vertex AI through the bulk ingestion path
+    ingest = async_engine.replace_documents if request.replace else async_engine.import_documents
+    results = await ingest(
+        client_id=client_id,
+        chunks=chunks,
+        title=doc_title,
+        category=request.source_type or "general",
+        source=f"google_doc:{doc_result.get('doc_id')}"
+    )
+    if not results.get("success"):
+        raise HTTPException(status_code=500, detail=f"Failed to upload: {results.get('error')}")
 
-        return {
-            "message": f"Google Doc imported ({results.get('documents_created')} chunks)",
-            "document": {
-                "id": results.get("document_ids", [""])[0],
-                "client_id": client_id,
-                "title": doc_title,
-                "source_type": request.source_type,
-                "word_count": doc_result.get("word_count"),
-                "source": "google_docs"
-            },
-            "chunks_created": results.get("documents_created", len(chunks))
-        }
+    chunks_created = results.get("documents_created", len(chunks))
+    response = {
+        "message": "Google Doc imported successfully" if len(chunks) == 1
+                   else f"Google Doc imported ({chunks_created} chunks)",
+        "document": {
+            "id": results.get("document_ids", [""])[0],
+            "client_id": client_id,
+            "title": doc_title,
+            "source_type": request.source_type,
+            "word_count": doc_result.get("word_count"),
+            "source": "google_docs"
+        },
+        "chunks_created": chunks_created,
+        "errors": results.get("errors")
+    }
+    if request.replace:
+        response["replace"] = replace_summary(results)
+    return response
 
 # UI Routes
 @app.get("/")
@@ -1201,158 +1588,22 @@ if UI_DIR.exists():
     app.mount("/ui", StaticFiles(directory=UI_DIR, html=True), name="ui")
 
 # ============================================================================
-# FIGMA FEEDBACK PIPELINE ROUTES
+# PIPELINE ROUTES
 # ============================================================================
-try:
-    import importlib.util
-    figma_feedback_path = Path(__file__).parent.parent / "pipelines" / "figma-comments"
-    figma_feedback_routes_file = figma_feedback_path / "api" / "routes.py"
-
-    if str(figma_feedback_path) not in sys.path:
-        sys.path.insert(0, str(figma_feedback_path))
-
-    spec = importlib.util.spec_from_file_location("figma_feedback_routes", figma_feedback_routes_file)
-    figma_feedback_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(figma_feedback_module)
-
-    app.include_router(figma_feedback_module.router)
-    print("✅ Figma Feedback routes loaded")
-except ImportError as e:
-    print(f"⚠️ Figma Feedback routes not loaded: {e}")
-except Exception as e:
-    print(f"⚠️ Figma Feedback routes error: {e}")
-
-# ============================================================================
-# IMAGE REPOSITORY PIPELINE ROUTES
-# ============================================================================
-# Import and include image repository routes (lazy loading to avoid startup errors)
-try:
-    import sys
-    import importlib.util
-    # Load image-repository routes using importlib to avoid module caching issues
-    pipelines_path = Path(__file__).parent.parent / "pipelines" / "image-repository"
-    image_routes_file = pipelines_path / "api" / "routes.py"
-
-    if pipelines_path not in sys.path:
-        sys.path.insert(0, str(pipelines_path))
-
-    spec = importlib.util.spec_from_file_location("image_repository_routes", image_routes_file)
-    image_routes_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(image_routes_module)
-
-    app.include_router(image_routes_module.router)
-    print("✅ Image Repository routes loaded")
-except ImportError as e:
-    print(f"⚠️ Image Repository routes not loaded: {e}")
-except Exception as e:
-    print(f"⚠️ Image Repository routes error: {e}")
-
-# ============================================================================
-# FIGMA EMAIL REVIEW PIPELINE ROUTES
-# ============================================================================
-# Import and include Figma email review routes using importlib to avoid module caching
-try:
-    figma_review_path = Path(__file__).parent.parent / "pipelines" / "figma-email-review"
-    figma_review_routes_file = figma_review_path / "api" / "routes.py"
-
-    if str(figma_review_path) not in sys.path:
-        sys.path.insert(0, str(figma_review_path))
-
-    spec = importlib.util.spec_from_file_location("figma_review_routes", figma_review_routes_file)
-    figma_review_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(figma_review_module)
-
-    app.include_router(figma_review_module.router)
-    print("✅ Figma Email Review routes loaded")
-except ImportError as e:
-    print(f"⚠️ Figma Email Review routes not loaded: {e}")
-except Exception as e:
-    print(f"⚠️ Figma Email Review routes error: {e}")
-
-# ============================================================================
-# EMAIL REPOSITORY PIPELINE ROUTES
-# ============================================================================
-# Import and include Email Repository routes using importlib to avoid module caching
-try:
-    email_repo_path = Path(__file__).parent.parent / "pipelines" / "email-repository"
-    email_repo_routes_file = email_repo_path / "api" / "routes.py"
-
-    if str(email_repo_path) not in sys.path:
-        sys.path.insert(0, str(email_repo_path))
-
-    spec = importlib.util.spec_from_file_location("email_repo_routes", email_repo_routes_file)
-    email_repo_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(email_repo_module)
-
-    app.include_router(email_repo_module.router)
-    print("✅ Email Repository routes loaded")
-except ImportError as e:
-    print(f"⚠️ Email Repository routes not loaded: {e}")
-except Exception as e:
-    print(f"⚠️ Email Repository routes error: {e}")
-
-# ============================================================================
-# MEETING INGESTION PIPELINE ROUTES
-# ============================================================================
-try:
-    import importlib.util
-
-    # Ensure RAG root is on path so 'app.*' imports work from submodules
-    rag_root = str(Path(__file__).parent.parent)
-    if rag_root not in sys.path:
-        sys.path.insert(0, rag_root)
-
-    meeting_ingestion_path = Path(__file__).parent.parent / "pipelines" / "meeting-ingestion"
-    if str(meeting_ingestion_path) not in sys.path:
-        sys.path.insert(0, str(meeting_ingestion_path))
-
-    # Use importlib to avoid module cache conflicts with other api/routes.py files
-    routes_file = meeting_ingestion_path / "api" / "routes.py"
-    spec = importlib.util.spec_from_file_location("meeting_ingestion_routes", routes_file)
-    meeting_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(meeting_module)
-
-    app.include_router(meeting_module.router)
-    print("✅ Meeting Ingestion routes loaded")
-except ImportError as e:
-    print(f"⚠️ Meeting Ingestion routes not loaded: {e}")
-    import traceback
-    traceback.print_exc()
-except Exception as e:
-    print(f"⚠️ Meeting Ingestion routes error: {e}")
-    import traceback
-    traceback.print_exc()
-
-# ============================================================================
-# INTELLIGENCE GRADING PIPELINE ROUTES
-# ============================================================================
-try:
-    import importlib.util
-
-    intelligence_grading_path = Path(__file__).parent.parent / "pipelines" / "intelligence-grading"
-    routes_file = intelligence_grading_path / "api" / "routes.py"
-
-    if routes_file.exists():
-        # Add pipeline to path
-        if str(intelligence_grading_path) not in sys.path:
-            sys.path.insert(0, str(intelligence_grading_path))
-
-        spec = importlib.util.spec_from_file_location("intelligence_grading_routes", routes_file)
-        grading_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(grading_module)
-
-        app.include_router(grading_module.router)
-        print("✅ Intelligence Grading routes loaded")
-    else:
-        print(f"⚠️ Intelligence Grading routes file not found at {routes_file}")
-except ImportError as e:
-    print(f"⚠️ Intelligence Grading routes not loaded: {e}")
-    import traceback
-    traceback.print_exc()
-except Exception as e:
-    print(f"⚠️ Intelligence Grading routes error: {e}")
-    import traceback
-    traceback.print_exc()
+# Figma Feedback, Image Repository, Figma Email Review, Email Repository,
+# Meeting Ingestion and Intelligence Grading. Each prefix is a stub that
+# imports the real router on first use; the lifespan warms the rest up in the
+# background (see app/services/pipeline_routers.py).
+pipeline_routers = LazyPipelineRouters(app)
+if PIPELINE_LAZY_LOAD:
+    pipeline_routers.register()
+else:
+    pipeline_routers.load_all_now()
+
+@app.get("/api/pipelines/status")
+def pipelines_status():
+    """Load state and import-time profile of each pipeline router."""
+    return pipeline_routers.report()
 
 # =============================================================================
 # Clerk Webhook Endpoint (signature verified internally via Svix)
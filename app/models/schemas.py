@@ -111,3 +111,44 @@ class HealthResponse(BaseModel):
     service: str = "rag-microservice"
     vertex_connected: bool = False
     data_store_id: Optional[str] = None
+
+
+class RAGBatchSearchRequest(BaseModel):
+    """
+    Several search requests executed concurrently in one HTTP round trip.
+    Identical sub-requests are only sent to Vertex AI once.
+    """
+    requests: List[RAGSearchRequest] = Field(..., min_length=1, max_length=50)
+    max_concurrency: int = Field(
+        default=8, ge=1, le=32,
+        description="Maximum number of Vertex AI searches in flight at once"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"query": "brand voice tone", "client_id": "rogue-creamery", "phase": "STRATEGY", "k": 5},
+                    {"query": "hero products", "client_id": "rogue-creamery", "phase": "BRIEF", "k": 5}
+                ],
+                "max_concurrency": 8
+            }
+        }
+
+
+class RAGBatchSearchItem(BaseModel):
+    """Outcome of one sub-request in a batch, in request order."""
+    index: int
+    results: List[RAGResult] = Field(default_factory=list)
+    latency_ms: float = 0.0
+    error: Optional[str] = None
+    deduplicated: bool = Field(
+        default=False,
+        description="True if this result was shared with an identical earlier sub-request"
+    )
+
+
+class RAGBatchSearchResponse(BaseModel):
+    """Batch search response; `results[i]` answers `requests[i]`."""
+    results: List[RAGBatchSearchItem] = Field(default_factory=list)
+    total_latency_ms: float = 0.0
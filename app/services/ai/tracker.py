@@ -57,27 +57,27 @@ class TrackingContext:
         current = _tracking_context.get()
         new_context = {**current, **self.metadata}
         self.token = _tracking_context.set(new_context)
-        
-        # Also set LangChain environment variables for legacy/implicit support
-        if "user_id" in self.metadata:
-            os.environ["LANGCHAIN_METADATA_USER_ID"] = self.metadata["user_id"]
-        if "org_id" in self.metadata:
-            os.environ["LANGCHAIN_METADATA_ORG_ID"] = self.metadata["org_id"]
-            
+        # Metadata lives only in the ContextVar: os.environ is process-global,
+        # so writing it per request raced between concurrent requests
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.token:
             _tracking_context.reset(self.token)
-            
-        # Clean up env vars (best effort)
-        os.environ.pop("LANGCHAIN_METADATA_USER_ID", None)
-        os.environ.pop("LANGCHAIN_METADATA_ORG_ID", None)
 
 def get_current_tracking_context() -> Dict[str, Any]:
     """Retrieve the current tracking metadata."""
     return _tracking_context.get()
 
+def detached_tracking_context(metadata: Dict[str, Any]) -> contextvars.Context:
+    """
+    A fresh contextvars.Context holding only `metadata` as tracking metadata,
+    for work done on behalf of a request outside that request's own task.
+    """
+    context = contextvars.Context()
+    context.run(_tracking_context.set, dict(metadata))
+    return context
+
 
 # --- 2. Client Instrumentation ---
 
@@ -107,8 +107,8 @@ class LLMTracker:
             # Ensure context metadata is injected on every call
             # Note: wrap_anthropic doesn't automatically pull from ContextVars for metadata
             # in older versions, but the 'tracing_context' feature in 0.1+ helps.
-            # We rely on the environment variables set by TrackingContext for implicit
-            # metadata in some cases, or we can patch the create method.
+            # Metadata is available from get_current_tracking_context() if the
+            # create method needs patching.
             
             wrapped = wrap_anthropic(client)
             return wrapped
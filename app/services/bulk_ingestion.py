@@ -0,0 +1,254 @@
+"""
+Bulk document ingestion for the Vertex AI data store.
+
+Large uploads are written with inline ImportDocuments batches (INCREMENTAL
+reconciliation, i.e. upsert) instead of one CreateDocument RPC per chunk.
+Each batch is a long-running operation that is tracked to completion; if a
+batch reports failures it is replayed per document so every error can be
+attributed to a document ID. Small batches skip the LRO overhead and are
+upserted directly with bounded concurrency.
+
+Deletes mirror the same policy: PurgeDocuments with an inline list of
+document names for large sets, concurrent DeleteDocument calls otherwise.
+Inline purge needs google-cloud-discoveryengine >= 0.12.2; on older client
+libraries every delete goes through DeleteDocument, because a purge without
+the inline names would match the whole data store.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.api_core import exceptions as google_exceptions
+from google.cloud import discoveryengine_v1 as discoveryengine
+
+# Discovery Engine accepts at most 100 documents per inline import request
+INLINE_IMPORT_MAX_DOCUMENTS = 100
+# Recommended maximum number of names per inline purge request
+INLINE_PURGE_MAX_DOCUMENTS = 100
+
+
+def inline_purge_supported() -> bool:
+    """True if the installed client library can scope a purge to inline document names."""
+    request_type = discoveryengine.PurgeDocumentsRequest
+    return hasattr(request_type, "InlineSource") and "inline_source" in request_type.meta.fields
+
+
+class BulkIngestionEngine:
+    """Writes and deletes many documents using ImportDocuments / PurgeDocuments."""
+
+    def __init__(
+        self,
+        doc_client: discoveryengine.DocumentServiceClient,
+        branch_path: str,
+        small_batch_threshold: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        operation_timeout_seconds: Optional[float] = None
+    ):
+        self.doc_client = doc_client
+        self.branch_path = branch_path
+        self.small_batch_threshold = small_batch_threshold or int(os.getenv("BULK_INGEST_SMALL_BATCH", "5"))
+        self.max_concurrency = max_concurrency or int(os.getenv("BULK_INGEST_MAX_CONCURRENCY", "8"))
+        self.operation_timeout_seconds = operation_timeout_seconds or float(
+            os.getenv("BULK_INGEST_OPERATION_TIMEOUT", "600")
+        )
+        self.inline_purge = inline_purge_supported()
+        if not self.inline_purge:
+            print(
+                "[BulkIngestion] PurgeDocumentsRequest.InlineSource not available in this "
+                "google-cloud-discoveryengine version; deletes use DeleteDocument per ID",
+                flush=True
+            )
+
+    def ingest(
+        self,
+        documents: List[discoveryengine.Document],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upsert documents and report the outcome per document. `progress`, if
+        given, is called with (documents processed, total) after each batch.
+
+        Returns:
+            {"succeeded": [doc_id, ...], "errors": {doc_id: message}, "operations": [...]}
+        """
+        if len(documents) <= self.small_batch_threshold:
+            succeeded, errors = self._upsert_concurrently(documents)
+            if progress is not None:
+                progress(len(documents), len(documents))
+            return {"succeeded": succeeded, "errors": errors, "operations": []}
+
+        succeeded: List[str] = []
+        errors: Dict[str, str] = {}
+        operations: List[Dict[str, Any]] = []
+        for start in range(0, len(documents), INLINE_IMPORT_MAX_DOCUMENTS):
+            batch = documents[start:start + INLINE_IMPORT_MAX_DOCUMENTS]
+            batch_ok, batch_errors, operation = self._import_batch(batch)
+            succeeded.extend(batch_ok)
+            errors.update(batch_errors)
+            operations.append(operation)
+            if progress is not None:
+                progress(start + len(batch), len(documents))
+        return {"succeeded": succeeded, "errors": errors, "operations": operations}
+
+    def _import_batch(
+        self,
+        batch: List[discoveryengine.Document]
+    ) -> Tuple[List[str], Dict[str, str], Dict[str, Any]]:
+        request = discoveryengine.ImportDocumentsRequest(
+            parent=self.branch_path,
+            inline_source=discoveryengine.ImportDocumentsRequest.InlineSource(documents=batch),
+            reconciliation_mode=discoveryengine.ImportDocumentsRequest.ReconciliationMode.INCREMENTAL,
+        )
+        started = time.time()
+        operation_info: Dict[str, Any] = {"documents": len(batch)}
+        try:
+            operation = self.doc_client.import_documents(request=request)
+            operation_info["name"] = operation.operation.name
+            print(f"[BulkIngestion] Import operation started: {operation_info['name']} ({len(batch)} documents)", flush=True)
+            response = operation.result(timeout=self.operation_timeout_seconds)
+
+            metadata = operation.metadata
+            failure_count = getattr(metadata, "failure_count", 0) if metadata else 0
+            operation_info.update({
+                "success_count": getattr(metadata, "success_count", len(batch)) if metadata else len(batch),
+                "failure_count": failure_count,
+                "error_samples": [sample.message for sample in response.error_samples],
+                "duration_seconds": round(time.time() - started, 2),
+            })
+        except Exception as e:
+            print(f"[BulkIngestion] Import operation failed: {e}", flush=True)
+            operation_info.update({"error": str(e), "duration_seconds": round(time.time() - started, 2)})
+            failure_count = len(batch)
+
+        if not failure_count:
+            return [doc.id for doc in batch], {}, operation_info
+
+        # Import errors are only sampled; replay the batch per document (idempotent
+        # upserts) so each failure can be attributed to a specific document ID.
+        succeeded, errors = self._upsert_concurrently(batch)
+        return succeeded, errors, operation_info
+
+    def _upsert_one(self, document: discoveryengine.Document) -> Optional[str]:
+        try:
+            document.name = f"{self.branch_path}/documents/{document.id}"
+            request = discoveryengine.UpdateDocumentRequest(document=document, allow_missing=True)
+            self.doc_client.update_document(request=request)
+            return None
+        except Exception as e:
+            return str(e)
+
+    def _upsert_concurrently(
+        self,
+        documents: List[discoveryengine.Document]
+    ) -> Tuple[List[str], Dict[str, str]]:
+        if not documents:
+            return [], {}
+        workers = min(self.max_concurrency, len(documents))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-ingest") as pool:
+            outcomes = list(pool.map(self._upsert_one, documents))
+
+        succeeded: List[str] = []
+        errors: Dict[str, str] = {}
+        for document, error in zip(documents, outcomes):
+            if error:
+                errors[document.id] = error
+                print(f"[BulkIngestion] Error writing document {document.id}: {error}", flush=True)
+            else:
+                succeeded.append(document.id)
+        return succeeded, errors
+
+    # ------------------------------------------------------------------
+    # Deletes
+    # ------------------------------------------------------------------
+    def delete(self, doc_ids: List[str]) -> Dict[str, Any]:
+        """
+        Delete documents by ID and report the outcome per document.
+        Documents that no longer exist count as deleted.
+
+        Returns:
+            {"deleted": [doc_id, ...], "errors": {doc_id: message}, "operations": [...]}
+        """
+        if len(doc_ids) <= self.small_batch_threshold or not self.inline_purge:
+            deleted, errors = self._delete_concurrently(doc_ids)
+            return {"deleted": deleted, "errors": errors, "operations": []}
+
+        deleted: List[str] = []
+        errors: Dict[str, str] = {}
+        operations: List[Dict[str, Any]] = []
+        for start in range(0, len(doc_ids), INLINE_PURGE_MAX_DOCUMENTS):
+            batch = doc_ids[start:start + INLINE_PURGE_MAX_DOCUMENTS]
+            batch_ok, batch_errors, operation = self._purge_batch(batch)
+            deleted.extend(batch_ok)
+            errors.update(batch_errors)
+            operations.append(operation)
+        return {"deleted": deleted, "errors": errors, "operations": operations}
+
+    def _purge_batch(self, batch: List[str]) -> Tuple[List[str], Dict[str, str], Dict[str, Any]]:
+        # filter="*" is required by the API and is scoped to the inline names;
+        # never send a purge with an empty name list.
+        if not batch:
+            return [], {}, {"documents": 0}
+        started = time.time()
+        operation_info: Dict[str, Any] = {"documents": len(batch)}
+        try:
+            names = [f"{self.branch_path}/documents/{doc_id}" for doc_id in batch]
+            request = discoveryengine.PurgeDocumentsRequest(
+                parent=self.branch_path,
+                inline_source=discoveryengine.PurgeDocumentsRequest.InlineSource(documents=names),
+                filter="*",
+                force=True,
+            )
+            if list(request.inline_source.documents) != names:
+                raise ValueError("purge request lost its inline document names")
+            operation = self.doc_client.purge_documents(request=request)
+            operation_info["name"] = operation.operation.name
+            print(f"[BulkIngestion] Purge operation started: {operation_info['name']} ({len(batch)} documents)", flush=True)
+            response = operation.result(timeout=self.operation_timeout_seconds)
+
+            metadata = operation.metadata
+            failure_count = getattr(metadata, "failure_count", 0) if metadata else 0
+            operation_info.update({
+                "purge_count": response.purge_count,
+                "failure_count": failure_count,
+                "duration_seconds": round(time.time() - started, 2),
+            })
+        except Exception as e:
+            print(f"[BulkIngestion] Purge operation failed: {e}", flush=True)
+            operation_info.update({"error": str(e), "duration_seconds": round(time.time() - started, 2)})
+            failure_count = len(batch)
+
+        if not failure_count:
+            return list(batch), {}, operation_info
+
+        # Replay per document so each failure can be attributed
+        deleted, errors = self._delete_concurrently(batch)
+        return deleted, errors, operation_info
+
+    def _delete_one(self, doc_id: str) -> Optional[str]:
+        try:
+            request = discoveryengine.DeleteDocumentRequest(name=f"{self.branch_path}/documents/{doc_id}")
+            self.doc_client.delete_document(request=request)
+            return None
+        except google_exceptions.NotFound:
+            return None
+        except Exception as e:
+            return str(e)
+
+    def _delete_concurrently(self, doc_ids: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        if not doc_ids:
+            return [], {}
+        workers = min(self.max_concurrency, len(doc_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-delete") as pool:
+            outcomes = list(pool.map(self._delete_one, doc_ids))
+
+        deleted: List[str] = []
+        errors: Dict[str, str] = {}
+        for doc_id, error in zip(doc_ids, outcomes):
+            if error:
+                errors[doc_id] = error
+                print(f"[BulkIngestion] Error deleting document {doc_id}: {error}", flush=True)
+            else:
+                deleted.append(doc_id)
+        return deleted, errors
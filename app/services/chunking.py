@@ -0,0 +1,310 @@
+"""
+Text chunking for RAG ingestion.
+
+Chunks are built from paragraphs (split on blank lines) packed greedily up to
+`max_chunk_size` characters. Paragraphs longer than that are split at
+sentence boundaries (and sentences longer than that at whitespace), so no
+chunk is ever an unbounded wall of text. Buffers are lists joined once per
+chunk, every character is scanned a constant number of times, and chunks are
+yielded lazily - chunking runs in linear time and can be fed incrementally
+(e.g. one PDF page at a time) without holding the whole document.
+
+With `content_defined=True` a chunk also ends after any segment whose hash
+falls under a length-proportional threshold, so boundaries depend only on
+nearby text: an edit moves the chunks around it and the rest of the document
+chunks exactly as before (see VertexContextEngine.replace_documents).
+
+Nothing is dropped: a fragment shorter than `min_chunk_size` is carried into
+the next chunk (which may then exceed `max_chunk_size` by less than
+`min_chunk_size`), and a short final fragment is merged into the last chunk
+when it fits or kept as a chunk of its own.
+"""
+
+import os
+import re
+import zlib
+from typing import Iterator, List, Optional
+
+DEFAULT_MIN_CHUNK_SIZE = 100
+DEFAULT_MAX_CHUNK_SIZE = 2000
+DEFAULT_OVERLAP = int(os.getenv("CHUNK_OVERLAP_CHARS", "0"))
+# Average chunk size aimed for by content-defined boundaries
+DEFAULT_TARGET_CHUNK_SIZE = 1500
+
+PARAGRAPH_BREAK = "\n\n"
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text after sentence-ending punctuation."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start:match.start()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def hard_split(text: str, max_size: int) -> List[str]:
+    """Split text into pieces of at most max_size, preferring whitespace."""
+    pieces = []
+    text = text.strip()
+    start = 0
+    while len(text) - start > max_size:
+        end = start + max_size
+        cut = text.rfind(" ", start + 1, end + 1)
+        if cut <= start:
+            cut = end
+        pieces.append(text[start:cut].rstrip())
+        start = _skip_whitespace(text, cut)
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _skip_whitespace(text: str, start: int) -> int:
+    """Index of the first non-whitespace character at or after `start`."""
+    while start < len(text) and text[start].isspace():
+        start += 1
+    return start
+
+
+class IncrementalChunker:
+    """
+    Linear-time chunker fed incrementally.
+
+    Call feed() with successive pieces of text and finish() once at the end;
+    both return the chunks completed so far. The last completed chunk is held
+    back until the next one starts so a short trailing fragment can be merged
+    into it instead of being dropped.
+    """
+
+    def __init__(
+        self,
+        min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE,
+        max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+        overlap: int = DEFAULT_OVERLAP,
+        content_defined: bool = False,
+        target_chunk_size: int = DEFAULT_TARGET_CHUNK_SIZE
+    ):
+        if overlap < 0 or overlap >= max_chunk_size // 2:
+            raise ValueError("overlap must be >= 0 and less than half of max_chunk_size")
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.overlap = overlap
+        self.content_defined = content_defined
+        self.target_chunk_size = target_chunk_size
+
+        # Text of the paragraph currently being received
+        self._pending: List[str] = []
+        self._pending_len = 0
+        self._pending_ends_newline = False
+        # True once the current paragraph is known to be oversized and is
+        # being emitted sentence by sentence
+        self._sentence_mode = False
+
+        # Chunk under construction
+        self._parts: List[str] = []
+        self._len = 0
+        self._only_overlap = False
+
+        self._held: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def feed(self, text: str) -> List[str]:
+        """Add text; return any chunks completed by it."""
+        return list(self._feed(text))
+
+    def finish(self) -> List[str]:
+        """Flush the remaining text; call once after the last feed()."""
+        return list(self._finish())
+
+    def iter_feed(self, text: str) -> Iterator[str]:
+        """Lazy variant of feed()."""
+        return self._feed(text)
+
+    def iter_finish(self) -> Iterator[str]:
+        """Lazy variant of finish()."""
+        return self._finish()
+
+    # ------------------------------------------------------------------
+    # Paragraph assembly
+    # ------------------------------------------------------------------
+    def _feed(self, text: str) -> Iterator[str]:
+        if not text:
+            return
+        start = 0
+        # A paragraph break may straddle the previous piece and this one
+        if self._pending_ends_newline and text[0] == "\n":
+            yield from self._close_paragraph()
+            start = 1
+
+        while True:
+            idx = text.find(PARAGRAPH_BREAK, start)
+            if idx == -1:
+                break
+            self._append_pending(text[start:idx])
+            yield from self._close_paragraph()
+            start = idx + len(PARAGRAPH_BREAK)
+
+        rest = text[start:]
+        if rest:
+            self._append_pending(rest)
+            self._pending_ends_newline = rest[-1] == "\n"
+            if self._pending_len > self.max_chunk_size:
+                yield from self._drain_oversized_pending()
+        else:
+            self._pending_ends_newline = False
+
+    def _append_pending(self, piece: str):
+        if piece:
+            self._pending.append(piece)
+            self._pending_len += len(piece)
+
+    def _close_paragraph(self) -> Iterator[str]:
+        paragraph = "".join(self._pending).strip()
+        self._pending, self._pending_len = [], 0
+        self._pending_ends_newline = False
+        sentence_mode, self._sentence_mode = self._sentence_mode, False
+        if not paragraph:
+            return
+        if sentence_mode or len(paragraph) > self.max_chunk_size:
+            yield from self._add_sentences(split_sentences(paragraph), first_is_continuation=sentence_mode)
+        else:
+            yield from self._add_segment(paragraph, PARAGRAPH_BREAK)
+
+    def _drain_oversized_pending(self) -> Iterator[str]:
+        """
+        The open paragraph is already longer than a chunk: emit its complete
+        sentences now so memory stays bounded while it is still being fed.
+        """
+        text = "".join(self._pending).lstrip()
+        if not self._sentence_mode:
+            if len(text.rstrip()) <= self.max_chunk_size:
+                # Only surrounding whitespace made it look oversized
+                self._pending, self._pending_len = [text], len(text)
+                return
+        # The text after the last sentence boundary may still be incomplete;
+        # keep it pending (with trailing whitespace, the next piece may
+        # continue a word)
+        sentences = []
+        last_end = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            sentence = text[last_end:match.start()].strip()
+            if sentence:
+                sentences.append(sentence)
+            last_end = match.end()
+        # Same cuts hard_split() would make once the sentence is complete.
+        # Cuts advance an index into `text` rather than re-slicing the rest,
+        # so a long unpunctuated run (CSV rows, logs) stays linear.
+        start = _skip_whitespace(text, last_end)
+        while len(text) - start > self.max_chunk_size:
+            end = start + self.max_chunk_size
+            cut = text.rfind(" ", start + 1, end + 1)
+            if cut <= start:
+                cut = end
+            sentences.append(text[start:cut].rstrip())
+            start = _skip_whitespace(text, cut)
+        tail = text[start:]
+        continuation = self._sentence_mode
+        self._sentence_mode = True
+        self._pending = [tail] if tail else []
+        self._pending_len = len(tail)
+        yield from self._add_sentences(sentences, first_is_continuation=continuation)
+
+    # ------------------------------------------------------------------
+    # Packing
+    # ------------------------------------------------------------------
+    def _add_sentences(self, sentences: List[str], first_is_continuation: bool) -> Iterator[str]:
+        for i, sentence in enumerate(sentences):
+            # Sentences of one paragraph are joined with spaces; the first
+            # sentence of a new paragraph starts after a paragraph break
+            separator = " " if (i > 0 or first_is_continuation) else PARAGRAPH_BREAK
+            if len(sentence) > self.max_chunk_size:
+                for j, piece in enumerate(hard_split(sentence, self.max_chunk_size)):
+                    yield from self._add_segment(piece, separator if j == 0 else " ")
+            else:
+                yield from self._add_segment(sentence, separator)
+
+    def _add_segment(self, segment: str, separator: str) -> Iterator[str]:
+        if self._parts and not self._only_overlap and not self._fits(separator, segment):
+            if self._len >= self.min_chunk_size:
+                yield from self._emit_current()
+            # else: carry the short fragment forward rather than dropping it
+        if self._only_overlap and not self._fits(separator, segment):
+            # Overlap never pushes a chunk past max size; drop it instead
+            self._parts, self._len, self._only_overlap = [], 0, False
+
+        if self._parts:
+            self._parts.append(separator)
+            self._len += len(separator)
+        self._parts.append(segment)
+        self._len += len(segment)
+        self._only_overlap = False
+
+        if self.content_defined and self._len >= self.min_chunk_size and self._is_boundary(segment):
+            yield from self._emit_current()
+
+    def _is_boundary(self, segment: str) -> bool:
+        """Content-defined cut point: P(cut) ~ len(segment) / target_chunk_size."""
+        return zlib.crc32(segment.encode("utf-8")) % self.target_chunk_size < len(segment)
+
+    def _fits(self, separator: str, segment: str) -> bool:
+        return self._len + len(separator) + len(segment) <= self.max_chunk_size
+
+    def _emit_current(self) -> Iterator[str]:
+        chunk = "".join(self._parts).strip()
+        self._parts, self._len, self._only_overlap = [], 0, False
+        if not chunk:
+            return
+        if self._held is not None:
+            yield self._held
+        self._held = chunk
+
+        if self.overlap:
+            tail = chunk[-self.overlap:]
+            # Start the overlap at a word boundary
+            space = tail.find(" ")
+            if 0 <= space < len(tail) - 1 and len(chunk) > self.overlap:
+                tail = tail[space + 1:]
+            self._parts, self._len, self._only_overlap = [tail], len(tail), True
+
+    def _finish(self) -> Iterator[str]:
+        yield from self._close_paragraph()
+        if self._only_overlap:
+            self._parts, self._len, self._only_overlap = [], 0, False
+
+        last = "".join(self._parts).strip()
+        self._parts, self._len = [], 0
+        if (
+            last and self._held is not None and len(last) < self.min_chunk_size
+            and len(self._held) + len(PARAGRAPH_BREAK) + len(last) <= self.max_chunk_size
+        ):
+            # Merge a short trailing fragment into the previous chunk
+            self._held = self._held + PARAGRAPH_BREAK + last
+            last = ""
+        if self._held is not None:
+            yield self._held
+            self._held = None
+        if last:
+            yield last
+
+
+def iter_chunks(
+    text: str,
+    min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE,
+    max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+    overlap: int = DEFAULT_OVERLAP,
+    content_defined: bool = False
+) -> Iterator[str]:
+    """Lazily yield chunks of `text`."""
+    chunker = IncrementalChunker(min_chunk_size, max_chunk_size, overlap, content_defined)
+    yield from chunker.iter_feed(text)
+    yield from chunker.iter_finish()
@@ -0,0 +1,144 @@
+"""
+In-memory registry of locally created clients (data/clients.json).
+
+The parsed map is kept in memory and only re-read when the file's mtime or
+size changes, so membership checks on the upload/list paths cost one stat()
+instead of a read and JSON parse. Writes are read-modify-write under a lock
+(a thread lock plus an advisory file lock where fcntl is available, so
+several workers sharing the file do not lose each other's updates) and land
+atomically via a temp file and rename.
+"""
+
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class ClientRegistry:
+    """Thread-safe view of clients.json with mtime-based reload and atomic writes."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock_path = self.path.with_suffix(self.path.suffix + ".lock")
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self, force: bool = False):
+        """Re-read the file if it changed since the last load."""
+        signature = self._file_signature()
+        with self._lock:
+            if not force and signature == self._signature:
+                return
+            if signature is None:
+                self._clients, self._signature = {}, None
+                return
+            try:
+                with open(self.path, "r") as f:
+                    self._clients = json.load(f)
+                self._signature = signature
+            except (OSError, ValueError) as e:
+                # Keep serving the last good copy until the file changes again
+                self._signature = signature
+                print(f"[ClientRegistry] Failed to load {self.path}: {e}", flush=True)
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+    def __contains__(self, client_id: str) -> bool:
+        self._refresh()
+        return client_id in self._clients
+
+    def get(self, client_id: str) -> Optional[Dict[str, Any]]:
+        self._refresh()
+        with self._lock:
+            data = self._clients.get(client_id)
+            return dict(data) if data is not None else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copy of the whole map, safe for callers to mutate."""
+        self._refresh()
+        with self._lock:
+            return {client_id: dict(data) for client_id, data in self._clients.items()}
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write(self, clients: Dict[str, Dict[str, Any]]):
+        """Atomically replace the file (temp file in the same directory + rename)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(clients, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._clients = clients
+        self._signature = self._file_signature()
+
+    def add(self, client_id: str, data: Dict[str, Any]) -> bool:
+        """Add a client. Returns False if it already exists."""
+        with self._write_lock():
+            self._refresh(force=True)
+            if client_id in self._clients:
+                return False
+            clients = dict(self._clients)
+            clients[client_id] = dict(data)
+            self._write(clients)
+            return True
+
+    def remove(self, client_id: str) -> bool:
+        """Remove a client. Returns False if it did not exist."""
+        with self._write_lock():
+            self._refresh(force=True)
+            if client_id not in self._clients:
+                return False
+            clients = dict(self._clients)
+            del clients[client_id]
+            self._write(clients)
+            return True
+
+    def replace_all(self, clients: Dict[str, Dict[str, Any]]):
+        """Overwrite the whole map."""
+        with self._write_lock():
+            self._write({client_id: dict(data) for client_id, data in clients.items()})
@@ -0,0 +1,32 @@
+"""
+Opaque pagination/resume cursors.
+
+A cursor is a small JSON object encoded as unpadded URL-safe base64, so API
+callers treat it as an opaque token and the server can change what it holds
+without breaking clients that only echo it back.
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded or belongs to another listing."""
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str) -> Dict[str, Any]:
+    """Decode a cursor produced by encode_cursor and check its `k` (kind) field."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if not isinstance(state, dict) or state.get("k") != kind:
+        raise InvalidCursor("Cursor does not belong to this listing")
+    return state
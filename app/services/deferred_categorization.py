@@ -0,0 +1,140 @@
+"""
+Deferred LLM categorization.
+
+With deferred categorization an upload writes its chunks straight away under
+the keyword-matched category (categorize_with_keywords), so the response
+waits only on extraction and the writes, not on the model. The LLM pass is
+scheduled here and runs in the background: once Claude has answered, the
+document's chunks are re-upserted in one bulk write with the final category
+and keyword tags (VertexContextEngine.recategorize_documents). Chunks that
+were deleted or re-categorized by a later write in the meantime are left
+alone.
+
+DEFERRED_CATEGORIZATION_CONCURRENCY (default 4) passes run at a time. At
+shutdown, pending passes get DEFERRED_CATEGORIZATION_DRAIN_SECONDS (default
+10) to finish; a pass that is lost leaves the keyword category in place until
+the document is uploaded again.
+
+Passes run after the upload's response has been sent, so deferred mode needs
+CPU allocated outside requests: on Cloud Run --no-cpu-throttling and
+min-instances >= 1 (the opt-in background-work substitutions in
+cloudbuild.yaml). With request-based CPU the passes stall, and an instance
+scaled to zero drops them.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.llm_categorizer import categorize_with_llm
+
+
+class DeferredCategorizer:
+    """Runs the background LLM categorization passes of deferred uploads."""
+
+    def __init__(self, async_engine, concurrency: Optional[int] = None, drain_seconds: Optional[float] = None):
+        self.async_engine = async_engine
+        self.concurrency = concurrency or int(os.getenv("DEFERRED_CATEGORIZATION_CONCURRENCY", "4"))
+        self.drain_seconds = drain_seconds if drain_seconds is not None else float(
+            os.getenv("DEFERRED_CATEGORIZATION_DRAIN_SECONDS", "10")
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.completed = 0
+        self.failed = 0
+        self.recategorized = 0
+        self.documents_updated = 0
+        self.total_seconds = 0.0
+
+    def schedule(
+        self,
+        client_id: str,
+        doc_ids: List[str],
+        title: str,
+        sample: str,
+        provisional_category: str,
+        manual_tags: Optional[List[str]] = None,
+        contents: Optional[Dict[str, str]] = None
+    ):
+        """
+        Categorize `sample` with the LLM in the background and patch the result
+        onto `doc_ids` (written under `provisional_category`). `contents` maps
+        doc IDs to chunk text when the caller still holds it; chunks without
+        it are read back from Vertex AI.
+        """
+        if not doc_ids:
+            return
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        task = asyncio.create_task(self._run(
+            client_id, list(doc_ids), title, sample, provisional_category, list(manual_tags or []), contents
+        ))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self,
+        client_id: str,
+        doc_ids: List[str],
+        title: str,
+        sample: str,
+        provisional_category: str,
+        manual_tags: List[str],
+        contents: Optional[Dict[str, str]]
+    ):
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                category, _, keywords = await categorize_with_llm(sample, title)
+                result = await self.async_engine.recategorize_documents(
+                    client_id=client_id,
+                    doc_ids=doc_ids,
+                    category=category,
+                    tags=manual_tags + list(keywords or []),
+                    expected_category=provisional_category,
+                    contents=contents
+                )
+            except Exception as e:
+                self.failed += 1
+                print(f"[DeferredCategorization] {client_id} '{title}' failed: {e}", flush=True)
+                return
+            finally:
+                self.total_seconds += time.perf_counter() - started
+
+            if not result.get("success"):
+                self.failed += 1
+                print(f"[DeferredCategorization] {client_id} '{title}' patch failed: "
+                      f"{result.get('error') or result.get('errors')}", flush=True)
+            else:
+                self.completed += 1
+                if category != provisional_category:
+                    self.recategorized += 1
+            updated = result.get("documents_updated", 0)
+            self.documents_updated += updated
+            print(f"[DeferredCategorization] {client_id} '{title}': {provisional_category} -> {category}, "
+                  f"{updated} chunks updated, {result.get('documents_skipped', 0)} skipped", flush=True)
+
+    async def stop(self):
+        """Give pending passes drain_seconds to finish, then cancel the rest."""
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=self.drain_seconds)
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"[DeferredCategorization] Cancelled {len(pending)} pending passes at shutdown", flush=True)
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        finished = self.completed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "pending": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+            "recategorized": self.recategorized,
+            "documents_updated": self.documents_updated,
+            "avg_seconds": round(self.total_seconds / finished, 3) if finished else 0.0,
+        }
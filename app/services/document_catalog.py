@@ -0,0 +1,369 @@
+"""
+Per-client document catalog for the Vertex AI data store.
+
+Discovery Engine has no server-side filter for ListDocuments, so answering
+"which documents belong to client X" used to require a scan of the entire
+data store. The catalog keeps a client_id -> {doc_id: entry} map in memory,
+persists it to a local JSON file, and is updated by every write path in
+VertexContextEngine. A periodic full reconcile against Discovery Engine
+corrects any drift (writes from other services, failed persists, etc.).
+
+A reconcile scan takes a while on a large data store, and local writes keep
+landing meanwhile. Every local change made after begin_reconcile() is
+journaled (with a sequence number) and replayed on top of the scan result in
+replace_all(), so a write or delete made during the scan is never lost.
+
+The catalog is per instance. On Cloud Run a write handled by another instance
+only shows up here at the next reconcile, so listings, counts and stats can
+lag other instances' writes. Once the last reconcile is older than
+CATALOG_MAX_STALENESS_SECONDS (default 300) the catalog reports itself stale:
+VertexContextEngine starts a background reconcile on the next read, and
+version() moves every staleness period, so a stale instance never keeps
+answering 304 to a poll. Version-based ETags are weak for the same reason.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Characters of text kept per entry so listings can show a preview
+PREVIEW_CHARS = 500
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent.parent.parent / "data" / "document_catalog.json"
+
+
+def make_catalog_entry(
+    doc_id: str,
+    title: str,
+    category: str,
+    content: str,
+    source: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Build the catalog entry stored for a single document."""
+    return {
+        "id": doc_id,
+        "title": title or "Untitled",
+        "category": category or "general",
+        "size": len(content or ""),
+        "tags": list(tags or []),
+        "source": source,
+        "preview": (content or "")[:PREVIEW_CHARS],
+    }
+
+
+def listing_key(entry: Dict[str, Any]) -> Tuple[str, str]:
+    """Stable listing order: case-insensitive title, then document ID."""
+    return ((entry.get("title") or "").lower(), entry["id"])
+
+
+class DocumentCatalog:
+    """
+    Thread-safe, locally persisted index of documents per client.
+
+    Reads are O(client's documents); writes are O(1) plus a debounced persist.
+    Paged listings use a per-client sorted index that is rebuilt on the first
+    read after a write, so a page costs O(log n + limit).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        persist_delay_seconds: float = 2.0,
+        max_staleness_seconds: Optional[float] = None
+    ):
+        self.path = Path(path or os.getenv("DOCUMENT_CATALOG_PATH") or DEFAULT_CATALOG_PATH)
+        self.persist_delay_seconds = persist_delay_seconds
+        self.max_staleness_seconds = max_staleness_seconds or float(
+            os.getenv("CATALOG_MAX_STALENESS_SECONDS", "300")
+        )
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._doc_owner: Dict[str, str] = {}
+        # client_id -> sorted listing keys; dropped whenever the client's documents change
+        self._order: Dict[str, List[Tuple[str, str]]] = {}
+        # Per-client write counters for ETags; the epoch keeps them unique
+        # across restarts and the generation moves on every full reconcile
+        self._epoch = uuid.uuid4().hex[:8]
+        self._generation = 0
+        self._versions: Dict[str, int] = {}
+        self._last_reconciled_at: Optional[float] = None
+        self._persist_timer: Optional[threading.Timer] = None
+        # Local changes since the running reconcile scan began:
+        # doc_id -> (seq, client_id, entry or None for a delete)
+        self._seq = 0
+        self._journal: Optional[Dict[str, Tuple[int, str, Optional[Dict[str, Any]]]]] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            clients = data.get("clients", {})
+            with self._lock:
+                self._clients = {cid: dict(docs) for cid, docs in clients.items()}
+                self._doc_owner = {
+                    doc_id: cid for cid, docs in self._clients.items() for doc_id in docs
+                }
+                self._last_reconciled_at = data.get("last_reconciled_at")
+            print(f"[DocumentCatalog] Loaded {len(self._doc_owner)} documents from {self.path}", flush=True)
+        except Exception as e:
+            print(f"[DocumentCatalog] Failed to load {self.path}: {e}", flush=True)
+
+    def persist(self):
+        """Write the catalog to disk atomically (temp file + rename)."""
+        with self._lock:
+            if self._persist_timer:
+                self._persist_timer.cancel()
+                self._persist_timer = None
+            payload = {
+                "last_reconciled_at": self._last_reconciled_at,
+                "clients": self._clients,
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"[DocumentCatalog] Failed to persist {self.path}: {e}", flush=True)
+
+    def _schedule_persist(self):
+        with self._lock:
+            if self._persist_timer:
+                return
+            timer = threading.Timer(self.persist_delay_seconds, self.persist)
+            timer.daemon = True
+            self._persist_timer = timer
+            timer.start()
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+    def upsert(self, client_id: str, entry: Dict[str, Any]):
+        """Add or replace a document entry for a client."""
+        self.upsert_many(client_id, [entry])
+
+    def upsert_many(self, client_id: str, entries: Iterable[Dict[str, Any]]):
+        with self._lock:
+            docs = self._clients.setdefault(client_id, {})
+            for entry in entries:
+                doc_id = entry["id"]
+                previous_owner = self._doc_owner.get(doc_id)
+                if previous_owner and previous_owner != client_id:
+                    self._clients.get(previous_owner, {}).pop(doc_id, None)
+                    self._order.pop(previous_owner, None)
+                    self._bump(previous_owner)
+                docs[doc_id] = entry
+                self._doc_owner[doc_id] = client_id
+                self._record(doc_id, client_id, entry)
+            self._order.pop(client_id, None)
+            self._bump(client_id)
+        self._schedule_persist()
+
+    def remove(self, doc_id: str) -> Optional[str]:
+        """Remove a document entry. Returns the owning client_id, if known."""
+        with self._lock:
+            client_id = self._doc_owner.pop(doc_id, None)
+            self._record(doc_id, client_id, None)
+            if client_id:
+                self._order.pop(client_id, None)
+                self._bump(client_id)
+                docs = self._clients.get(client_id, {})
+                docs.pop(doc_id, None)
+                if not docs:
+                    self._clients.pop(client_id, None)
+        if client_id:
+            self._schedule_persist()
+        return client_id
+
+    def _record(self, doc_id: str, client_id: Optional[str], entry: Optional[Dict[str, Any]]):
+        """Journal a local change while a reconcile scan is running (lock held)."""
+        self._seq += 1
+        if self._journal is not None:
+            self._journal[doc_id] = (self._seq, client_id, entry)
+
+    def begin_reconcile(self) -> int:
+        """
+        Start journaling local changes; call before the reconcile scan starts.
+        Returns the sequence number the scan is consistent with.
+        """
+        with self._lock:
+            self._journal = {}
+            return self._seq
+
+    def abort_reconcile(self):
+        """Stop journaling after a failed scan (the catalog is left as is)."""
+        with self._lock:
+            self._journal = None
+
+    def replace_all(self, clients: Dict[str, Dict[str, Dict[str, Any]]]):
+        """
+        Swap in a freshly reconciled catalog, replaying the local changes
+        journaled since begin_reconcile() on top of the scan result.
+        """
+        with self._lock:
+            journal, self._journal = self._journal or {}, None
+            if journal:
+                owners = {doc_id: cid for cid, docs in clients.items() for doc_id in docs}
+                for doc_id, (_, client_id, entry) in sorted(journal.items(), key=lambda item: item[1][0]):
+                    owner = owners.pop(doc_id, None)
+                    if owner is not None:
+                        clients[owner].pop(doc_id, None)
+                    if entry is not None:
+                        clients.setdefault(client_id, {})[doc_id] = entry
+                        owners[doc_id] = client_id
+                clients = {cid: docs for cid, docs in clients.items() if docs}
+            self._clients = clients
+            self._doc_owner = {
+                doc_id: cid for cid, docs in clients.items() for doc_id in docs
+            }
+            self._order = {}
+            self._generation += 1
+            self._last_reconciled_at = time.time()
+        self.persist()
+
+    def _bump(self, client_id: str):
+        self._versions[client_id] = self._versions.get(client_id, 0) + 1
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+    def version(self, client_id: str) -> str:
+        """
+        Changes whenever the client's documents may have changed (for ETags).
+        While the catalog is stale it also moves every max_staleness_seconds,
+        since other instances' writes are not reflected in the counters.
+        """
+        version = f"{self._epoch}.{self._generation}.{self._versions.get(client_id, 0)}"
+        if self.is_stale:
+            version += f".s{int(time.time() // self.max_staleness_seconds)}"
+        return version
+
+    @property
+    def is_bootstrapped(self) -> bool:
+        return self._last_reconciled_at is not None
+
+    @property
+    def is_stale(self) -> bool:
+        """True once the last reconcile is older than max_staleness_seconds."""
+        reconciled_at = self._last_reconciled_at
+        return reconciled_at is not None and time.time() - reconciled_at > self.max_staleness_seconds
+
+    @property
+    def last_reconciled_at(self) -> Optional[float]:
+        return self._last_reconciled_at
+
+    def owner_of(self, doc_id: str) -> Optional[str]:
+        return self._doc_owner.get(doc_id)
+
+    def entries(self, client_id: str) -> List[Dict[str, Any]]:
+        """Snapshot of all entries for a client."""
+        with self._lock:
+            return list(self._clients.get(client_id, {}).values())
+
+    def page(
+        self,
+        client_id: str,
+        limit: int,
+        after: Optional[Tuple[str, str]] = None,
+        offset: int = 0
+    ) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        One page of a client's entries in listing_key order, starting after
+        the key `after` (cursor paging) or at `offset` (page numbers).
+        Returns (entries, total, whether more entries follow).
+        """
+        with self._lock:
+            docs = self._clients.get(client_id, {})
+            keys = self._order.get(client_id)
+            if keys is None:
+                keys = self._order[client_id] = sorted(listing_key(entry) for entry in docs.values())
+            start = bisect.bisect_right(keys, tuple(after)) if after is not None else max(offset, 0)
+            page_keys = keys[start:start + limit]
+            return [docs[doc_id] for _, doc_id in page_keys], len(keys), start + len(page_keys) < len(keys)
+
+    def doc_ids(self, client_id: str, after: Optional[str] = None) -> List[str]:
+        """A client's document IDs in sorted order, only those after `after` if given."""
+        with self._lock:
+            doc_ids = sorted(self._clients.get(client_id, {}))
+        if after is not None:
+            doc_ids = doc_ids[bisect.bisect_right(doc_ids, after):]
+        return doc_ids
+
+    def entries_for_source(self, client_id: str, source: str) -> Dict[str, Dict[str, Any]]:
+        """Entries of a client's documents that came from `source`, keyed by ID."""
+        with self._lock:
+            return {
+                doc_id: entry
+                for doc_id, entry in self._clients.get(client_id, {}).items()
+                if entry.get("source") == source
+            }
+
+    def entries_by_id(self, client_id: str, doc_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Entries of the given documents that are still stored for the client."""
+        with self._lock:
+            docs = self._clients.get(client_id, {})
+            return {doc_id: docs[doc_id] for doc_id in doc_ids if doc_id in docs}
+
+    def count(self, client_id: str) -> int:
+        with self._lock:
+            return len(self._clients.get(client_id, {}))
+
+    def counts(self, client_ids: Iterable[str]) -> Dict[str, int]:
+        """Document counts for many clients under a single lock acquisition."""
+        with self._lock:
+            return {client_id: len(self._clients.get(client_id, {})) for client_id in client_ids}
+
+    def stats(self, client_id: str) -> Dict[str, Any]:
+        total_chars = 0
+        source_types: Dict[str, int] = {}
+        entries = self.entries(client_id)
+        for entry in entries:
+            total_chars += entry.get("size", 0)
+            category = entry.get("category", "general")
+            source_types[category] = source_types.get(category, 0) + 1
+        return {
+            "document_count": len(entries),
+            "total_characters": total_chars,
+            "source_types": source_types,
+        }
+
+    def total_documents(self) -> int:
+        return len(self._doc_owner)
+
+    # ------------------------------------------------------------------
+    # Reconcile
+    # ------------------------------------------------------------------
+    def start_periodic_reconcile(
+        self,
+        reconcile: Callable[[], Any],
+        interval_seconds: float,
+    ) -> threading.Event:
+        """
+        Run `reconcile` every `interval_seconds` on a daemon thread.
+        Returns an Event; set it to stop the loop.
+        """
+        stop_event = threading.Event()
+
+        def _loop():
+            while not stop_event.wait(interval_seconds):
+                try:
+                    reconcile()
+                except Exception as e:
+                    print(f"[DocumentCatalog] Periodic reconcile failed: {e}", flush=True)
+
+        thread = threading.Thread(target=_loop, name="document-catalog-reconcile", daemon=True)
+        thread.start()
+        return stop_event
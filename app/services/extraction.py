@@ -0,0 +1,339 @@
+"""
+Document text extraction, run off the event loop.
+
+pypdf and python-docx are CPU-bound and hold the GIL, so calling them inside
+an `async def` handler stalls every other request on the worker (including
+health checks). ExtractionService runs them in a process pool with a per-file
+timeout and a per-worker memory limit, and keeps queue/latency statistics.
+
+At most `max_workers` jobs are submitted to the pool at a time; the rest wait
+on a semaphore. A job's timeout therefore only covers the time a worker
+spends on it, never time queued behind other files, and a timeout (which
+recycles the pool and kills every worker) always points at the file that was
+running.
+
+Streamed PDFs (iter_pages) are extracted one page window per call, so
+EXTRACTION_TIMEOUT_SECONDS applies per window; EXTRACTION_STREAM_TIMEOUT_SECONDS
+(default 600) bounds the whole file and is checked between windows.
+"""
+
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from pypdf import PdfReader
+import docx
+
+
+class ExtractionError(Exception):
+    """Raised when a file cannot be extracted (parse error, timeout, OOM)."""
+
+
+# ============================================================================
+# Extractors (top-level so they can run in worker processes)
+# ============================================================================
+def extract_text_from_pdf(file_bytes: bytes) -> str:
+    """Extract text content from a PDF file."""
+    reader = PdfReader(io.BytesIO(file_bytes))
+    parts = []
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            parts.append(page_text + "\n")
+    return "".join(parts)
+
+
+def _pdf_reader(source: Union[bytes, str]) -> PdfReader:
+    """PdfReader over raw bytes or a file path."""
+    return PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+
+
+def count_pdf_pages(source: Union[bytes, str]) -> int:
+    """Number of pages in a PDF (bytes or file path)."""
+    return len(_pdf_reader(source).pages)
+
+
+def extract_pdf_page_range(source: Union[bytes, str], start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end) of a PDF (bytes or file path), one string per page."""
+    reader = _pdf_reader(source)
+    return [(reader.pages[i].extract_text() or "") + "\n" for i in range(start, min(end, len(reader.pages)))]
+
+
+def extract_text_from_docx(file_bytes: bytes) -> str:
+    """Extract text content from a DOCX file."""
+    doc = docx.Document(io.BytesIO(file_bytes))
+    return "".join(para.text + "\n" for para in doc.paragraphs if para.text.strip())
+
+
+def decode_text(file_bytes: bytes) -> str:
+    """Decode plain text files (txt, md, etc.)."""
+    try:
+        return file_bytes.decode('utf-8')
+    except UnicodeDecodeError:
+        return file_bytes.decode('latin-1')
+
+
+def file_format(filename: str) -> str:
+    filename_lower = (filename or "").lower()
+    if filename_lower.endswith(".pdf"):
+        return "pdf"
+    if filename_lower.endswith(".docx"):
+        return "docx"
+    return "text"
+
+
+def extract_text_from_file(filename: str, file_bytes: bytes) -> str:
+    """Extract text from file based on extension."""
+    fmt = file_format(filename)
+    if fmt == "pdf":
+        return extract_text_from_pdf(file_bytes)
+    elif fmt == "docx":
+        return extract_text_from_docx(file_bytes)
+    return decode_text(file_bytes)
+
+
+def _write_temp_pdf(file_bytes: bytes) -> str:
+    """Write a PDF to a temp file the workers can read; the caller deletes it."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(file_bytes)
+        return f.name
+
+
+def _init_worker(memory_limit_mb: int):
+    """Cap the worker's address space so one pathological file cannot OOM the container."""
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"[ExtractionService] Could not set worker memory limit: {e}", flush=True)
+
+
+# ============================================================================
+# Service
+# ============================================================================
+class ExtractionService:
+    """Process-pool text extraction with timeouts, memory limits and stats."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        memory_limit_mb: Optional[int] = None
+    ):
+        self.max_workers = max_workers or int(os.getenv("EXTRACTION_WORKERS", str(min(2, os.cpu_count() or 1))))
+        self.timeout_seconds = timeout_seconds or float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "60"))
+        self.memory_limit_mb = memory_limit_mb if memory_limit_mb is not None else int(
+            os.getenv("EXTRACTION_MEMORY_LIMIT_MB", "1024")
+        )
+        self.stream_timeout_seconds = float(os.getenv("EXTRACTION_STREAM_TIMEOUT_SECONDS", "600"))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._retry_lock: Optional[asyncio.Lock] = None
+        # One slot per worker, so nothing queues inside the pool (see module docstring)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._format_stats: Dict[str, Dict[str, float]] = {}
+
+    # ------------------------------------------------------------------
+    # Pool lifecycle
+    # ------------------------------------------------------------------
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that holds gRPC channels is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit_mb,),
+                )
+            return self._pool
+
+    def _recycle_pool(self, pool: ProcessPoolExecutor):
+        """
+        Discard `pool`, killing workers stuck on a timed-out or crashed file.
+        A no-op unless `pool` is still the current pool, so a job that failed in
+        an already-recycled pool cannot kill the replacement another job created.
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        # ProcessPoolExecutor has no public way to kill a busy worker
+        for process in list(getattr(pool, "_processes", {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        # Not cancel_futures: queued jobs must fail with BrokenProcessPool (and be
+        # resubmitted by _run), not be cancelled
+        pool.shutdown(wait=False)
+
+    def warm_up(self):
+        """Start the worker processes now so the first upload does not pay the spawn cost."""
+        pool = self._get_pool()
+        for _ in range(self.max_workers):
+            pool.submit(decode_text, b"")
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # Extraction
+    # ------------------------------------------------------------------
+    async def extract(self, filename: str, file_bytes: bytes) -> str:
+        """Extract text in a worker process. Raises ExtractionError on failure."""
+        return await self._run(file_format(filename), extract_text_from_file, filename, file_bytes)
+
+    async def iter_pages(self, filename: str, file_bytes: bytes, window: int = 8) -> AsyncIterator[str]:
+        """
+        Yield page texts as they are extracted, `window` PDF pages per worker call,
+        so callers can start processing before the whole document is parsed and
+        never hold more than one window of extracted text. Non-PDF files yield
+        their full text as a single page.
+
+        Each window gets the per-call timeout; once the windows together have
+        taken stream_timeout_seconds, the next window is not started and
+        ExtractionError is raised (time the caller spends between windows does
+        not count).
+        """
+        if file_format(filename) != "pdf":
+            yield await self.extract(filename, file_bytes)
+            return
+
+        # Workers read the PDF from a temp file: each window call sends only the
+        # path, instead of pickling the whole file to a worker once per window
+        path = await asyncio.to_thread(_write_temp_pdf, file_bytes)
+        try:
+            spent = 0.0
+            started = time.perf_counter()
+            total_pages = await self._run("pdf", count_pdf_pages, path)
+            spent += time.perf_counter() - started
+            for start in range(0, total_pages, window):
+                if spent >= self.stream_timeout_seconds:
+                    raise ExtractionError(
+                        f"Extraction timed out after {self.stream_timeout_seconds:.0f}s "
+                        f"({start} of {total_pages} pages extracted)"
+                    )
+                started = time.perf_counter()
+                pages = await self._run("pdf", extract_pdf_page_range, path, start, start + window)
+                spent += time.perf_counter() - started
+                for page_text in pages:
+                    yield page_text
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    async def _run(self, fmt: str, fn: Callable, *args) -> Any:
+        """Run `fn(*args)` in the pool with the timeout, recycling and stats policy."""
+        started = time.perf_counter()
+        outcome = "ok"
+        if self._retry_lock is None:
+            self._retry_lock = asyncio.Lock()
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        with self._lock:
+            self._pending += 1
+        try:
+            try:
+                return await self._attempt(fn, args)
+            except BrokenProcessPool:
+                # Either another job's recycle killed the pool under us, or a worker
+                # crashed on some file in it (which one is unknown): resubmit once.
+                # Retries run one at a time, so the culprit's second crash only
+                # breaks first attempts, which get their own retry.
+                async with self._retry_lock:
+                    return await self._attempt(fn, args)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise ExtractionError(f"Extraction timed out after {self.timeout_seconds:.0f}s")
+        except BrokenProcessPool:
+            outcome = "error"
+            raise ExtractionError("Extraction worker crashed (file may exceed the memory limit)")
+        except MemoryError:
+            outcome = "error"
+            raise ExtractionError(f"File exceeds the extraction memory limit ({self.memory_limit_mb}MB)")
+        except Exception as e:
+            outcome = "error"
+            raise ExtractionError(str(e)) from e
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._record(fmt, outcome, time.perf_counter() - started)
+
+    async def _attempt(self, fn: Callable, args: tuple) -> Any:
+        """
+        One submission of `fn(*args)`; recycles the pool it ran in on timeout or
+        crash. Waits for a free worker slot first, so the timeout starts when a
+        worker is available to pick the job up.
+        """
+        async with self._slots:
+            pool = self._get_pool()
+            try:
+                future = asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+                return await asyncio.wait_for(future, timeout=self.timeout_seconds)
+            except (asyncio.TimeoutError, BrokenProcessPool):
+                self._recycle_pool(pool)
+                raise
+
+    def _record(self, fmt: str, outcome: str, seconds: float):
+        with self._lock:
+            stats = self._format_stats.setdefault(fmt, {
+                "count": 0, "errors": 0, "timeouts": 0, "total_ms": 0.0, "max_ms": 0.0
+            })
+            stats["count"] += 1
+            if outcome == "error":
+                stats["errors"] += 1
+            elif outcome == "timeout":
+                stats["timeouts"] += 1
+            elapsed_ms = seconds * 1000
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            formats = {
+                fmt: {
+                    "count": s["count"],
+                    "errors": s["errors"],
+                    "timeouts": s["timeouts"],
+                    "avg_ms": round(s["total_ms"] / s["count"], 2) if s["count"] else 0.0,
+                    "max_ms": round(s["max_ms"], 2),
+                }
+                for fmt, s in self._format_stats.items()
+            }
+            return {
+                "workers": self.max_workers,
+                "timeout_seconds": self.timeout_seconds,
+                "stream_timeout_seconds": self.stream_timeout_seconds,
+                "memory_limit_mb": self.memory_limit_mb,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(0, self._pending - self.max_workers),
+                "formats": formats,
+            }
+
+
+_extraction_service: Optional[ExtractionService] = None
+
+
+def get_extraction_service() -> ExtractionService:
+    global _extraction_service
+    if _extraction_service is None:
+        _extraction_service = ExtractionService()
+    return _extraction_service
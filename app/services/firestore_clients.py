@@ -0,0 +1,206 @@
+"""
+In-memory mirror of the shared Firestore `clients` collection.
+
+Listing or validating Firestore clients used to build a new firestore.Client
+and stream the whole collection on every call. One Firestore client is now
+kept for the process lifetime and the collection is mirrored in memory: an
+on_snapshot listener applies changes as Firestore pushes them, and a polling
+loop re-reads the collection only while the listener is down (it also tries
+to re-subscribe). Lookups and listings are dict operations.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.metrics import track_upstream
+
+try:
+    from google.cloud import firestore
+except ImportError:
+    firestore = None
+
+FIRESTORE_AVAILABLE = firestore is not None
+
+
+def client_row(doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a Firestore client document the way the client listings expect."""
+    return {
+        "client_id": doc_id,
+        "name": data.get("client_name") or data.get("name") or doc_id,
+        "description": data.get("description", ""),
+        "created_at": data.get("created_at", ""),
+        "industry": data.get("industry", ""),
+        "source": "firestore"
+    }
+
+
+class FirestoreClientMirror:
+    """Shared Firestore client plus a listener-maintained copy of `clients`."""
+
+    def __init__(
+        self,
+        project: Optional[str] = None,
+        collection: str = "clients",
+        poll_interval_seconds: Optional[float] = None
+    ):
+        self.project = project or os.getenv("GOOGLE_CLOUD_PROJECT", "emailpilot-438321")
+        self.collection = collection
+        self.poll_interval_seconds = poll_interval_seconds or float(
+            os.getenv("FIRESTORE_CLIENTS_POLL_SECONDS", "300")
+        )
+
+        self._db = None
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._last_update: Optional[float] = None
+        self._watch = None
+        self._listener_failed = False
+        self._stop_event: Optional[threading.Event] = None
+        self.full_loads = 0
+        self.snapshots = 0
+
+    # ------------------------------------------------------------------
+    # Firestore client
+    # ------------------------------------------------------------------
+    @property
+    def db(self):
+        """Process-wide Firestore client (created on first use)."""
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    self._db = firestore.Client(project=self.project)
+        return self._db
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> threading.Event:
+        """
+        Load the collection, subscribe to changes and start the polling
+        fallback on a daemon thread. Returns an Event; set it (or call
+        stop()) to end the loop.
+        """
+        if self._stop_event is not None:
+            return self._stop_event
+        stop_event = self._stop_event = threading.Event()
+        if not FIRESTORE_AVAILABLE:
+            return stop_event
+
+        def _loop():
+            self._subscribe()
+            if not self._listener_active():
+                self.refresh()
+            while not stop_event.wait(self.poll_interval_seconds):
+                if self._listener_active():
+                    continue
+                self.refresh()
+                self._subscribe()
+
+        thread = threading.Thread(target=_loop, name="firestore-clients-mirror", daemon=True)
+        thread.start()
+        return stop_event
+
+    def stop(self):
+        if self._stop_event is not None:
+            self._stop_event.set()
+        watch, self._watch = self._watch, None
+        if watch is not None:
+            try:
+                watch.unsubscribe()
+            except Exception as e:
+                print(f"[FirestoreClients] Unsubscribe failed: {e}", flush=True)
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+    def _subscribe(self):
+        if self._listener_active():
+            return
+        try:
+            self._watch = self.db.collection(self.collection).on_snapshot(self._on_snapshot)
+        except Exception as e:
+            self._watch = None
+            if not self._listener_failed:
+                print(f"[FirestoreClients] Listener unavailable, polling every "
+                      f"{self.poll_interval_seconds:.0f}s: {e}", flush=True)
+            self._listener_failed = True
+        else:
+            self._listener_failed = False
+
+    def _listener_active(self) -> bool:
+        watch = self._watch
+        return watch is not None and watch.is_active
+
+    def _on_snapshot(self, collection_snapshot, changes, read_time):
+        # Each snapshot carries the full current result set
+        clients = {doc.id: client_row(doc.id, doc.to_dict() or {}) for doc in collection_snapshot}
+        with self._lock:
+            self._clients = clients
+            self._loaded = True
+            self._last_update = time.time()
+            self.snapshots += 1
+
+    def refresh(self) -> bool:
+        """Re-read the whole collection. Keeps the previous copy on failure."""
+        if not FIRESTORE_AVAILABLE:
+            return False
+        try:
+            with track_upstream("firestore", "clients.stream"):
+                clients = {
+                    doc.id: client_row(doc.id, doc.to_dict() or {})
+                    for doc in self.db.collection(self.collection).stream()
+                }
+        except Exception as e:
+            print(f"Firestore client load error: {e}")
+            return False
+        with self._lock:
+            self._clients = clients
+            self._loaded = True
+            self._last_update = time.time()
+            self.full_loads += 1
+        return True
+
+    def _ensure_loaded(self):
+        # Used outside the app lifespan (scripts): load once on demand
+        if not self._loaded and FIRESTORE_AVAILABLE and self._stop_event is None:
+            self.refresh()
+
+    # ------------------------------------------------------------------
+    # Read path
+    # ------------------------------------------------------------------
+    def __contains__(self, client_id: str) -> bool:
+        self._ensure_loaded()
+        return client_id in self._clients
+
+    def get(self, client_id: str) -> Optional[Dict[str, Any]]:
+        self._ensure_loaded()
+        row = self._clients.get(client_id)
+        return dict(row) if row is not None else None
+
+    def list_clients(self) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        return [dict(row) for row in self._clients.values()]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": FIRESTORE_AVAILABLE,
+            "loaded": self._loaded,
+            "clients": len(self._clients),
+            "listener_active": self._listener_active(),
+            "full_loads": self.full_loads,
+            "snapshots": self.snapshots,
+            "last_update": self._last_update,
+        }
+
+
+_firestore_clients: Optional[FirestoreClientMirror] = None
+
+
+def get_firestore_clients(project: Optional[str] = None) -> FirestoreClientMirror:
+    global _firestore_clients
+    if _firestore_clients is None:
+        _firestore_clients = FirestoreClientMirror(project)
+    return _firestore_clients
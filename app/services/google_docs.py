@@ -10,6 +10,8 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.services.metrics import track_upstream
+
 # OAuth scopes needed for Google Docs read access
 SCOPES = [
     'https://www.googleapis.com/auth/documents.readonly',
@@ -130,7 +132,8 @@ class GoogleDocsService:
             service = build('docs', 'v1', credentials=credentials)
 
             # Fetch the document
-            document = service.documents().get(documentId=doc_id).execute()
+            with track_upstream("google_docs", "documents.get"):
+                document = service.documents().get(documentId=doc_id).execute()
 
             title = document.get('title', 'Untitled Document')
             content = self._extract_text_from_doc(document)
@@ -198,12 +201,13 @@ class GoogleDocsService:
             service = build('drive', 'v3', credentials=credentials)
 
             # Query for Google Docs only
-            results = service.files().list(
-                q="mimeType='application/vnd.google-apps.document'",
-                pageSize=max_results,
-                fields="files(id, name, modifiedTime, webViewLink)",
-                orderBy="modifiedTime desc"
-            ).execute()
+            with track_upstream("drive", "files.list"):
+                results = service.files().list(
+                    q="mimeType='application/vnd.google-apps.document'",
+                    pageSize=max_results,
+                    fields="files(id, name, modifiedTime, webViewLink)",
+                    orderBy="modifiedTime desc"
+                ).execute()
 
             files = results.get('files', [])
 
@@ -0,0 +1,79 @@
+"""
+Conditional GET helpers (ETag / If-None-Match / Cache-Control).
+
+Listing and stats endpoints derive a weak ETag from the document catalog's
+per-client version (bumped on every write) so an unchanged poll is answered
+with 304 before any listing work. It is weak because the catalog is per
+instance: it vouches for this instance's view, not for the bytes every
+instance would send. Endpoints without a cheap version hash the response body
+instead, which still saves the transfer.
+
+CompressionMiddleware gives each compressed representation its own strong
+ETag by suffixing the encoding ("abc" -> "abc-gzip"); etag_matches accepts
+those variants of the identity ETag, and the middleware echoes the variant
+the client holds on the 304.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from fastapi import Request, Response
+
+# 0 means "private, no-cache": browsers keep the body but revalidate every time
+CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", "0"))
+
+# Content codings CompressionMiddleware may produce (see encoded_etag)
+ETAG_ENCODINGS = ("gzip", "br")
+
+
+def make_etag(*parts: Any, weak: bool = False) -> str:
+    """ETag from the values a response depends on; strong unless `weak`."""
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'W/"{digest[:32]}"' if weak else f'"{digest[:32]}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """Strong ETag of the `encoding`-compressed representation; weak ETags are returned unchanged."""
+    if not etag.startswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def cache_control(max_age: Optional[int] = None) -> str:
+    max_age = CACHE_MAX_AGE_SECONDS if max_age is None else max_age
+    if max_age <= 0:
+        return "private, no-cache"
+    return f"private, max-age={max_age}, must-revalidate"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    accepted = {opaque}.union(encoded_etag(opaque, encoding) for encoding in ETAG_ENCODINGS)
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in accepted:
+            return True
+    return False
+
+
+def set_cache_headers(response: Response, etag: str, vary: Iterable[str] = ()):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control()
+    if vary:
+        response.headers["Vary"] = ", ".join(vary)
+
+
+def not_modified(etag: str, vary: Iterable[str] = ()) -> Response:
+    response = Response(status_code=304)
+    set_cache_headers(response, etag, vary)
+    return response
@@ -0,0 +1,57 @@
+"""
+orjson-backed JSON responses.
+
+FastJSONResponse is the app's default response class. Hot routes that have
+already built their payload (search results, document listings) return it
+directly, which skips FastAPI's response-model re-validation and the
+recursive jsonable_encoder pass; pydantic models inside the payload are
+dumped by orjson's `default` hook. Falls back to jsonable_encoder and the
+standard json encoder when orjson is not installed or meets a type it
+cannot serialize. ndjson_line encodes one line of a streamed NDJSON body
+(the document export) the same way.
+"""
+
+import json
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON_AVAILABLE = orjson is not None
+
+
+def _default(obj: Any) -> Any:
+    if hasattr(obj, "model_dump"):
+        # Python mode: orjson serializes datetimes/UUIDs/enums natively, and is
+        # markedly faster than mode="json"
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (pydantic models allowed in the content)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        try:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return super().render(jsonable_encoder(content))
+
+
+def ndjson_line(content: Any) -> bytes:
+    """One NDJSON line (JSON plus a trailing newline), encoded like FastJSONResponse."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(jsonable_encoder(content)) + "\n").encode()
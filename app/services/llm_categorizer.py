@@ -9,12 +9,21 @@ retrieval quality by matching content to the correct phase filters.
 """
 
 import os
+import asyncio
+import hashlib
 import json
 import logging
+import threading
+import weakref
 from dataclasses import dataclass
-from typing import Optional, Tuple, List
+from typing import Any, Dict, Optional, Set, Tuple, List
+
+import cachetools
 import httpx
 
+from app.services.ai.tracker import detached_tracking_context, get_current_tracking_context
+from app.services.metrics import track_upstream
+
 logger = logging.getLogger(__name__)
 
 # Standard RAG categories that align with PHASE_MAPPING in vertex_search.py
@@ -100,6 +109,373 @@ class CategorizationResult:
     method: str  # "llm" or "keyword"
 
 
+# ============================================================================
+# Prompts
+# ============================================================================
+CATEGORIZATION_MODEL = "claude-3-5-haiku-latest"
+
+KEYWORD_RULES = """Rules for keywords:
+- Extract 3-8 relevant keywords/phrases that describe the content
+- Include brand names, product names, key topics, and themes
+- Use lowercase for general terms, preserve case for proper nouns
+- Focus on terms useful for search and retrieval"""
+
+
+def get_system_prompt() -> str:
+    return get_category_prompt() + """
+
+After determining the category, also extract relevant keywords from the content.
+Respond ONLY with valid JSON containing "category" and "keywords" fields."""
+
+
+def get_batch_system_prompt() -> str:
+    """System prompt of batched calls: one answer object per document, as a JSON array."""
+    return get_category_prompt() + """
+
+You will be given several documents. Categorize each one independently and extract relevant keywords from it.
+Respond ONLY with a valid JSON array holding one object per document, in document order, each with "index", "category" and "keywords" fields."""
+
+
+def build_user_message(title: Optional[str], truncated_content: str) -> str:
+    """Prompt for a single document (the request the API has always sent)."""
+    return f"""Analyze this document:
+
+Title: {title or 'Untitled'}
+
+Content:
+{truncated_content}
+
+Respond with JSON in this exact format:
+{{"category": "category_name", "keywords": ["keyword1", "keyword2", "keyword3"]}}
+
+{KEYWORD_RULES}"""
+
+
+def build_batch_message(documents: List[Tuple[Optional[str], str]]) -> str:
+    """Prompt categorizing several (title, truncated content) documents in one call."""
+    parts = [f"Analyze each of these {len(documents)} documents independently.\n"]
+    for index, (title, truncated_content) in enumerate(documents, 1):
+        parts.append(f"""<document index="{index}">
+Title: {title or 'Untitled'}
+
+Content:
+{truncated_content}
+</document>
+""")
+    parts.append(f"""Respond with a JSON array containing one object per document, in document order, in this exact format:
+[{{"index": 1, "category": "category_name", "keywords": ["keyword1", "keyword2", "keyword3"]}}]
+
+{KEYWORD_RULES}""")
+    return "\n".join(parts)
+
+
+def _prompt_version() -> str:
+    """Hash of everything that shapes the model's answer; part of every cache key."""
+    material = "\x00".join([
+        CATEGORIZATION_MODEL, get_system_prompt(), get_batch_system_prompt(),
+        build_user_message("", ""), build_batch_message([("", "")])
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()[:12]
+
+
+PROMPT_VERSION = _prompt_version()
+
+
+# ============================================================================
+# Cache and micro-batcher
+# ============================================================================
+class CategorizationCache:
+    """
+    LRU+TTL cache of LLM categorizations keyed by (prompt version, content
+    hash). Only answers the model actually gave are stored, never keyword
+    fallbacks, so an outage does not pin documents to a fallback category.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize or int(os.getenv("CATEGORIZATION_CACHE_MAX_ENTRIES", "4096"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("CATEGORIZATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        self._cache: cachetools.TTLCache = cachetools.TTLCache(maxsize=self.maxsize, ttl=self.ttl_seconds)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    def key_for(title: Optional[str], truncated_content: str) -> str:
+        digest = hashlib.sha256(f"{title or ''}\x00{truncated_content}".encode()).hexdigest()
+        return f"{PROMPT_VERSION}:{digest}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.tokens_saved += entry["tokens"]
+            return entry
+
+    def set(self, key: str, category: str, keywords: List[str], tokens: int):
+        with self._lock:
+            self._cache[key] = {"category": category, "keywords": list(keywords), "tokens": tokens}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "prompt_version": PROMPT_VERSION,
+                "entries": len(self._cache),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tokens_saved": self.tokens_saved,
+            }
+
+
+class LLMCategorizer:
+    """
+    Sends categorization requests for one event loop through a shared
+    AsyncAnthropic client. Requests arriving within
+    CATEGORIZATION_BATCH_WINDOW_MS of each other (up to
+    CATEGORIZATION_BATCH_MAX) go out as one model call; identical requests
+    in flight share one answer. Documents a batched answer leaves out are
+    asked for again together once, then one by one.
+
+    Requests are only batched with others that use the same API key and the
+    same AI tracking metadata (user, org), and each model call runs in a
+    fresh context carrying just that metadata, so usage is attributed to the
+    requesters and not to whichever request happened to start the batch.
+    """
+
+    def __init__(self, cache: "CategorizationCache", stats: Dict[str, int]):
+        self.cache = cache
+        self.stats = stats
+        self.batch_window_seconds = float(os.getenv("CATEGORIZATION_BATCH_WINDOW_MS", "50")) / 1000
+        self.batch_max = max(1, int(os.getenv("CATEGORIZATION_BATCH_MAX", "8")))
+        self._clients: Dict[str, Any] = {}
+        self._client_key: Optional[str] = None
+        self._active_calls: Dict[str, int] = {}
+        # Pending requests per (api_key, tracking metadata) group
+        self._pending: Dict[Tuple[str, Tuple], List[Tuple[str, Optional[str], str, asyncio.Future]]] = {}
+        self._pending_tracking: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _get_client(self, api_key: str):
+        client = self._clients.get(api_key)
+        if client is None:
+            from anthropic import AsyncAnthropic
+            from app.services.ai.tracker import LLMTracker
+            client = self._clients[api_key] = LLMTracker.wrap_anthropic(AsyncAnthropic(api_key=api_key))
+        if self._client_key != api_key:
+            # The key was rotated: clients of older keys are closed once idle
+            self._client_key = api_key
+            self._retire_idle_clients()
+        return client
+
+    def _retire_idle_clients(self):
+        for api_key in list(self._clients):
+            if api_key != self._client_key and not self._active_calls.get(api_key):
+                self._active_calls.pop(api_key, None)
+                self._spawn(self._clients.pop(api_key).close())
+
+    async def close(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.close()
+
+    async def request(self, api_key: str, title: Optional[str], truncated_content: str) -> Tuple[Any, int]:
+        """
+        The model's answer for one document: a parsed JSON object (or the raw
+        text when it did not answer with JSON) and the tokens attributed to it.
+        """
+        key = self.cache.key_for(title, truncated_content)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        tracking = dict(get_current_tracking_context())
+        group = (api_key, tuple(sorted((name, repr(value)) for name, value in tracking.items())))
+        pending = self._pending.setdefault(group, [])
+        self._pending_tracking[group] = tracking
+        pending.append((api_key, title, truncated_content, future))
+        if len(pending) >= self.batch_max or self.batch_window_seconds <= 0:
+            self._flush_group(group)
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window_seconds, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        self._flush_handle = None
+        for group in list(self._pending):
+            self._flush_group(group)
+
+    def _flush_group(self, group: Tuple[str, Tuple]):
+        batch = self._pending.pop(group, [])
+        tracking = self._pending_tracking.pop(group, {})
+        if not self._pending and self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if batch:
+            # Not the context of whichever request filled or opened the batch
+            self._spawn(self._send(batch), context=detached_tracking_context(tracking))
+
+    def _spawn(self, coro, context=None):
+        # The loop only keeps weak references to tasks
+        task = asyncio.get_running_loop().create_task(coro, context=context)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, Optional[str], str, asyncio.Future]], retry: bool = False):
+        try:
+            if len(batch) == 1:
+                _, title, truncated_content, future = batch[0]
+                text, tokens = await self._create(
+                    batch[0][0], get_system_prompt(), build_user_message(title, truncated_content), 200
+                )
+                try:
+                    answer: Any = json.loads(text)
+                except json.JSONDecodeError:
+                    answer = text
+                if not future.done():
+                    future.set_result((answer, tokens))
+                return
+
+            documents = [(title, truncated_content) for _, title, truncated_content, _ in batch]
+            text, tokens = await self._create(
+                batch[0][0], get_batch_system_prompt(), build_batch_message(documents), 200 * len(batch)
+            )
+            self.stats["batched_calls"] += 1
+            self.stats["batched_documents"] += len(batch)
+            # Every document in the batch would otherwise have carried the system prompt
+            self.stats["tokens_saved_batching"] += (len(batch) - 1) * (len(get_system_prompt()) // 4)
+            answers = parse_batch_answer(text)
+            share = tokens // len(batch)
+            missing = []
+            for index, entry in enumerate(batch, 1):
+                future = entry[3]
+                if future.done():
+                    continue
+                if index in answers:
+                    future.set_result((answers[index], share))
+                else:
+                    missing.append(entry)
+            if not missing:
+                return
+            logger.warning(f"Batched categorization answered {len(batch) - len(missing)} of {len(batch)} documents")
+            if len(missing) > 1 and not retry:
+                # Ask again for the unanswered documents together, once
+                self._spawn(self._send(missing, retry=True))
+            else:
+                for entry in missing:
+                    self._spawn(self._send([entry]))
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def _create(self, api_key: str, system_prompt: str, user_message: str, max_tokens: int) -> Tuple[str, int]:
+        client = self._get_client(api_key)
+        self._active_calls[api_key] = self._active_calls.get(api_key, 0) + 1
+        try:
+            async with track_upstream("anthropic", "messages.create"):
+                response = await client.messages.create(
+                    model=CATEGORIZATION_MODEL,
+                    max_tokens=max_tokens,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": user_message}]
+                )
+        finally:
+            self._active_calls[api_key] -= 1
+            if api_key != self._client_key and not self._active_calls[api_key]:
+                self._retire_idle_clients()
+        self.stats["llm_calls"] += 1
+        tokens = 0
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.stats["input_tokens"] += usage.input_tokens or 0
+            self.stats["output_tokens"] += usage.output_tokens or 0
+            tokens = (usage.input_tokens or 0) + (usage.output_tokens or 0)
+        return response.content[0].text.strip(), tokens
+
+
+def parse_batch_answer(text: str) -> Dict[int, Any]:
+    """
+    Answer objects of a batched call by document index. Besides the requested
+    array, accepts an array wrapped in an object ({"documents": [...]}) and a
+    lone indexed object; unparseable answers yield nothing.
+    """
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    if isinstance(parsed, dict):
+        wrapped = [value for value in parsed.values() if isinstance(value, list)]
+        parsed = wrapped[0] if len(wrapped) == 1 and "index" not in parsed else [parsed]
+    if not isinstance(parsed, list):
+        return {}
+    return {
+        item["index"]: item
+        for item in parsed
+        if isinstance(item, dict) and isinstance(item.get("index"), int)
+    }
+
+
+_cache: Optional[CategorizationCache] = None
+_categorizers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMCategorizer]" = weakref.WeakKeyDictionary()
+_stats: Dict[str, int] = {
+    "requests": 0, "llm_calls": 0, "batched_calls": 0, "batched_documents": 0, "coalesced": 0,
+    "fallbacks": 0, "input_tokens": 0, "output_tokens": 0, "tokens_saved_batching": 0,
+}
+
+
+def get_categorization_cache() -> CategorizationCache:
+    global _cache
+    if _cache is None:
+        _cache = CategorizationCache()
+    return _cache
+
+
+def get_llm_categorizer() -> LLMCategorizer:
+    """Categorizer (and Anthropic client) of the running event loop."""
+    loop = asyncio.get_running_loop()
+    categorizer = _categorizers.get(loop)
+    if categorizer is None:
+        categorizer = _categorizers[loop] = LLMCategorizer(get_categorization_cache(), _stats)
+    return categorizer
+
+
+async def close_llm_categorizer():
+    categorizer = _categorizers.pop(asyncio.get_running_loop(), None)
+    if categorizer is not None:
+        await categorizer.close()
+
+
+def categorization_stats() -> Dict[str, Any]:
+    """Cache hit rate, batching and token usage of LLM categorization."""
+    stats = dict(_stats)
+    stats["avg_batch_size"] = (
+        round(stats["batched_documents"] / stats["batched_calls"], 2) if stats["batched_calls"] else 0.0
+    )
+    stats["cache"] = get_categorization_cache().stats()
+    stats["tokens_saved"] = stats["cache"]["tokens_saved"] + stats["tokens_saved_batching"]
+    return stats
+
+
+def _keyword_fallback(content: str, title: Optional[str], generate_keywords: bool) -> Tuple[str, float, List[str]]:
+    cat, conf = categorize_with_keywords(content, title)
+    keywords = suggest_keywords_from_content(content) if generate_keywords else []
+    return (cat, conf, keywords)
+
+
 async def categorize_with_llm(
     content: str,
     title: Optional[str] = None,
@@ -109,6 +485,9 @@ async def categorize_with_llm(
     """
     Use Claude to categorize document content and generate keywords.
 
+    Answers are cached by content hash and prompt version, and concurrent
+    requests are batched into shared model calls (see LLMCategorizer).
+
     Args:
         content: The document content to categorize
         title: Optional document title for additional context
@@ -121,84 +500,51 @@ async def categorize_with_llm(
     anthropic_key = os.getenv("ANTHROPIC_API_KEY")
     if not anthropic_key:
         logger.warning("ANTHROPIC_API_KEY not set, falling back to keyword matching")
-        cat, conf = categorize_with_keywords(content, title)
-        keywords = suggest_keywords_from_content(content) if generate_keywords else []
-        return (cat, conf, keywords)
+        return _keyword_fallback(content, title, generate_keywords)
 
     # Truncate content for LLM
     truncated_content = content[:max_content_chars]
     if len(content) > max_content_chars:
         truncated_content += "\n... [content truncated]"
 
-    # Build the user message - ask for both category AND keywords
-    user_message = f"""Analyze this document:
-
-Title: {title or 'Untitled'}
-
-Content:
-{truncated_content}
-
-Respond with JSON in this exact format:
-{{"category": "category_name", "keywords": ["keyword1", "keyword2", "keyword3"]}}
-
-Rules for keywords:
-- Extract 3-8 relevant keywords/phrases that describe the content
-- Include brand names, product names, key topics, and themes
-- Use lowercase for general terms, preserve case for proper nouns
-- Focus on terms useful for search and retrieval"""
-
-    system_prompt = get_category_prompt() + """
-
-After determining the category, also extract relevant keywords from the content.
-Respond ONLY with valid JSON containing "category" and "keywords" fields."""
+    _stats["requests"] += 1
+    cache = get_categorization_cache()
+    cache_key = cache.key_for(title, truncated_content)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return (cached["category"], 0.9, list(cached["keywords"]))
 
     try:
-        from anthropic import AsyncAnthropic
-        from app.services.ai.tracker import LLMTracker
-        
-        # Initialize and wrap client
-        client = LLMTracker.wrap_anthropic(AsyncAnthropic(api_key=anthropic_key))
-        
-        response = await client.messages.create(
-            model="claude-3-5-haiku-latest",
-            max_tokens=200,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_message}]
-        )
-
-        text_response = response.content[0].text.strip()
-
-        # Parse JSON response
-        try:
-            parsed = json.loads(text_response)
-            category = parsed.get("category", "").lower()
-            keywords = parsed.get("keywords", [])
-
-            # Validate category
-            if category not in STANDARD_CATEGORIES:
-                logger.warning(f"LLM returned invalid category '{category}', falling back to keywords")
-                cat, conf = categorize_with_keywords(content, title)
-                return (cat, conf, keywords if keywords else suggest_keywords_from_content(content))
-
-            logger.info(f"LLM categorized document as: {category} with {len(keywords)} keywords")
-            return (category, 0.9, keywords[:10])  # Cap at 10 keywords
-
-        except json.JSONDecodeError:
-            # Fallback: try to extract just the category
-            category = text_response.lower().strip()
-            if category in STANDARD_CATEGORIES:
-                keywords = suggest_keywords_from_content(content) if generate_keywords else []
-                return (category, 0.8, keywords)
-            else:
-                cat, conf = categorize_with_keywords(content, title)
-                keywords = suggest_keywords_from_content(content) if generate_keywords else []
-                return (cat, conf, keywords)
-
+        answer, tokens = await get_llm_categorizer().request(anthropic_key, title, truncated_content)
     except Exception as e:
         logger.error(f"LLM categorization error: {e}")
-        cat, conf = categorize_with_keywords(content, title)
+        _stats["fallbacks"] += 1
+        return _keyword_fallback(content, title, generate_keywords)
+
+    if isinstance(answer, dict):
+        category = str(answer.get("category", "")).lower()
+        keywords = answer.get("keywords", [])
+        if not isinstance(keywords, list):
+            keywords = []
+
+        # Validate category
+        if category not in STANDARD_CATEGORIES:
+            logger.warning(f"LLM returned invalid category '{category}', falling back to keywords")
+            _stats["fallbacks"] += 1
+            cat, conf = categorize_with_keywords(content, title)
+            return (cat, conf, keywords if keywords else suggest_keywords_from_content(content))
+
+        logger.info(f"LLM categorized document as: {category} with {len(keywords)} keywords")
+        cache.set(cache_key, category, keywords[:10], tokens)
+        return (category, 0.9, keywords[:10])  # Cap at 10 keywords
+
+    # Not JSON: the answer may still be a bare category name
+    category = str(answer).lower().strip()
+    if category in STANDARD_CATEGORIES:
         keywords = suggest_keywords_from_content(content) if generate_keywords else []
-        return (cat, conf, keywords)
+        return (category, 0.8, keywords)
+    _stats["fallbacks"] += 1
+    return _keyword_fallback(content, title, generate_keywords)
 
 
 def categorize_with_keywords(
@@ -273,6 +619,8 @@ def suggest_keywords_from_content(content: str, max_keywords: int = 10) -> List[
 # Export for use in main.py
 __all__ = [
     "categorize_with_llm",
+    "categorization_stats",
+    "close_llm_categorizer",
     "categorize_with_keywords",
     "suggest_keywords_from_content",
     "STANDARD_CATEGORIES"
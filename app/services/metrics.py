@@ -0,0 +1,497 @@
+"""
+Dependency-free Prometheus metrics.
+
+Counters, gauges and histograms live in process memory and are rendered in
+the Prometheus text exposition format (0.0.4) by GET /metrics. Recording a
+sample is a lock, a dict lookup and a bisect, so it is cheap enough for every
+request and upstream call.
+
+Request metrics are recorded by MetricsMiddleware (app/middleware.py),
+labelled by route template. Calls to external services are recorded as
+upstream metrics via:
+
+- track_upstream(upstream, operation): a sync or async context manager
+- instrument_client(client, upstream, methods): a proxy that times the listed
+  I/O methods of an SDK client (Discovery Engine, Gemini models, BigQuery;
+  see the *_METHODS tuples below)
+- instrument_methods(upstream, include): a class decorator that times the
+  listed I/O methods (state managers, Drive/Gmail wrappers)
+- instrumented_transport(upstream): an httpx transport for AsyncClient
+
+Only explicitly listed methods are timed, never local helpers. A call that
+returns before the upstream work is done is timed until the work is: a
+long-running operation or BigQuery job until its result() returns, and each
+further page a GAPIC pager fetches while being iterated as a call of its own.
+
+Nested calls to the same upstream (a timed method calling another) are only
+counted once, at the outermost call. A call only counts as nested while the
+outer call is executing, so concurrent calls started from one task are all
+counted.
+
+While a request is being profiled every finished upstream call is also
+reported to span_listener, so the profile can break request time down by
+upstream.
+"""
+
+import bisect
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+
+# Seconds; covers in-process cache hits up to slow LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic counter. Label values are passed positionally."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        lines = self._header()
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "rag_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "rag_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "rag_http_requests_in_flight", "HTTP requests currently being served."
+))
+UPSTREAM_REQUESTS = REGISTRY.register(Counter(
+    "rag_upstream_requests_total", "Calls to external services by outcome.", ("upstream", "operation", "outcome")
+))
+UPSTREAM_DURATION = REGISTRY.register(Histogram(
+    "rag_upstream_request_duration_seconds", "Latency of calls to external services.", ("upstream", "operation")
+))
+UPSTREAM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "rag_upstream_requests_in_flight", "Calls to external services currently in flight.", ("upstream",)
+))
+
+# I/O methods timed by instrument_client for the SDK clients in use
+VERTEX_SEARCH_METHODS = ("search",)
+VERTEX_DOCUMENT_METHODS = (
+    "get_document", "list_documents", "create_document", "update_document", "delete_document",
+    "import_documents", "purge_documents",
+)
+GEMINI_METHODS = ("generate_content", "generate_content_async", "count_tokens", "count_tokens_async")
+BIGQUERY_METHODS = ("query", "insert_rows_json", "get_table", "list_rows")
+
+# Upstream of the timed call currently executing, so nested calls are counted once
+_current_upstream: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("metrics_upstream", default=None)
+
+# Set while a request is being profiled (app/services/profiling.py); called
+# with (upstream, operation, start perf_counter, seconds, outcome) per call
+span_listener: contextvars.ContextVar[Optional[Callable[[str, str, float, float, str], None]]] = \
+    contextvars.ContextVar("metrics_span_listener", default=None)
+
+
+# ----------------------------------------------------------------------
+# Upstream timing
+# ----------------------------------------------------------------------
+class track_upstream:
+    """
+    Time a call to an external service:
+
+        with track_upstream("firestore", "clients.stream"): ...
+        async with track_upstream("anthropic", "messages.create"): ...
+    """
+
+    __slots__ = ("upstream", "operation", "_start", "_token", "outcome")
+
+    def __init__(self, upstream: str, operation: str):
+        self.upstream = upstream
+        self.operation = operation
+        self._start: Optional[float] = None
+        self._token = None
+        # Callers may set this (e.g. "http_5xx") before the block exits
+        self.outcome: Optional[str] = None
+
+    def start(self) -> "track_upstream":
+        if _current_upstream.get() == self.upstream:
+            return self  # nested call; the outer one is timing it
+        self._token = _current_upstream.set(self.upstream)
+        UPSTREAM_IN_FLIGHT.inc(self.upstream)
+        self._start = time.perf_counter()
+        return self
+
+    def release(self):
+        """
+        Stop treating calls from this context as nested in this one. Called
+        when the timed call returns while its upstream work continues (an
+        awaitable, an operation), so later calls are not mistaken for nested.
+        """
+        if self._token is None:
+            return
+        try:
+            _current_upstream.reset(self._token)
+        except ValueError:
+            # Released in a different context than it started (e.g. a
+            # transport whose response is consumed by another task)
+            pass
+        self._token = None
+
+    def finish(self, exc: Optional[BaseException] = None):
+        if self._start is None:
+            return
+        started = self._start
+        elapsed = time.perf_counter() - started
+        self._start = None
+        self.release()
+        UPSTREAM_IN_FLIGHT.dec(self.upstream)
+        if exc is None:
+            outcome = self.outcome or "success"
+        elif isinstance(exc, (GeneratorExit, KeyboardInterrupt)) or type(exc).__name__ == "CancelledError":
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        UPSTREAM_DURATION.observe(elapsed, self.upstream, self.operation)
+        UPSTREAM_REQUESTS.inc(self.upstream, self.operation, outcome)
+        listener = span_listener.get()
+        if listener is not None:
+            listener(self.upstream, self.operation, started, elapsed, outcome)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish(exc)
+        return False
+
+    async def __aenter__(self):
+        return self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.finish(exc)
+        return False
+
+
+def timed_upstream(upstream: str, operation: Optional[str] = None) -> Callable:
+    """Decorator form of track_upstream for sync and async functions."""
+    def decorate(func: Callable) -> Callable:
+        name = operation or func.__qualname__
+
+        if inspect.isgeneratorfunction(func) or inspect.isasyncgenfunction(func):
+            # Calling one only creates the generator; time the calls it makes instead
+            raise TypeError(f"{func.__qualname__} is a generator function and cannot be timed as one call")
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                async with track_upstream(upstream, name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_upstream(upstream, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_methods(upstream: str, include: Iterable[str]) -> Callable:
+    """Class decorator: time the I/O methods named in `include`."""
+    names = set(include)
+
+    def decorate(cls):
+        missing = names - set(vars(cls))
+        if missing:
+            raise AttributeError(f"{cls.__name__} has no methods {sorted(missing)} to instrument")
+        for name in names:
+            setattr(cls, name, timed_upstream(upstream, f"{cls.__name__}.{name}")(vars(cls)[name]))
+        return cls
+    return decorate
+
+
+def _timed_call(method: Callable, upstream: str, name: str) -> Callable:
+    """Wrap one SDK method; the timer runs until the upstream work is done."""
+    @functools.wraps(method)
+    def call(*args, **kwargs):
+        timer = track_upstream(upstream, name).start()
+        try:
+            result = method(*args, **kwargs)
+        except BaseException as e:
+            timer.finish(e)
+            raise
+        timer.release()
+        if inspect.isawaitable(result):
+            return _await_timed(result, timer, upstream, name)
+        return _timed_result(result, timer, upstream, name)
+    return call
+
+
+async def _await_timed(awaitable, timer: track_upstream, upstream: str, name: str):
+    try:
+        result = await awaitable
+    except BaseException as e:
+        timer.finish(e)
+        raise
+    return _timed_result(result, timer, upstream, name)
+
+
+def _timed_result(result: Any, timer: track_upstream, upstream: str, name: str) -> Any:
+    """Finish `timer` now, or hand it to a result whose upstream work is still running."""
+    if hasattr(result, "pages") and callable(getattr(result, "_method", None)):
+        # GAPIC pager: time every further page it fetches as a call of its own
+        timer.finish()
+        result._method = _timed_call(result._method, upstream, name)
+        return result
+    if callable(getattr(result, "result", None)) and callable(getattr(result, "done", None)):
+        # Long-running operation or BigQuery job: timed until result() returns
+        return _TimedOperation(result, timer)
+    timer.finish()
+    return result
+
+
+def _finish_detached(timer: track_upstream):
+    # The operation was dropped without waiting for its result
+    timer.outcome = timer.outcome or "detached"
+    timer.finish()
+
+
+class _TimedOperation:
+    """Proxy for an operation whose call is timed until result() returns."""
+
+    __slots__ = ("_operation", "_timer", "__weakref__")
+
+    def __init__(self, operation: Any, timer: track_upstream):
+        object.__setattr__(self, "_operation", operation)
+        object.__setattr__(self, "_timer", timer)
+        weakref.finalize(self, _finish_detached, timer)
+
+    def result(self, *args, **kwargs):
+        timer = self._timer
+        try:
+            result = self._operation.result(*args, **kwargs)
+        except BaseException as e:
+            timer.finish(e)
+            raise
+        if inspect.isawaitable(result):
+            return _await_finish(result, timer)
+        timer.finish()
+        return result
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._operation, name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._operation, name, value)
+
+    def __repr__(self) -> str:
+        return f"_TimedOperation({self._operation!r})"
+
+
+async def _await_finish(awaitable, timer: track_upstream):
+    try:
+        result = await awaitable
+    except BaseException as e:
+        timer.finish(e)
+        raise
+    timer.finish()
+    return result
+
+
+class InstrumentedClient:
+    """Proxy that times the listed I/O methods of a wrapped SDK client."""
+
+    __slots__ = ("_client", "_upstream", "_methods")
+
+    def __init__(self, client: Any, upstream: str, methods: Iterable[str]):
+        object.__setattr__(self, "_client", client)
+        object.__setattr__(self, "_upstream", upstream)
+        object.__setattr__(self, "_methods", frozenset(methods))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in self._methods or not callable(attr):
+            return attr
+        return _timed_call(attr, self._upstream, name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._client, name, value)
+
+    def __repr__(self) -> str:
+        return f"InstrumentedClient({self._client!r}, upstream={self._upstream!r})"
+
+
+def instrument_client(client: Any, upstream: str, methods: Iterable[str]) -> Any:
+    """Wrap an SDK client so calls to its I/O `methods` are recorded as upstream metrics."""
+    if client is None or isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client, upstream, methods)
+
+
+# ----------------------------------------------------------------------
+# httpx
+# ----------------------------------------------------------------------
+def _http_outcome(status_code: int) -> Optional[str]:
+    if status_code >= 500:
+        return "http_5xx"
+    if status_code >= 400:
+        return "http_4xx"
+    return None
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """httpx transport recording time to response headers per request."""
+
+    def __init__(self, upstream: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.upstream = upstream
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timer = track_upstream(self.upstream, request.method).start()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            timer.finish(e)
+            raise
+        timer.outcome = _http_outcome(response.status_code)
+        timer.finish()
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def instrumented_transport(upstream: str, **transport_kwargs) -> InstrumentedAsyncTransport:
+    """
+    Transport for httpx.AsyncClient(transport=...). Connection options
+    (http2, limits, retries) go to the wrapped AsyncHTTPTransport.
+    """
+    return InstrumentedAsyncTransport(upstream, httpx.AsyncHTTPTransport(**transport_kwargs))
@@ -0,0 +1,207 @@
+"""
+Shared HTTP client for the EmailPilot Orchestrator.
+
+One pooled httpx.AsyncClient (HTTP/2 when the `h2` package is installed) is
+created and closed by the app lifespan, so client-list requests reuse warm
+connections instead of paying a TCP+TLS handshake each time.
+
+User-filtered client lists are cached for a short TTL keyed by a SHA-256 of
+the forwarded Authorization header (the raw token is never stored), and
+concurrent requests for the same key share a single upstream fetch.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import cachetools
+import httpx
+
+from app.services.metrics import instrumented_transport
+
+try:
+    import h2  # noqa: F401  (enables httpx HTTP/2 support)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def token_cache_key(authorization: str) -> str:
+    """Cache key for a forwarded Authorization header."""
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+class OrchestratorClient:
+    """Pooled Orchestrator client with per-token caching and single-flight fetches."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        internal_service_key: Optional[str] = None,
+        timeout_seconds: float = 10.0,
+        user_cache_ttl_seconds: Optional[float] = None,
+        user_cache_max_entries: int = 1024,
+        max_connections: Optional[int] = None
+    ):
+        self.base_url = (base_url or os.getenv("ORCHESTRATOR_URL", "https://app.emailpilot.ai")).rstrip("/")
+        self.internal_service_key = internal_service_key if internal_service_key is not None else os.getenv(
+            "INTERNAL_SERVICE_KEY", ""
+        )
+        self.timeout_seconds = timeout_seconds
+        self.user_cache_ttl_seconds = user_cache_ttl_seconds or float(
+            os.getenv("ORCHESTRATOR_USER_CACHE_TTL_SECONDS", "30")
+        )
+        self.max_connections = max_connections or int(os.getenv("ORCHESTRATOR_MAX_CONNECTIONS", "20"))
+
+        self._http: Optional[httpx.AsyncClient] = None
+        self._user_cache: cachetools.TTLCache = cachetools.TTLCache(
+            maxsize=user_cache_max_entries, ttl=self.user_cache_ttl_seconds
+        )
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.upstream_requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def start(self):
+        """Create the pooled client (called from the app lifespan)."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout_seconds,
+                transport=instrumented_transport(
+                    "orchestrator",
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                        keepalive_expiry=60.0,
+                    ),
+                ),
+            )
+            protocol = "HTTP/2" if HTTP2_AVAILABLE else "HTTP/1.1 (install httpx[http2] for HTTP/2)"
+            print(f"[Orchestrator] Pooled client ready for {self.base_url} using {protocol}", flush=True)
+
+    async def close(self):
+        client, self._http = self._http, None
+        if client is not None:
+            await client.aclose()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        if self._http is None:
+            # Used outside the app lifespan (scripts); still pooled per process
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout_seconds,
+                transport=instrumented_transport("orchestrator", http2=HTTP2_AVAILABLE),
+            )
+        return self._http
+
+    # ------------------------------------------------------------------
+    # Single flight
+    # ------------------------------------------------------------------
+    async def _single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fetch` once per key at a time; concurrent callers await the same result."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller being cancelled must not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+    async def fetch_internal_clients(self) -> List[Dict[str, Any]]:
+        """All clients via the internal endpoint (service key auth). [] on failure."""
+        return await self._single_flight("internal", self._fetch_internal_clients)
+
+    async def _fetch_internal_clients(self) -> List[Dict[str, Any]]:
+        headers = {}
+        if self.internal_service_key:
+            headers["X-Internal-Service-Key"] = self.internal_service_key
+        try:
+            self.upstream_requests += 1
+            response = await self.http.get("/api/internal/clients", headers=headers)
+            if response.status_code == 200:
+                return response.json().get("clients", [])
+            print(f"Orchestrator fetch failed: {response.status_code} - {response.text[:200]}")
+        except Exception as e:
+            print(f"Orchestrator fetch error: {e}")
+        return []
+
+    async def fetch_user_clients(self, authorization: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Clients visible to the caller, via the user-filtered /api/clients
+        endpoint with the caller's Authorization header. Successful responses
+        are cached per token for user_cache_ttl_seconds. [] on failure.
+        """
+        if not authorization:
+            clients = await self._fetch_user_clients(None)
+            return clients if clients is not None else []
+
+        key = token_cache_key(authorization)
+        cached = self._user_cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        async def fetch():
+            clients = await self._fetch_user_clients(authorization)
+            if clients is not None:
+                self._user_cache[key] = clients
+            return clients
+
+        clients = await self._single_flight(f"user:{key}", fetch)
+        return clients if clients is not None else []
+
+    async def _fetch_user_clients(self, authorization: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        # NOTE: Internal service key is intentionally NOT sent here.
+        # User requests must be filtered by the user's actual permissions.
+        headers = {"Authorization": authorization} if authorization else {}
+        try:
+            self.upstream_requests += 1
+            response = await self.http.get("/api/clients", headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                # Orchestrator returns a list directly
+                return data if isinstance(data, list) else data.get("clients", [])
+            print(f"Orchestrator /api/clients fetch failed: {response.status_code} - {response.text[:200]}")
+        except Exception as e:
+            print(f"Orchestrator /api/clients fetch error: {e}")
+        return None
+
+    def invalidate(self):
+        self._user_cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "connected": self._http is not None,
+            "user_cache_entries": len(self._user_cache),
+            "user_cache_ttl_seconds": self.user_cache_ttl_seconds,
+            "upstream_requests": self.upstream_requests,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+_orchestrator_client: Optional[OrchestratorClient] = None
+
+
+def get_orchestrator_client(
+    base_url: Optional[str] = None,
+    internal_service_key: Optional[str] = None
+) -> OrchestratorClient:
+    global _orchestrator_client
+    if _orchestrator_client is None:
+        _orchestrator_client = OrchestratorClient(base_url, internal_service_key)
+    return _orchestrator_client
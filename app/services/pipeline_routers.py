@@ -0,0 +1,249 @@
+"""
+Lazy loading of the pipeline API routers.
+
+Each pipeline's api/routes.py pulls in heavy dependencies (google-generativeai,
+playwright, BigQuery, Firestore, Secret Manager) at import time. Importing all
+of them before the first request made every Cloud Run cold start pay for all
+six pipelines. Instead each pipeline prefix is registered as a stub route;
+the first request under the prefix imports the real router (off the event
+loop) and swaps it in, and a background warmup started from the app lifespan
+loads the rest shortly after the service is healthy.
+
+Pipelines share top-level package names (`core`, `config`) and adjust
+sys.path/sys.modules when imported, so they are always imported one at a
+time and in declaration order: loading a pipeline first loads any pipeline
+declared before it, exactly as the eager imports used to run.
+
+Every import is timed (wall time and modules pulled in) so the cold-start cost
+of each pipeline is visible via report() / GET /api/pipelines/status.
+`scripts/profile_pipeline_imports.py` gives a per-package breakdown.
+"""
+
+import asyncio
+import importlib.util
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, FastAPI
+from starlette.routing import BaseRoute, Match, NoMatchFound
+from starlette.types import Receive, Scope, Send
+
+RAG_ROOT = Path(__file__).parent.parent.parent
+PIPELINES_ROOT = RAG_ROOT / "pipelines"
+
+
+@dataclass
+class PipelineSpec:
+    """Where a pipeline's router lives and the prefix it serves."""
+    name: str
+    directory: str
+    module_name: str
+    prefix: str
+    # Print a traceback when the import fails
+    verbose_errors: bool = False
+    # Extra directories the routes module needs on sys.path
+    extra_paths: List[Path] = field(default_factory=list)
+
+    @property
+    def path(self) -> Path:
+        return PIPELINES_ROOT / self.directory
+
+    @property
+    def routes_file(self) -> Path:
+        return self.path / "api" / "routes.py"
+
+
+# Declaration order is import order (see module docstring)
+PIPELINES: List[PipelineSpec] = [
+    PipelineSpec("Figma Feedback", "figma-comments", "figma_feedback_routes", "/api/figma-feedback"),
+    PipelineSpec("Image Repository", "image-repository", "image_repository_routes", "/api/images"),
+    PipelineSpec("Figma Email Review", "figma-email-review", "figma_review_routes", "/api/figma-review"),
+    PipelineSpec("Email Repository", "email-repository", "email_repo_routes", "/api/emails"),
+    # RAG root on sys.path so 'app.*' imports work from its submodules
+    PipelineSpec("Meeting Ingestion", "meeting-ingestion", "meeting_ingestion_routes", "/api/meeting",
+                 verbose_errors=True, extra_paths=[RAG_ROOT]),
+    PipelineSpec("Intelligence Grading", "intelligence-grading", "intelligence_grading_routes", "/api/intelligence",
+                 verbose_errors=True),
+]
+
+
+def import_pipeline_router(spec: PipelineSpec) -> APIRouter:
+    """Import a pipeline's api/routes.py and return its router."""
+    if not spec.routes_file.exists():
+        raise ImportError(f"routes file not found at {spec.routes_file}")
+
+    for path in spec.extra_paths + [spec.path]:
+        if str(path) not in sys.path:
+            sys.path.insert(0, str(path))
+
+    # Use importlib to avoid module cache conflicts with other api/routes.py files
+    module_spec = importlib.util.spec_from_file_location(spec.module_name, spec.routes_file)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module.router
+
+
+@dataclass
+class PipelineLoad:
+    """Outcome and import-time profile of one pipeline."""
+    spec: PipelineSpec
+    status: str = "pending"  # pending | loaded | failed
+    import_seconds: Optional[float] = None
+    modules_imported: int = 0
+    top_packages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    trigger: Optional[str] = None  # request | warmup | eager
+    router: Optional[APIRouter] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.spec.name,
+            "prefix": self.spec.prefix,
+            "status": self.status,
+            "trigger": self.trigger,
+            "import_seconds": round(self.import_seconds, 3) if self.import_seconds is not None else None,
+            "modules_imported": self.modules_imported,
+            "top_packages": self.top_packages,
+            "error": self.error,
+        }
+
+
+class LazyRouterStub(BaseRoute):
+    """Matches a pipeline prefix until the real router has been mounted."""
+
+    def __init__(self, loader: "LazyPipelineRouters", spec: PipelineSpec):
+        self.loader = loader
+        self.spec = spec
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] == "http":
+            path = scope.get("path", "")
+            root_path = scope.get("root_path", "")
+            if root_path and path.startswith(root_path):
+                path = path[len(root_path):]
+            if path == self.spec.prefix or path.startswith(self.spec.prefix + "/"):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    def url_path_for(self, name: str, /, **path_params: Any):
+        raise NoMatchFound(name, path_params)
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.loader.ensure_loaded(self.spec.name, trigger="request")
+        # The stub is gone now (or the pipeline failed and the request 404s):
+        # dispatch again against the updated route table
+        await self.loader.app.router.app(scope, receive, send)
+
+
+class LazyPipelineRouters:
+    """Registers pipeline stubs on the app and swaps in the real routers on demand."""
+
+    def __init__(self, app: FastAPI, specs: Optional[List[PipelineSpec]] = None):
+        self.app = app
+        self.specs = list(specs if specs is not None else PIPELINES)
+        self.loads: Dict[str, PipelineLoad] = {spec.name: PipelineLoad(spec) for spec in self.specs}
+        self._stubs: Dict[str, LazyRouterStub] = {}
+        # Imports touch sys.path/sys.modules, so only one runs at a time
+        self._import_lock = threading.Lock()
+        self._mount_lock: Optional[asyncio.Lock] = None
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+    def register(self):
+        """Add a stub route per pipeline prefix at the current end of the route table."""
+        for spec in self.specs:
+            stub = LazyRouterStub(self, spec)
+            self._stubs[spec.name] = stub
+            self.app.router.routes.append(stub)
+
+    def load_all_now(self):
+        """Import and mount every pipeline immediately (PIPELINE_LAZY_LOAD=false)."""
+        for spec in self.specs:
+            self._import(spec, trigger="eager")
+            self._mount(spec)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _import(self, spec: PipelineSpec, trigger: str) -> PipelineLoad:
+        """Import one pipeline (blocking) and record its import profile."""
+        load = self.loads[spec.name]
+        with self._import_lock:
+            if load.status != "pending":
+                return load
+            modules_before = set(sys.modules)
+            start = time.perf_counter()
+            try:
+                load.router = import_pipeline_router(spec)
+                load.status = "loaded"
+            except Exception as e:
+                load.status = "failed"
+                load.error = str(e)
+                print(f"⚠️ {spec.name} routes not loaded: {e}")
+                if spec.verbose_errors:
+                    traceback.print_exc()
+            load.import_seconds = time.perf_counter() - start
+            load.trigger = trigger
+            new_modules = set(sys.modules) - modules_before
+            load.modules_imported = len(new_modules)
+            packages: Dict[str, int] = {}
+            for name in new_modules:
+                top = name.split(".")[0]
+                packages[top] = packages.get(top, 0) + 1
+            load.top_packages = [name for name, _ in sorted(packages.items(), key=lambda kv: -kv[1])[:5]]
+        return load
+
+    def _mount(self, spec: PipelineSpec):
+        """Swap the stub for the real router (runs on the event loop thread)."""
+        load = self.loads[spec.name]
+        if load.router is not None:
+            self.app.include_router(load.router)
+            load.router = None
+            self.app.openapi_schema = None
+            print(f"✅ {spec.name} routes loaded ({load.import_seconds:.2f}s, "
+                  f"{load.modules_imported} modules, trigger={load.trigger})")
+        stub = self._stubs.pop(spec.name, None)
+        if stub is not None:
+            try:
+                self.app.router.routes.remove(stub)
+            except ValueError:
+                pass
+
+    async def ensure_loaded(self, name: str, trigger: str = "request"):
+        """Load `name` and every pipeline declared before it."""
+        if self._mount_lock is None:
+            self._mount_lock = asyncio.Lock()
+        async with self._mount_lock:
+            for spec in self.specs:
+                if self.loads[spec.name].status == "pending":
+                    await asyncio.to_thread(self._import, spec, trigger)
+                self._mount(spec)
+                if spec.name == name:
+                    return
+
+    async def warm_up(self, delay_seconds: float = 0.0):
+        """Load all pipelines in the background once the app is serving."""
+        await asyncio.sleep(delay_seconds)
+        start = time.perf_counter()
+        if self.specs:
+            await self.ensure_loaded(self.specs[-1].name, trigger="warmup")
+        print(f"[Pipelines] Warmup finished in {time.perf_counter() - start:.2f}s")
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def report(self) -> Dict[str, Any]:
+        loads = [load.to_dict() for load in self.loads.values()]
+        return {
+            "pipelines": loads,
+            "loaded": sum(1 for load in loads if load["status"] == "loaded"),
+            "pending": sum(1 for load in loads if load["status"] == "pending"),
+            "failed": sum(1 for load in loads if load["status"] == "failed"),
+            "total_import_seconds": round(sum(load["import_seconds"] or 0 for load in loads), 3),
+        }
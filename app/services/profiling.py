@@ -0,0 +1,283 @@
+"""
+On-demand request profiling for internal callers.
+
+A request carrying `X-Profile-Request: 1` together with a valid
+X-Internal-Service-Key is run under a sampling profiler: a background thread
+snapshots the Python stacks every PROFILE_SAMPLE_INTERVAL_MS (5ms) while the
+request is in flight. The samples are kept as collapsed stacks
+(`frame;frame;frame count`), which flamegraph.pl and speedscope read
+directly, and every upstream call made for the request (see track_upstream in
+app/services/metrics.py) is recorded as a span. The response carries an
+X-Profile-Id header; the profile is fetched from /api/profiles/{id} (JSON,
+with the per-upstream breakdown) or /api/profiles/{id}/collapsed.
+
+Stacks are sampled for the event loop thread that serves the request and for
+any other thread currently running service code (requests offloaded with
+asyncio.to_thread / run_in_executor). Requests being served concurrently on
+the same process show up in the samples too, so profile against a quiet
+instance when the flamegraph matters.
+
+Without the header the only cost is one header scan per request and a
+ContextVar lookup per upstream call. Only one request is profiled at a time;
+a second request asking for a profile while one is running gets
+`X-Profile-Status: busy` and runs normally.
+"""
+
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.metrics import span_listener
+
+RAG_ROOT = Path(__file__).parent.parent.parent
+_ROOT_PREFIX = str(RAG_ROOT) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+PROFILE_HEADER = "X-Profile-Request"
+
+
+def internal_key_valid(key: Optional[str]) -> bool:
+    """True when `key` matches INTERNAL_SERVICE_KEY (timing-safe)."""
+    expected = os.getenv("INTERNAL_SERVICE_KEY")
+    return bool(key and expected and hmac.compare_digest(key, expected))
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT_PREFIX):
+        filename = filename[len(_ROOT_PREFIX):]
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    else:
+        filename = os.path.basename(filename)
+    # Line of the def (not the current line) so samples of one function merge
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+# Leaf functions of a thread parked on a lock, event, queue or selector
+_IDLE_LEAVES = {"wait", "select", "poll", "get", "_wait_for_tstate_lock", "acquire"}
+
+
+def _runs_service_code(frame) -> bool:
+    """True for a thread busy in (or below) service code, not parked waiting."""
+    leaf = frame.f_code
+    if leaf.co_name in _IDLE_LEAVES and not leaf.co_filename.startswith(_ROOT_PREFIX):
+        return False
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_ROOT_PREFIX) and filename != _THIS_FILE:
+            return True
+        frame = frame.f_back
+    return False
+
+
+class RequestProfile:
+    """Samples and upstream spans collected for one request."""
+
+    def __init__(self, method: str, path: str, interval_seconds: float):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.duration_seconds: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.truncated = False
+        self.spans: List[Dict[str, Any]] = []
+
+    # Called by track_upstream (possibly from worker threads)
+    def record_span(self, upstream: str, operation: str, started: float, seconds: float, outcome: str):
+        self.spans.append({
+            "upstream": upstream,
+            "operation": operation,
+            "start_ms": round((started - self._start) * 1000, 3),
+            "duration_ms": round(seconds * 1000, 3),
+            "outcome": outcome,
+            "thread": threading.current_thread().name,
+        })
+
+    def finish(self, status_code: Optional[int]):
+        self.duration_seconds = time.perf_counter() - self._start
+        self.status_code = status_code
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format (flamegraph.pl, speedscope)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def breakdown(self) -> Dict[str, float]:
+        """
+        Milliseconds per upstream (summed span time) and `in_process`: request
+        time not covered by any upstream span.
+        """
+        per_upstream: Dict[str, float] = {}
+        intervals: List[Tuple[float, float]] = []
+        for span in self.spans:
+            per_upstream[span["upstream"]] = per_upstream.get(span["upstream"], 0.0) + span["duration_ms"]
+            intervals.append((span["start_ms"], span["start_ms"] + span["duration_ms"]))
+
+        covered = 0.0
+        current_start = current_end = None
+        for start, end in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    covered += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            covered += current_end - current_start
+
+        total_ms = (self.duration_seconds or 0.0) * 1000
+        result = {name: round(ms, 3) for name, ms in sorted(per_upstream.items(), key=lambda kv: -kv[1])}
+        result["in_process"] = round(max(total_ms - covered, 0.0), 3)
+        return result
+
+    def to_dict(self, include_stacks: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_seconds * 1000, 3) if self.duration_seconds is not None else None,
+            "sample_interval_ms": round(self.interval_seconds * 1000, 3),
+            "sample_count": self.sample_count,
+            "truncated": self.truncated,
+            "upstream_calls": len(self.spans),
+            "breakdown_ms": self.breakdown(),
+        }
+        if include_stacks:
+            data["spans"] = sorted(self.spans, key=lambda span: span["start_ms"])
+            data["top_stacks"] = [
+                {"stack": stack, "samples": count} for stack, count in self.samples.most_common(20)
+            ]
+        return data
+
+
+class StackSampler(threading.Thread):
+    """Background thread sampling Python stacks into a RequestProfile."""
+
+    def __init__(self, profile: RequestProfile, loop_thread_id: int, max_seconds: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.profile = profile
+        self.loop_thread_id = loop_thread_id
+        self.max_seconds = max_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=1.0)
+
+    def run(self):
+        profile = self.profile
+        own_id = threading.get_ident()
+        deadline = time.perf_counter() + self.max_seconds
+        while not self._stop_event.wait(profile.interval_seconds):
+            if time.perf_counter() > deadline:
+                profile.truncated = True
+                return
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id != self.loop_thread_id and not _runs_service_code(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                root = "event-loop" if thread_id == self.loop_thread_id else names.get(thread_id, str(thread_id))
+                stack.append(root)
+                profile.samples[";".join(reversed(stack))] += 1
+            profile.sample_count += 1
+
+
+class ProfileStore:
+    """Most recent profiles in memory, optionally written to PROFILE_OUTPUT_DIR."""
+
+    def __init__(self, max_profiles: Optional[int] = None, output_dir: Optional[str] = None):
+        self.max_profiles = max_profiles or int(os.getenv("PROFILE_STORE_SIZE", "20"))
+        output_dir = output_dir if output_dir is not None else os.getenv("PROFILE_OUTPUT_DIR", "")
+        self.output_dir = Path(output_dir) if output_dir else None
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        if self.output_dir is not None:
+            try:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                (self.output_dir / f"{profile.id}.collapsed").write_text(profile.collapsed())
+                (self.output_dir / f"{profile.id}.json").write_text(json.dumps(profile.to_dict()))
+            except Exception as e:
+                print(f"[Profiling] Could not write profile {profile.id}: {e}", flush=True)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profile.to_dict(include_stacks=False) for profile in reversed(profiles)]
+
+
+class RequestProfiler:
+    """Starts and stops request profiles; at most one runs at a time."""
+
+    def __init__(self, store: Optional[ProfileStore] = None):
+        self.store = store or ProfileStore()
+        self.interval_seconds = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+        self.max_seconds = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+        self._busy = threading.Lock()
+
+    def begin(self, method: str, path: str) -> Optional[Tuple[RequestProfile, StackSampler, Any]]:
+        """Start profiling on the calling (event loop) thread; None when busy."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        profile = RequestProfile(method, path, self.interval_seconds)
+        token = span_listener.set(profile.record_span)
+        sampler = StackSampler(profile, threading.get_ident(), self.max_seconds)
+        sampler.start()
+        return profile, sampler, token
+
+    def end(self, session: Tuple[RequestProfile, StackSampler, Any], status_code: Optional[int]):
+        profile, sampler, token = session
+        try:
+            sampler.stop()
+            profile.finish(status_code)
+            try:
+                span_listener.reset(token)
+            except ValueError:
+                span_listener.set(None)
+            self.store.add(profile)
+        finally:
+            self._busy.release()
+        print(f"[Profiling] {profile.method} {profile.path}: {profile.duration_seconds * 1000:.1f}ms, "
+              f"{profile.sample_count} samples, {len(profile.spans)} upstream calls (id={profile.id})", flush=True)
+
+
+_profiler: Optional[RequestProfiler] = None
+
+
+def get_request_profiler() -> RequestProfiler:
+    global _profiler
+    if _profiler is None:
+        _profiler = RequestProfiler()
+    return _profiler
@@ -0,0 +1,93 @@
+"""
+Tenant-aware LRU+TTL cache for RAG search results.
+
+Keys are the normalized search request (client_id, phase, query, k) plus a
+per-client generation number. Any write for a client bumps its generation,
+which makes every cached entry for that client unreachable at once; the
+orphaned entries are evicted by the LRU/TTL policy like any other entry.
+invalidate_all() bumps a global generation that is part of every key, so a
+search that started before it cannot store its stale result afterwards.
+"""
+
+import os
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import cachetools
+
+from app.models.schemas import RAGSearchRequest, RAGResult
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and casefold so trivially different queries share a key."""
+    return " ".join((query or "").split()).casefold()
+
+
+def request_signature(request: RAGSearchRequest) -> Tuple[str, str, str, int]:
+    """Normalized identity of a search request (without the cache generation)."""
+    phase = request.phase.value if request.phase else "GENERAL"
+    return (request.client_id, phase, normalize_query(request.query), request.k)
+
+
+class SearchResultCache:
+    """Thread-safe LRU+TTL cache of search results with per-client invalidation."""
+
+    def __init__(self, maxsize: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.maxsize = maxsize or int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+        self._cache: cachetools.TTLCache = cachetools.TTLCache(maxsize=self.maxsize, ttl=self.ttl_seconds)
+        self._generations: Dict[str, int] = {}
+        self._global_generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.invalidations = 0
+
+    def key_for(self, request: RAGSearchRequest) -> Hashable:
+        signature = request_signature(request)
+        return (self._global_generation, self._generations.get(request.client_id, 0)) + signature
+
+    def get(self, key: Hashable) -> Optional[List[RAGResult]]:
+        with self._lock:
+            results = self._cache.get(key)
+            if results is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(results)
+
+    def set(self, key: Hashable, results: List[RAGResult]):
+        with self._lock:
+            self._cache[key] = list(results)
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def invalidate_client(self, client_id: str):
+        """Drop every cached result for a client (called on each write)."""
+        with self._lock:
+            self._generations[client_id] = self._generations.get(client_id, 0) + 1
+            self.invalidations += 1
+
+    def invalidate_all(self):
+        """Drop every cached result; searches already in flight can no longer store theirs."""
+        with self._lock:
+            self._global_generation += 1
+            self._cache.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bypasses": self.bypasses,
+                "invalidations": self.invalidations,
+            }
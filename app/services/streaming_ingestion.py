@@ -0,0 +1,251 @@
+"""
+Streaming page-by-page ingestion for large documents.
+
+    page generator  ->  IncrementalChunker  ->  bounded queue  ->  batch writer
+
+Pages are extracted a window at a time, chunked incrementally and pushed onto
+a bounded asyncio.Queue; a consumer writes whatever chunks are ready as one
+bulk batch. The first chunks become searchable while later pages are still
+being parsed, and peak memory is bounded by the page window plus the queue
+size rather than by document size.
+
+With replace=True the stream replaces the stored version of `source`:
+chunks already stored unchanged are skipped and chunks that are no longer
+produced are deleted at the end (see VertexContextEngine.replace_documents).
+With provisional=True (deferred categorization) every chunk still stored
+keeps its stored category and tags; only new chunks are written, and the
+summary's written_document_ids lists them for the deferred pass.
+
+If the stream fails partway (an extraction error on a later page), the chunks
+it already wrote are deleted again, so a failed upload leaves nothing behind
+and a retry does not duplicate parts. Chunks that were stored before the
+upload started are kept.
+
+The total number of parts is unknown while the stream is written, so chunk
+titles are "(Part N)" rather than the "(Part N/M)" of the non-streaming path;
+the summary reports the final count.
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.chunking import IncrementalChunker
+
+# Characters of leading text handed to the category resolver
+CATEGORY_SAMPLE_CHARS = 4000
+
+CategoryResolver = Callable[[str], Awaitable[Tuple[str, float, List[str]]]]
+
+_DONE = object()
+
+
+class StreamingIngestionPipeline:
+    """Chunks and writes a page stream for one document."""
+
+    def __init__(
+        self,
+        async_engine,
+        queue_size: int = 32,
+        batch_size: int = 25,
+        min_chunk_size: int = 100,
+        max_chunk_size: int = 2000,
+        content_defined: bool = True
+    ):
+        self.async_engine = async_engine
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.content_defined = content_defined
+
+    async def run(
+        self,
+        client_id: str,
+        pages: AsyncIterator[str],
+        title: str,
+        source: str,
+        resolve_category: CategoryResolver,
+        tags: Optional[List[str]] = None,
+        replace: bool = False,
+        progress: Optional[Callable[..., None]] = None,
+        provisional: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Ingest a page stream. `resolve_category` is awaited once with the first
+        CATEGORY_SAMPLE_CHARS of text, before the first write. `progress`, if
+        given, is called with keyword counters (pages, chunks, chunks_written)
+        as pages are extracted and batches written. `provisional` marks the
+        resolved category as a placeholder for a deferred pass (see replace).
+
+        Returns a summary with category, chunk/write counts and timings.
+        """
+        engine = self.async_engine.engine
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunker = IncrementalChunker(
+            self.min_chunk_size, self.max_chunk_size, content_defined=self.content_defined
+        )
+        started = time.perf_counter()
+        summary: Dict[str, Any] = {
+            "pages": 0,
+            "chunks": 0,
+            "document_ids": [],
+            "written_document_ids": [],
+            "errors": {},
+            "batches": 0,
+            "first_write_ms": None,
+            "size": 0,
+        }
+        stored: Dict[str, Dict[str, Any]] = {}
+        seen: set = set()
+        # What the source held before this upload; rolled-back writes never touch it
+        existing = await asyncio.to_thread(engine.source_entries, client_id, source)
+        if replace:
+            stored = existing
+            summary.update({"unchanged": 0, "deleted": 0, "stale_document_ids": None})
+
+        def report():
+            if progress is not None:
+                progress(pages=summary["pages"], chunks=summary["chunks"],
+                         chunks_written=len(summary["document_ids"]))
+
+        async def produce():
+            try:
+                async for page_text in pages:
+                    summary["pages"] += 1
+                    report()
+                    for chunk in chunker.feed(page_text):
+                        await queue.put(chunk)
+                for chunk in chunker.finish():
+                    await queue.put(chunk)
+            except asyncio.CancelledError:
+                # Only the consumer cancels, and it has stopped reading: blocking
+                # on a full queue here would hang this task forever
+                try:
+                    queue.put_nowait(_DONE)
+                except asyncio.QueueFull:
+                    pass
+                raise
+            except BaseException:
+                await queue.put(_DONE)
+                raise
+            else:
+                await queue.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            # Hold back the first chunks until there is enough text to categorize
+            held: List[str] = []
+            done = False
+            while sum(len(c) for c in held) < CATEGORY_SAMPLE_CHARS:
+                item = await queue.get()
+                if item is _DONE:
+                    done = True
+                    break
+                held.append(item)
+
+            category, confidence, generated_tags = await resolve_category("\n\n".join(held))
+            summary.update({"category": category, "confidence": confidence, "generated_tags": generated_tags})
+            normalized_tags = engine._normalize_tags(list(tags or []) + list(generated_tags or []))
+            summary["tags"] = normalized_tags
+
+            part = 0
+            while held or not done:
+                # Write whatever is ready now (at least one chunk, at most batch_size)
+                batch = held[:self.batch_size]
+                held = held[self.batch_size:]
+                while not done and len(batch) < self.batch_size:
+                    if batch and queue.empty():
+                        break
+                    item = await queue.get()
+                    if item is _DONE:
+                        done = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    continue
+
+                documents = []
+                for chunk in batch:
+                    part += 1
+                    documents.append(engine.build_document(
+                        client_id, chunk, f"{title} (Part {part})", category, source, normalized_tags
+                    ))
+                if replace:
+                    unchanged = await asyncio.to_thread(
+                        engine.unchanged_ids,
+                        [(d, e) for d, e in documents if d.id not in seen], stored, generated_tags, provisional
+                    )
+                    seen.update(document.id for document, _ in documents)
+                    documents = [(d, e) for d, e in documents if d.id not in unchanged]
+                    summary["unchanged"] += len(unchanged)
+                    summary["document_ids"].extend(unchanged)
+
+                summary["chunks"] += len(batch)
+                summary["size"] += sum(len(c) for c in batch)
+                if documents:
+                    outcome = await asyncio.to_thread(engine.write_documents, client_id, documents)
+                    summary["batches"] += 1
+                    summary["document_ids"].extend(outcome["document_ids"])
+                    summary["written_document_ids"].extend(outcome["document_ids"])
+                    summary["errors"].update(outcome["errors"])
+                if summary["first_write_ms"] is None and summary["document_ids"]:
+                    summary["first_write_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                report()
+
+            await producer
+
+            if replace:
+                # Only drop the previous version once the new one is fully written
+                stale_ids = [doc_id for doc_id in stored if doc_id not in seen]
+                if stale_ids and not summary["errors"]:
+                    outcome = await asyncio.to_thread(engine.delete_documents, client_id, stale_ids)
+                    summary["deleted"] = len(outcome["deleted"])
+                    deleted_ids = set(outcome["deleted"])
+                    stale_ids = [doc_id for doc_id in stale_ids if doc_id not in deleted_ids]
+                    summary["errors"].update(
+                        {doc_id: f"delete failed: {message}" for doc_id, message in outcome["errors"].items()}
+                    )
+                summary["stale_document_ids"] = stale_ids or None
+        except BaseException as e:
+            await self._stop_producer(producer, pages)
+            if isinstance(e, Exception):
+                await self._roll_back(engine, client_id, summary["document_ids"], existing)
+            raise
+
+        summary["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return summary
+
+    @staticmethod
+    async def _stop_producer(producer: asyncio.Task, pages: AsyncIterator[str]):
+        """Cancel the page producer, wait for it to exit and close the page stream."""
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            # Already raised to the consumer (or superseded by the consumer's own error)
+            pass
+        aclose = getattr(pages, "aclose", None)
+        if aclose is not None:
+            try:
+                # Runs the generator's cleanup (e.g. iter_pages' temp file)
+                await aclose()
+            except Exception as e:
+                print(f"[StreamingIngestion] Closing the page stream failed: {e}", flush=True)
+
+    @staticmethod
+    async def _roll_back(engine, client_id: str, document_ids: List[str], existing: Dict[str, Dict[str, Any]]):
+        """Delete the chunks a failed stream wrote, keeping any stored before it started."""
+        written = [doc_id for doc_id in dict.fromkeys(document_ids) if doc_id not in existing]
+        if not written:
+            return
+        try:
+            outcome = await asyncio.to_thread(engine.delete_documents, client_id, written)
+            left = list(outcome["errors"])
+        except Exception as e:
+            print(f"[StreamingIngestion] Rollback failed for {client_id}: {e}", flush=True)
+            left = written
+        print(f"[StreamingIngestion] Rolled back {len(written) - len(left)} chunks of a failed stream "
+              f"for {client_id}" + (f"; left behind: {left}" if left else ""), flush=True)
@@ -0,0 +1,283 @@
+"""
+Background upload jobs.
+
+`POST /api/documents/{client_id}/upload` with job=true answers 202 with a job
+ID instead of holding the request open through extraction, categorization
+and the Vertex writes. Jobs wait in a bounded queue (UPLOAD_JOB_MAX_PENDING)
+and are run by a fixed number of worker tasks (UPLOAD_JOB_WORKERS), so a burst
+of large uploads cannot fan out into unbounded extraction and LLM work.
+
+Each job records its stage (queued -> extracting -> categorizing -> writing
+-> succeeded / failed), stage-level progress counters and an ordered event
+log. `/api/jobs/{id}` returns the snapshot; `/api/jobs/{id}/events` replays
+the event log as server-sent events and follows it until the job finishes.
+
+Jobs live in the memory of the instance that accepted them; finished jobs
+are kept for UPLOAD_JOB_RETENTION_SECONDS. On Cloud Run this needs CPU
+allocated outside requests (--no-cpu-throttling), session affinity so
+status polls reach that instance, and min-instances >= 1: the opt-in
+background-work substitutions in cloudbuild.yaml. Affinity is best-effort,
+so a poll that reaches another instance (no affinity cookie, or after
+scale-in) gets 404.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+JobRunner = Callable[["UploadJob"], Awaitable[Dict[str, Any]]]
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when UPLOAD_JOB_MAX_PENDING jobs are already waiting."""
+
+
+class JobFailed(Exception):
+    """Raised by a job runner to fail the job with a client-facing message and status code."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UploadJob:
+    """State, progress counters and event log of one background upload."""
+
+    def __init__(self, client_id: str, filename: str, title: str):
+        self.id = uuid.uuid4().hex
+        self.client_id = client_id
+        self.filename = filename
+        self.title = title
+        self.stage = "queued"
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self._runner: Optional[JobRunner] = None
+        self._changed = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._emit("stage")
+
+    @property
+    def done(self) -> bool:
+        return self.stage in TERMINAL_STATES
+
+    # ------------------------------------------------------------------
+    # Updates (callable from the event loop or from worker threads)
+    # ------------------------------------------------------------------
+    def set_stage(self, stage: str, **progress):
+        self._call(self._set_stage, stage, progress)
+
+    def update(self, **progress):
+        self._call(self._update, progress)
+
+    def _call(self, fn, *args):
+        if threading.get_ident() == self._loop_thread:
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _set_stage(self, stage: str, progress: Dict[str, Any]):
+        self.stage = stage
+        self.progress.update(progress)
+        self._emit("stage")
+
+    def _update(self, progress: Dict[str, Any]):
+        self.progress.update(progress)
+        self._emit("progress")
+
+    def _emit(self, event_type: str, **extra):
+        self.events.append({
+            "seq": len(self.events) + 1,
+            "type": event_type,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "at": time.time(),
+            **extra,
+        })
+        # Wake every waiting event stream, then re-arm for the next event
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _finish(self, result: Optional[Dict[str, Any]], error: Optional[str], status_code: int):
+        self.result = result
+        self.error = error
+        self.status_code = status_code
+        self.finished_at = time.time()
+        self.stage = "failed" if error else "succeeded"
+        if error:
+            self._emit("failed", error=error, status_code=status_code)
+        else:
+            self._emit("succeeded", result=result)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "client_id": self.client_id,
+            "filename": self.filename,
+            "title": self.title,
+            "status": self.stage,
+            "progress": dict(self.progress),
+            "result": self.result,
+            "error": self.error,
+            "status_code": self.status_code,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": len(self.events),
+        }
+
+    async def follow(self, after: int = 0, heartbeat_seconds: float = 15.0) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events with seq > `after`, then new ones as they happen, until the
+        job has finished. Yields None after `heartbeat_seconds` without events.
+        """
+        while True:
+            changed = self._changed
+            while after < len(self.events):
+                event = self.events[after]
+                after += 1
+                yield event
+            if self.done:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+
+
+def sse_format(event: Dict[str, Any]) -> str:
+    """One server-sent event (id = seq, so EventSource resumes with Last-Event-ID)."""
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+class UploadJobManager:
+    """Bounded queue of upload jobs drained by a fixed pool of worker tasks."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        retention_seconds: Optional[float] = None,
+        max_jobs: Optional[int] = None
+    ):
+        self.workers = workers or int(os.getenv("UPLOAD_JOB_WORKERS", "2"))
+        # Queued jobs hold their file bytes (up to MAX_UPLOAD_SIZE_BYTES each)
+        self.max_pending = max_pending or int(os.getenv("UPLOAD_JOB_MAX_PENDING", "20"))
+        self.retention_seconds = retention_seconds or float(os.getenv("UPLOAD_JOB_RETENTION_SECONDS", "3600"))
+        self.max_jobs = max_jobs or int(os.getenv("UPLOAD_JOB_MAX_JOBS", "500"))
+        self._jobs: "OrderedDict[str, UploadJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker tasks (on the running loop); idempotent."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"upload-job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        queue, self._queue = self._queue, None
+        while queue is not None and not queue.empty():
+            job = queue.get_nowait()
+            job._runner = None
+            job._finish(None, "Job cancelled (service shutting down)", 503)
+
+    def submit(self, client_id: str, filename: str, title: str, runner: JobRunner) -> UploadJob:
+        """Queue `runner(job)`; raises JobQueueFull when the queue is at capacity."""
+        self.start()
+        self._prune()
+        job = UploadJob(client_id, filename, title)
+        job._runner = runner
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.max_pending} upload jobs are already waiting")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[UploadJob]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for job in self._jobs.values() if job.stage not in ("queued",) + TERMINAL_STATES)
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retained_jobs": len(self._jobs),
+        }
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: UploadJob):
+        runner, job._runner = job._runner, None  # drop the file bytes once the job ends
+        job.started_at = time.time()
+        try:
+            result = await runner(job)
+        except JobFailed as e:
+            job._finish(None, str(e), e.status_code)
+        except asyncio.CancelledError:
+            job._finish(None, "Job cancelled (service shutting down)", 503)
+            raise
+        except Exception as e:
+            print(f"[UploadJobs] Job {job.id} ({job.client_id}/{job.filename}) failed: {e}", flush=True)
+            job._finish(None, str(e), 500)
+        else:
+            job._finish(result, None, 200)
+        if job.error:
+            self.failed += 1
+        else:
+            self.completed += 1
+        print(f"[UploadJobs] Job {job.id} {job.stage} in {job.finished_at - job.started_at:.1f}s "
+              f"({job.client_id}/{job.filename})", flush=True)
+
+    def _prune(self):
+        """Forget finished jobs past retention, and the oldest finished ones beyond max_jobs."""
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if job.done and (job.finished_at < cutoff or len(self._jobs) >= self.max_jobs):
+                del self._jobs[job_id]
+
+
+_manager: Optional[UploadJobManager] = None
+
+
+def get_upload_job_manager() -> UploadJobManager:
+    global _manager
+    if _manager is None:
+        _manager = UploadJobManager()
+    return _manager
@@ -1,17 +1,41 @@
 from google.cloud import discoveryengine_v1 as discoveryengine
 from google.api_core.client_options import ClientOptions
+from google.api_core import exceptions as google_exceptions
 from google.protobuf import struct_pb2
 from app.models.schemas import RAGSearchRequest, RAGResult
-from typing import List, Dict, Any, Optional
+from app.services.document_catalog import DocumentCatalog, listing_key, make_catalog_entry
+from app.services.search_cache import SearchResultCache, request_signature
+from app.services.bulk_ingestion import BulkIngestionEngine
+from app.services.metrics import VERTEX_DOCUMENT_METHODS, VERTEX_SEARCH_METHODS, instrument_client
+from app.services.cursors import InvalidCursor, decode_cursor, encode_cursor
+from typing import AsyncIterator, Callable, Iterable, List, Dict, Any, Optional, Set, Tuple
 import os
+import asyncio
+from collections import abc
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import threading
+import time
+
+# Keys of the API document shape, selectable with list_documents(fields=...)
+DOCUMENT_FIELDS = ("id", "client_id", "title", "source_type", "content", "size", "tags", "source", "metadata")
+
+# Documents fetched per batch when exporting (full text, so kept modest)
+EXPORT_PAGE_SIZE = int(os.getenv("DOCUMENT_EXPORT_PAGE_SIZE", "200"))
+
+# When to confirm chunks a replace would skip with GetDocument: "stale" (only
+# while the catalog is older than CATALOG_MAX_STALENESS_SECONDS and may miss
+# deletes and rewrites made by other instances), "always" or "never"
+REPLACE_VERIFY_UNCHANGED = os.getenv("REPLACE_VERIFY_UNCHANGED", "stale").lower()
 
 class VertexContextEngine:
     def __init__(
         self, 
         project_id: Optional[str] = None, 
         location: Optional[str] = None, 
-        data_store_id: Optional[str] = None
+        data_store_id: Optional[str] = None,
+        catalog: Optional[DocumentCatalog] = None,
+        search_cache: Optional[SearchResultCache] = None
     ):
         # CRITICAL FIX: Explicitly set defaults to prevent "project None" errors
         self.project_id = project_id or os.getenv("GCP_PROJECT_ID") or "emailpilot-438321"
@@ -27,18 +51,22 @@ class VertexContextEngine:
         )
         
         # Initialize the search client with the specific US options
-        self.client = discoveryengine.SearchServiceClient(
+        # (RPCs are timed as upstream metrics)
+        self.client = instrument_client(discoveryengine.SearchServiceClient(
             client_options=self.client_options
-        )
+        ), "vertex_search", VERTEX_SEARCH_METHODS)
 
         # Initialize the document service client for listing documents
-        self.doc_client = discoveryengine.DocumentServiceClient(
+        self.doc_client = instrument_client(discoveryengine.DocumentServiceClient(
             client_options=self.client_options
-        )
+        ), "vertex_documents", VERTEX_DOCUMENT_METHODS)
 
         # Parent path for document operations
         self.branch_path = f"projects/{self.project_id}/locations/{self.location}/dataStores/{self.data_store_id}/branches/default_branch"
 
+        # ImportDocuments-based writer used for multi-document writes
+        self.bulk_ingestion = BulkIngestionEngine(self.doc_client, self.branch_path)
+
         # Construct the full resource path
         self.serving_config = self.client.serving_config_path(
             project=self.project_id,
@@ -47,6 +75,17 @@ class VertexContextEngine:
             serving_config="default_search",
         )
 
+        # Per-client document index so listing/counting never scans the whole store
+        self.catalog = catalog or DocumentCatalog()
+        self._reconcile_lock = threading.RLock()
+        # Background refresh of a stale catalog (see _refresh_stale_catalog)
+        self._refresh_guard = threading.Lock()
+        self._refreshing = False
+        self._last_refresh_attempt = 0.0
+
+        # Result cache in front of search(); invalidated per client on every write
+        self.search_cache = search_cache or SearchResultCache()
+
         # Map Phases to Data Categories (with "general" fallback)
         # Includes both standard categories AND actual production categories
         # (e.g., marketing_strategy, brand_guidelines found in wheelchair-getaways)
@@ -74,7 +113,8 @@ class VertexContextEngine:
     def _normalize_tags(self, raw_tags: Any) -> List[str]:
         if not raw_tags:
             return []
-        if isinstance(raw_tags, struct_pb2.ListValue):
+        if isinstance(raw_tags, (struct_pb2.ListValue, abc.Sequence)) and not isinstance(raw_tags, str):
+            # Lists read back from struct_data (ListValue, or proto-plus RepeatedComposite)
             raw_tags = list(raw_tags)
         if isinstance(raw_tags, (list, tuple)):
             tags = [str(t).strip() for t in raw_tags if str(t).strip()]
@@ -92,10 +132,8 @@ class VertexContextEngine:
             deduped.append(tag)
         return deduped
 
-    def search(self, request: RAGSearchRequest):
-        """
-        Execute a search against Vertex AI with strict Client ID isolation.
-        """
+    def build_search_request(self, request: RAGSearchRequest) -> discoveryengine.SearchRequest:
+        """Build the Discovery Engine request with strict Client ID isolation."""
         # 1. Determine which categories to search based on the Phase
         target_categories = self.PHASE_MAPPING.get(request.phase.value, [])
         
@@ -109,7 +147,7 @@ class VertexContextEngine:
             filter_str += f' AND category: ANY({cat_list})'
 
         # 3. Build the Search Request
-        req = discoveryengine.SearchRequest(
+        return discoveryengine.SearchRequest(
             serving_config=self.serving_config,
             query=request.query,
             page_size=request.k,
@@ -123,16 +161,10 @@ class VertexContextEngine:
             ),
         )
 
-        # 4. Execute (Synchronously)
-        try:
-            response = self.client.search(req)
-        except Exception as e:
-            print(f"Vertex Search Error: {e}")
-            return []
-
-        # 5. Parse and Return Results
-        results = []
-        for result in response.results:
+    def parse_search_results(self, results) -> List[RAGResult]:
+        """Convert Discovery Engine search results into RAGResults."""
+        parsed = []
+        for result in results:
             data = result.document.struct_data
             
             # Extract content safely
@@ -152,62 +184,186 @@ class VertexContextEngine:
                 },
                 relevance_score=0.9 # Placeholder score
             )
-            results.append(res)
+            parsed.append(res)
 
-        return results
+        return parsed
 
-    def list_documents(self, client_id: str, page: int = 1, limit: int = 20) -> Dict[str, Any]:
+    def search(self, request: RAGSearchRequest, use_cache: bool = True):
         """
-        List all documents from Vertex AI data store for a specific client.
-        Note: Discovery Engine doesn't support server-side filtering for list operations,
-        so we fetch all and filter client-side.
+        Execute a search against Vertex AI with strict Client ID isolation.
+        Identical requests are served from the result cache unless use_cache=False.
         """
+        cache_key = None
+        if use_cache:
+            cache_key = self.search_cache.key_for(request)
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        else:
+            self.search_cache.record_bypass()
+
+        req = self.build_search_request(request)
+
+        # Execute (Synchronously)
         try:
-            request = discoveryengine.ListDocumentsRequest(
-                parent=self.branch_path,
-                page_size=1000  # Fetch larger batch to filter client-side
-            )
-            response = self.doc_client.list_documents(request=request)
+            response = self.client.search(req)
+        except Exception as e:
+            print(f"Vertex Search Error: {e}")
+            return []
+
+        # Parse and Return Results (errors above are never cached)
+        results = self.parse_search_results(response.results)
+        if cache_key is not None:
+            self.search_cache.set(cache_key, results)
+        return results
 
-            # Filter and collect documents for this client
-            docs = []
-            for doc in response:
-                if doc.struct_data:
+    # ------------------------------------------------------------------
+    # Document catalog
+    # ------------------------------------------------------------------
+    def _entry_from_struct(self, doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        content = data.get("text_chunk", data.get("content", "")) or ""
+        return make_catalog_entry(
+            doc_id=doc_id,
+            title=data.get("title", "Untitled"),
+            category=data.get("category", "general"),
+            content=content,
+            source=data.get("source"),
+            tags=self._normalize_tags(data.get("tags")),
+        )
+
+    def reconcile_catalog(self) -> Dict[str, Any]:
+        """
+        Rebuild the document catalog from a full scan of the data store.
+        This is the only code path that lists every document; it runs at
+        bootstrap and periodically in the background.
+        """
+        with self._reconcile_lock:
+            # Writes and deletes made while the scan runs are replayed on top of it
+            self.catalog.begin_reconcile()
+            try:
+                request = discoveryengine.ListDocumentsRequest(
+                    parent=self.branch_path,
+                    page_size=1000
+                )
+                response = self.doc_client.list_documents(request=request)
+
+                clients: Dict[str, Dict[str, Dict[str, Any]]] = {}
+                for doc in response:
+                    if not doc.struct_data:
+                        continue
                     data = dict(doc.struct_data)
-                    if data.get("client_id") == client_id:
-                        # Extract document ID from full path
-                        doc_id = doc.name.split("/")[-1] if doc.name else ""
-
-                        docs.append({
-                            "id": doc_id,
-                            "client_id": client_id,
-                            "title": data.get("title", "Untitled"),
-                            "source_type": data.get("category", "general"),
-                            "content": data.get("text_chunk", data.get("content", ""))[:500],  # Preview only
-                            "size": len(data.get("text_chunk", data.get("content", ""))),
-                            "tags": self._normalize_tags(data.get("tags")),
-                            "source": "vertex_ai",
-                            "metadata": {
-                                "source": data.get("source"),
-                                "category": data.get("category"),
-                            }
-                        })
-
-            # Sort by title
-            docs.sort(key=lambda x: x.get("title", "").lower())
-
-            # Paginate
-            total = len(docs)
-            start = (page - 1) * limit
-            end = start + limit
-            paginated = docs[start:end]
+                    client_id = data.get("client_id")
+                    if not client_id:
+                        continue
+                    doc_id = doc.name.split("/")[-1] if doc.name else ""
+                    clients.setdefault(client_id, {})[doc_id] = self._entry_from_struct(doc_id, data)
+            except BaseException:
+                self.catalog.abort_reconcile()
+                raise
 
-            return {
-                "documents": paginated,
+            self.catalog.replace_all(clients)
+            total = sum(len(docs) for docs in clients.values())
+            print(f"[VertexContextEngine] Catalog reconciled: {total} documents across {len(clients)} clients", flush=True)
+            return {"clients": len(clients), "documents": total}
+
+    def _ensure_catalog(self):
+        """
+        Bootstrap the catalog with one full reconcile if it was never built.
+        A stale catalog (see DocumentCatalog.is_stale) is served as is while a
+        background reconcile refreshes it.
+        """
+        if self.catalog.is_bootstrapped:
+            if self.catalog.is_stale:
+                self._refresh_stale_catalog()
+            return
+        with self._reconcile_lock:
+            if self.catalog.is_bootstrapped:
+                return
+            self.reconcile_catalog()
+
+    def _refresh_stale_catalog(self):
+        """
+        Start a background reconcile unless one is running or the last attempt
+        was less than a staleness period ago (so a failing scan is not retried
+        on every read).
+        """
+        now = time.time()
+        with self._refresh_guard:
+            if self._refreshing or now - self._last_refresh_attempt < self.catalog.max_staleness_seconds:
+                return
+            self._refreshing = True
+            self._last_refresh_attempt = now
+
+        def _run():
+            try:
+                if self.catalog.is_stale:
+                    self.reconcile_catalog()
+            except Exception as e:
+                print(f"[VertexContextEngine] Stale catalog refresh failed: {e}", flush=True)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=_run, name="document-catalog-refresh", daemon=True).start()
+
+    def _catalog_entry_to_document(self, client_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": entry["id"],
+            "client_id": client_id,
+            "title": entry.get("title", "Untitled"),
+            "source_type": entry.get("category", "general"),
+            "content": entry.get("preview", ""),  # Preview only
+            "size": entry.get("size", 0),
+            "tags": entry.get("tags", []),
+            "source": "vertex_ai",
+            "metadata": {
+                "source": entry.get("source"),
+                "category": entry.get("category"),
+            }
+        }
+
+    def list_documents(
+        self,
+        client_id: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        List documents for a specific client, ordered by title then ID.
+
+        Served from the document catalog's sorted index, so any page costs
+        O(log n + limit). Pass `cursor` (the previous response's
+        next_cursor) instead of `page` for cursor paging; `fields` limits
+        each document to those keys. Raises InvalidCursor for a bad cursor.
+        """
+        after = None
+        if cursor:
+            state = decode_cursor(cursor, "documents")
+            if state.get("c") != client_id or not isinstance(state.get("a"), list):
+                raise InvalidCursor("Cursor belongs to another listing")
+            after = tuple(state["a"])
+        try:
+            self._ensure_catalog()
+            entries, total, has_more = self.catalog.page(client_id, limit, after=after, offset=(page - 1) * limit)
+            docs = [self._catalog_entry_to_document(client_id, entry) for entry in entries]
+            if fields:
+                docs = [{key: doc[key] for key in fields if key in doc} for doc in docs]
+
+            next_cursor = None
+            if has_more and entries:
+                last = listing_key(entries[-1])
+                next_cursor = encode_cursor({"k": "documents", "c": client_id, "a": list(last)})
+
+            result = {
+                "documents": docs,
                 "total": total,
-                "page": page,
-                "limit": limit
+                "limit": limit,
+                "next_cursor": next_cursor
             }
+            if cursor is None:
+                result["page"] = page
+            return result
 
         except Exception as e:
             print(f"Error listing documents from Vertex AI: {e}")
@@ -219,56 +375,48 @@ class VertexContextEngine:
                 "error": str(e)
             }
 
+    def export_position(self, client_id: str, cursor: Optional[str]) -> Optional[str]:
+        """
+        Document ID an export cursor resumes after (None for a fresh export).
+        Raises InvalidCursor for a malformed cursor or one of another client.
+        """
+        if not cursor:
+            return None
+        state = decode_cursor(cursor, "export")
+        if state.get("c") != client_id:
+            raise InvalidCursor("Cursor belongs to another client")
+        if not isinstance(state.get("a"), str):
+            raise InvalidCursor("Cursor from an older export; restart the export")
+        return state["a"]
+
     def get_client_document_count(self, client_id: str) -> int:
-        """Get total document count for a client from Vertex AI."""
+        """Get total document count for a client from the document catalog."""
         try:
-            request = discoveryengine.ListDocumentsRequest(
-                parent=self.branch_path,
-                page_size=1000
-            )
-            response = self.doc_client.list_documents(request=request)
-
-            count = 0
-            for doc in response:
-                if doc.struct_data:
-                    data = dict(doc.struct_data)
-                    if data.get("client_id") == client_id:
-                        count += 1
-            return count
+            self._ensure_catalog()
+            return self.catalog.count(client_id)
         except Exception as e:
             print(f"Error counting documents: {e}")
             return 0
 
-    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
-        """Get statistics for a client's documents in Vertex AI."""
+    def get_client_document_counts(self, client_ids: List[str]) -> Dict[str, int]:
+        """
+        Document counts for many clients in one pass over the catalog, so a
+        client-list page costs O(clients) rather than one lookup per client.
+        """
         try:
-            request = discoveryengine.ListDocumentsRequest(
-                parent=self.branch_path,
-                page_size=1000
-            )
-            response = self.doc_client.list_documents(request=request)
-
-            total_chars = 0
-            source_types = {}
-            doc_count = 0
-
-            for doc in response:
-                if doc.struct_data:
-                    data = dict(doc.struct_data)
-                    if data.get("client_id") == client_id:
-                        doc_count += 1
-                        content = data.get("text_chunk", data.get("content", ""))
-                        total_chars += len(content)
-
-                        st = data.get("category", "general")
-                        source_types[st] = source_types.get(st, 0) + 1
+            self._ensure_catalog()
+            return self.catalog.counts(client_ids)
+        except Exception as e:
+            print(f"Error counting documents: {e}")
+            return {client_id: 0 for client_id in client_ids}
 
-            return {
-                "document_count": doc_count,
-                "total_characters": total_chars,
-                "source_types": source_types,
-                "vector_enabled": True
-            }
+    def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        """Get statistics for a client's documents from the document catalog."""
+        try:
+            self._ensure_catalog()
+            stats = self.catalog.stats(client_id)
+            stats["vector_enabled"] = True
+            return stats
         except Exception as e:
             print(f"Error getting client stats: {e}")
             return {
@@ -279,6 +427,114 @@ class VertexContextEngine:
                 "error": str(e)
             }
 
+    # ------------------------------------------------------------------
+    # Document builders and write hooks (shared with AsyncVertexContextEngine)
+    # ------------------------------------------------------------------
+    def document_id_for(self, client_id: str, content: str, source: Optional[str] = None) -> str:
+        """
+        Content-addressed document ID: {client_id}-{md5[:8]} of the source and
+        the content. The source is part of the hash so a chunk shared by two
+        files (boilerplate, footers) is stored once per file, and replacing one
+        file can never move or delete the other file's copy.
+        """
+        key = f"{source}\n{content}" if source else content
+        content_hash = hashlib.md5(key.encode()).hexdigest()[:8]
+        return f"{client_id}-{content_hash}"
+
+    def document_name(self, doc_id: str) -> str:
+        return f"{self.branch_path}/documents/{doc_id}"
+
+    def build_document(
+        self,
+        client_id: str,
+        content: str,
+        title: str,
+        category: str,
+        source: Optional[str],
+        normalized_tags: List[str],
+        doc_id: Optional[str] = None
+    ):
+        """
+        Build a Discovery Engine Document and its catalog entry.
+        Follows the schema: id, client_id, title, category, text_chunk, source
+        """
+        doc_id = doc_id or self.document_id_for(client_id, content, source)
+        source_value = source or f"upload_{doc_id}.txt"
+
+        # Build document struct data
+        struct_data = struct_pb2.Struct()
+        struct_data.update({
+            "id": doc_id,
+            "client_id": client_id,
+            "title": title,
+            "category": category,
+            "text_chunk": content,
+            "source": source_value,
+            "tags": normalized_tags
+        })
+
+        document = discoveryengine.Document(
+            id=doc_id,
+            struct_data=struct_data
+        )
+        entry = make_catalog_entry(
+            doc_id=doc_id,
+            title=title,
+            category=category,
+            content=content,
+            source=source_value,
+            tags=normalized_tags,
+        )
+        return document, entry
+
+    def document_to_dict(self, doc_id: str, doc) -> Optional[Dict[str, Any]]:
+        """Convert a fetched Document into the API document shape."""
+        if not doc.struct_data:
+            return None
+        data = dict(doc.struct_data)
+        return {
+            "id": doc_id,
+            "client_id": data.get("client_id"),
+            "title": data.get("title", "Untitled"),
+            "source_type": data.get("category", "general"),
+            "content": data.get("text_chunk", data.get("content", "")),
+            "size": len(data.get("text_chunk", data.get("content", ""))),
+            "tags": self._normalize_tags(data.get("tags")),
+            "source": data.get("source"),
+            "metadata": {
+                "source": data.get("source"),
+                "category": data.get("category"),
+            }
+        }
+
+    def client_version(self, client_id: str) -> str:
+        """
+        Version of a client's documents; every write hook below moves it
+        (via the catalog), so it backs the ETags of listing/stats endpoints.
+        """
+        return self.catalog.version(client_id)
+
+    def record_documents_written(self, client_id: str, entries: List[Dict[str, Any]]):
+        """Write hook: called after documents were created or updated for a client."""
+        if entries:
+            self.catalog.upsert_many(client_id, entries)
+            self.search_cache.invalidate_client(client_id)
+
+    def record_document_deleted(self, doc_id: str, client_id: Optional[str] = None):
+        """Write hook: called after a document was deleted."""
+        owner = self.catalog.remove(doc_id) or client_id
+        if owner:
+            self.search_cache.invalidate_client(owner)
+        else:
+            self.search_cache.invalidate_all()
+
+    def record_documents_deleted(self, client_id: str, doc_ids: List[str]):
+        """Write hook: called after a batch of a client's documents was deleted."""
+        if doc_ids:
+            for doc_id in doc_ids:
+                self.catalog.remove(doc_id)
+            self.search_cache.invalidate_client(client_id)
+
     def create_document(
         self,
         client_id: str,
@@ -293,32 +549,15 @@ class VertexContextEngine:
         Follows the schema: id, client_id, title, category, text_chunk, source
         """
         try:
-            # Generate unique document ID
-            content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
-            doc_id = f"{client_id}-{content_hash}"
-
             # Format title following existing pattern
             display_title = title or f"{client_id} - {category}"
 
             normalized_tags = self._normalize_tags(tags)
 
-            # Build document struct data
-            struct_data = struct_pb2.Struct()
-            struct_data.update({
-                "id": doc_id,
-                "client_id": client_id,
-                "title": display_title,
-                "category": category,
-                "text_chunk": content,
-                "source": source or f"upload_{doc_id}.txt",
-                "tags": normalized_tags
-            })
-
-            # Create the document
-            document = discoveryengine.Document(
-                id=doc_id,
-                struct_data=struct_data
+            document, entry = self.build_document(
+                client_id, content, display_title, category, source, normalized_tags
             )
+            doc_id = document.id
 
             request = discoveryengine.CreateDocumentRequest(
                 parent=self.branch_path,
@@ -326,7 +565,8 @@ class VertexContextEngine:
                 document_id=doc_id
             )
 
-            result = self.doc_client.create_document(request=request)
+            self.doc_client.create_document(request=request)
+            self.record_documents_written(client_id, [entry])
 
             return {
                 "success": True,
@@ -348,31 +588,15 @@ class VertexContextEngine:
     def get_document(self, doc_id: str) -> Dict[str, Any]:
         """Get a single document from Vertex AI data store with full content."""
         try:
-            doc_name = f"{self.branch_path}/documents/{doc_id}"
+            doc_name = self.document_name(doc_id)
             print(f"[get_document] Looking up document: {doc_name}", flush=True)
             request = discoveryengine.GetDocumentRequest(name=doc_name)
             doc = self.doc_client.get_document(request=request)
             print(f"[get_document] Found document, struct_data: {bool(doc.struct_data)}", flush=True)
 
-            if doc.struct_data:
-                data = dict(doc.struct_data)
-                return {
-                    "success": True,
-                    "document": {
-                        "id": doc_id,
-                        "client_id": data.get("client_id"),
-                        "title": data.get("title", "Untitled"),
-                        "source_type": data.get("category", "general"),
-                        "content": data.get("text_chunk", data.get("content", "")),
-                        "size": len(data.get("text_chunk", data.get("content", ""))),
-                        "tags": self._normalize_tags(data.get("tags")),
-                        "source": data.get("source"),
-                        "metadata": {
-                            "source": data.get("source"),
-                            "category": data.get("category"),
-                        }
-                    }
-                }
+            document = self.document_to_dict(doc_id, doc)
+            if document:
+                return {"success": True, "document": document}
             else:
                 return {"success": False, "error": "Document has no structured data"}
 
@@ -380,17 +604,45 @@ class VertexContextEngine:
             print(f"[get_document] Error getting document from Vertex AI: {e}", flush=True)
             return {"success": False, "error": str(e)}
 
-    def delete_document(self, doc_id: str) -> Dict[str, Any]:
+    def delete_document(self, doc_id: str, client_id: Optional[str] = None) -> Dict[str, Any]:
         """Delete a document from Vertex AI data store."""
         try:
-            doc_name = f"{self.branch_path}/documents/{doc_id}"
-            request = discoveryengine.DeleteDocumentRequest(name=doc_name)
+            request = discoveryengine.DeleteDocumentRequest(name=self.document_name(doc_id))
             self.doc_client.delete_document(request=request)
+            self.record_document_deleted(doc_id, client_id)
             return {"success": True, "document_id": doc_id}
         except Exception as e:
             print(f"Error deleting document from Vertex AI: {e}")
             return {"success": False, "error": str(e)}
 
+    def write_documents(
+        self,
+        client_id: str,
+        documents: List[Tuple[Any, Dict[str, Any]]],
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Upsert many (Document, catalog entry) pairs for one client through the
+        bulk ingestion engine and record the successful ones in the catalog.
+        `progress` is passed to BulkIngestionEngine.ingest.
+        """
+        # Identical chunks share a content-addressed ID; write each once
+        unique: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+        for document, entry in documents:
+            unique.setdefault(document.id, (document, entry))
+
+        outcome = self.bulk_ingestion.ingest([document for document, _ in unique.values()], progress=progress)
+        succeeded = set(outcome["succeeded"])
+        self.record_documents_written(
+            client_id,
+            [entry for doc_id, (_, entry) in unique.items() if doc_id in succeeded]
+        )
+        return {
+            "document_ids": [doc_id for doc_id in unique if doc_id in succeeded],
+            "errors": outcome["errors"],
+            "operations": outcome["operations"],
+        }
+
     def import_documents(
         self,
         client_id: str,
@@ -398,56 +650,25 @@ class VertexContextEngine:
         title: str,
         category: str = "general",
         source: Optional[str] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        progress: Optional[Callable[[int, int], None]] = None
     ) -> Dict[str, Any]:
         """
         Import multiple document chunks to Vertex AI data store.
-        Each chunk becomes a separate searchable document.
+        Each chunk becomes a separate searchable document; writes go through
+        ImportDocuments batches (or concurrent upserts for small batches).
         """
-        document_ids = []
-        errors = []
-
         normalized_tags = self._normalize_tags(tags)
+        documents = self._build_chunk_documents(client_id, chunks, title, category, source, normalized_tags)
 
-        for i, chunk in enumerate(chunks):
-            # Generate unique document ID for each chunk
-            content_hash = hashlib.md5(chunk.encode()).hexdigest()[:8]
-            doc_id = f"{client_id}-{content_hash}"
-
-            # Title includes chunk number for multi-chunk documents
-            chunk_title = f"{title} (Part {i + 1}/{len(chunks)})" if len(chunks) > 1 else title
-
-            try:
-                # Build document struct data
-                struct_data = struct_pb2.Struct()
-                struct_data.update({
-                    "id": doc_id,
-                    "client_id": client_id,
-                    "title": chunk_title,
-                    "category": category,
-                    "text_chunk": chunk,
-                    "source": source or f"upload_{doc_id}.txt",
-                    "tags": normalized_tags
-                })
-
-                # Create the document
-                document = discoveryengine.Document(
-                    id=doc_id,
-                    struct_data=struct_data
-                )
-
-                request = discoveryengine.CreateDocumentRequest(
-                    parent=self.branch_path,
-                    document=document,
-                    document_id=doc_id
-                )
-
-                self.doc_client.create_document(request=request)
-                document_ids.append(doc_id)
+        try:
+            outcome = self.write_documents(client_id, documents, progress=progress)
+        except Exception as e:
+            print(f"Error importing documents to Vertex AI: {e}")
+            return {"success": False, "error": str(e)}
 
-            except Exception as e:
-                errors.append(f"Chunk {i + 1}: {str(e)}")
-                print(f"Error creating document chunk {i + 1}: {e}")
+        document_ids = outcome["document_ids"]
+        errors = [f"{doc_id}: {message}" for doc_id, message in outcome["errors"].items()]
 
         if document_ids:
             return {
@@ -455,6 +676,8 @@ class VertexContextEngine:
                 "documents_created": len(document_ids),
                 "document_ids": document_ids,
                 "errors": errors if errors else None,
+                "failed_document_ids": list(outcome["errors"]) or None,
+                "operations": outcome["operations"],
                 "tags": normalized_tags
             }
         else:
@@ -463,6 +686,550 @@ class VertexContextEngine:
                 "error": "; ".join(errors) if errors else "No documents created"
             }
 
+
+    def _build_chunk_documents(
+        self,
+        client_id: str,
+        chunks: List[str],
+        title: str,
+        category: str,
+        source: Optional[str],
+        normalized_tags: List[str]
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        documents = []
+        for i, chunk in enumerate(chunks):
+            # Title includes chunk number for multi-chunk documents
+            chunk_title = f"{title} (Part {i + 1}/{len(chunks)})" if len(chunks) > 1 else title
+            documents.append(self.build_document(
+                client_id, chunk, chunk_title, category, source, normalized_tags
+            ))
+        return documents
+
+    def delete_documents(self, client_id: str, doc_ids: List[str]) -> Dict[str, Any]:
+        """
+        Delete many documents of one client (PurgeDocuments for large sets).
+
+        Returns:
+            {"deleted": [doc_id, ...], "errors": {doc_id: message}, "operations": [...]}
+        """
+        outcome = self.bulk_ingestion.delete(list(doc_ids))
+        self.record_documents_deleted(client_id, outcome["deleted"])
+        return outcome
+
+    # ------------------------------------------------------------------
+    # Incremental re-ingestion
+    # ------------------------------------------------------------------
+    def source_entries(self, client_id: str, source: str) -> Dict[str, Dict[str, Any]]:
+        """Catalog entries currently stored for `source`, keyed by document ID."""
+        self._ensure_catalog()
+        return self.catalog.entries_for_source(client_id, source)
+
+    @staticmethod
+    def needs_write(
+        entry: Dict[str, Any],
+        stored: Optional[Dict[str, Any]],
+        generated_tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """
+        Whether a chunk must be (re)written. Chunk IDs hash the source and the
+        content, so a stored chunk with the same ID, category and tags is
+        unchanged; only its part number in the title may be stale, which is
+        not worth a write.
+
+        `generated_tags` are the LLM keywords, which are regenerated from the
+        whole document on every upload. They are left out of the comparison:
+        an unchanged chunk keeps the keywords it was written with and is only
+        rewritten if it lacks one of the other (manual) tags.
+        """
+        if stored is None:
+            return True
+        if stored.get("category") != entry.get("category"):
+            return True
+        if generated_tags is None:
+            return list(stored.get("tags") or []) != list(entry.get("tags") or [])
+        generated = {tag.lower() for tag in generated_tags}
+        stored_tags = {tag.lower() for tag in stored.get("tags") or []}
+        return any(
+            tag.lower() not in generated and tag.lower() not in stored_tags
+            for tag in entry.get("tags") or []
+        )
+
+    def unchanged_ids(
+        self,
+        documents: List[Tuple[Any, Dict[str, Any]]],
+        stored: Dict[str, Dict[str, Any]],
+        generated_tags: Optional[Iterable[str]] = None,
+        keep_stored: bool = False
+    ) -> Set[str]:
+        """
+        IDs of `documents` that are already stored unchanged and can be skipped.
+        The catalog (`stored`) proposes them; when it cannot be trusted (see
+        REPLACE_VERIFY_UNCHANGED) each one is confirmed with GetDocument, and
+        chunks that are missing, differ or cannot be read are written after all.
+
+        With `keep_stored` (the new category and tags are only provisional),
+        every chunk that is still stored counts as unchanged and keeps its
+        stored category and tags.
+        """
+        generated = self._normalize_tags(list(generated_tags)) if generated_tags else None
+
+        def unchanged(entry: Dict[str, Any], stored_entry: Optional[Dict[str, Any]]) -> bool:
+            if keep_stored:
+                return stored_entry is not None
+            return not self.needs_write(entry, stored_entry, generated)
+
+        candidates = {
+            document.id: entry for document, entry in documents
+            if unchanged(entry, stored.get(document.id))
+        }
+        if not candidates or not self._verify_unchanged():
+            return set(candidates)
+        found, _ = self.fetch_documents(list(candidates))
+        return {
+            doc_id for doc_id, data in found.items()
+            if unchanged(candidates[doc_id], self._entry_from_struct(doc_id, data))
+        }
+
+    def _verify_unchanged(self) -> bool:
+        """Whether unchanged_ids() has to confirm the catalog against the store."""
+        if REPLACE_VERIFY_UNCHANGED in ("always", "true", "1", "yes"):
+            return True
+        if REPLACE_VERIFY_UNCHANGED in ("never", "false", "0", "no"):
+            return False
+        return self.catalog.is_stale or not self.catalog.is_bootstrapped
+
+    def fetch_documents(self, doc_ids: List[str]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        GetDocument for many IDs concurrently.
+
+        Returns:
+            ({doc_id: struct data}, {doc_id: error message})
+        """
+        found: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        if not doc_ids:
+            return found, errors
+
+        def fetch(doc_id: str) -> Dict[str, Any]:
+            doc = self.doc_client.get_document(
+                request=discoveryengine.GetDocumentRequest(name=self.document_name(doc_id))
+            )
+            return dict(doc.struct_data or {})
+
+        workers = min(self.bulk_ingestion.max_concurrency, len(doc_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="document-fetch") as pool:
+            futures = [pool.submit(fetch, doc_id) for doc_id in doc_ids]
+            for doc_id, future in zip(doc_ids, futures):
+                try:
+                    found[doc_id] = future.result()
+                except Exception as e:
+                    errors[doc_id] = f"read failed: {e}"
+        return found, errors
+
+    def replace_documents(
+        self,
+        client_id: str,
+        chunks: List[str],
+        title: str,
+        category: str = "general",
+        source: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        generated_tags: Optional[List[str]] = None,
+        provisional: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Replace the stored version of `source` with `chunks`.
+
+        The new chunk IDs are diffed against the documents already stored for
+        the source: only new or re-categorized chunks are written and chunks
+        missing from the new version are bulk-deleted. With content-defined
+        chunking a small edit therefore costs a handful of writes. Stale
+        chunks are only deleted once every write succeeded, so a failed
+        replace never leaves the source with neither version.
+
+        `generated_tags` marks which of `tags` are LLM keywords; a change in
+        those alone does not rewrite unchanged chunks (see needs_write).
+
+        With `provisional` (deferred categorization), `category` and `tags` are
+        only written to new chunks: unchanged chunks keep what they are stored
+        with, and `written_document_ids` lists the chunks the deferred pass
+        has to patch.
+        """
+        if not source:
+            return {"success": False, "error": "replace requires a source"}
+
+        normalized_tags = self._normalize_tags(tags)
+        documents = self._build_chunk_documents(client_id, chunks, title, category, source, normalized_tags)
+
+        try:
+            stored = self.source_entries(client_id, source)
+            new_ids = {document.id for document, _ in documents}
+            unchanged = self.unchanged_ids(documents, stored, generated_tags, keep_stored=provisional)
+            to_write = [(document, entry) for document, entry in documents if document.id not in unchanged]
+            outcome = self.write_documents(client_id, to_write, progress=progress)
+
+            stale_ids = [doc_id for doc_id in stored if doc_id not in new_ids]
+            deleted: Dict[str, Any] = {"deleted": [], "errors": {}, "operations": []}
+            if stale_ids and not outcome["errors"]:
+                deleted = self.delete_documents(client_id, stale_ids)
+        except Exception as e:
+            print(f"Error replacing documents in Vertex AI: {e}")
+            return {"success": False, "error": str(e)}
+
+        written = set(outcome["document_ids"])
+        document_ids = [
+            doc_id for doc_id in dict.fromkeys(document.id for document, _ in documents)
+            if doc_id in written or doc_id in stored
+        ]
+        errors = [f"{doc_id}: {message}" for doc_id, message in outcome["errors"].items()]
+        errors += [f"{doc_id}: delete failed: {message}" for doc_id, message in deleted["errors"].items()]
+        print(
+            f"[VertexContextEngine] Replaced {source} for {client_id}: {len(written)} written, "
+            f"{len(unchanged)} unchanged, {len(deleted['deleted'])} deleted",
+            flush=True
+        )
+
+        if not document_ids:
+            return {
+                "success": False,
+                "error": "; ".join(errors) if errors else "No documents created"
+            }
+        return {
+            "success": True,
+            "documents_created": len(written),
+            "documents_unchanged": len(unchanged),
+            "documents_deleted": len(deleted["deleted"]),
+            "document_ids": document_ids,
+            "written_document_ids": [doc_id for doc_id in document_ids if doc_id in written],
+            "stale_document_ids": [doc_id for doc_id in stale_ids if doc_id not in deleted["deleted"]] or None,
+            "errors": errors if errors else None,
+            "failed_document_ids": list(outcome["errors"]) or None,
+            "operations": outcome["operations"] + deleted["operations"],
+            "tags": normalized_tags
+        }
+
+    def recategorize_documents(
+        self,
+        client_id: str,
+        doc_ids: List[str],
+        category: str,
+        tags: Optional[List[str]] = None,
+        expected_category: Optional[str] = None,
+        contents: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Patch `category` and `tags` onto chunks that are already stored (the
+        second half of deferred categorization), as one bulk upsert.
+
+        Chunks deleted since, or re-categorized by a later write (stored
+        category no longer `expected_category`), are left alone so the patch
+        never resurrects or overrides anything. Chunk text comes from
+        `contents` (doc ID -> text) when the caller still has it, otherwise it
+        is read back from Vertex AI.
+        """
+        self._ensure_catalog()
+        normalized_tags = self._normalize_tags(tags)
+        stored = self.catalog.entries_by_id(client_id, dict.fromkeys(doc_ids))
+        targets = {
+            doc_id: entry for doc_id, entry in stored.items()
+            if expected_category is None or entry.get("category") == expected_category
+        }
+        patch = {"category": category, "tags": normalized_tags}
+        targets = {doc_id: entry for doc_id, entry in targets.items() if self.needs_write(patch, entry)}
+
+        contents = dict(contents or {})
+        missing = [doc_id for doc_id in targets if doc_id not in contents]
+        errors: Dict[str, str] = {}
+        if missing:
+            found, errors = self.fetch_documents(missing)
+            for doc_id, data in found.items():
+                if data.get("text_chunk") is None:
+                    errors[doc_id] = "read failed: document has no text_chunk"
+                else:
+                    contents[doc_id] = data["text_chunk"]
+
+        documents = [
+            self.build_document(
+                client_id, contents[doc_id], entry.get("title"), category, entry.get("source"),
+                normalized_tags, doc_id=doc_id
+            )
+            for doc_id, entry in targets.items() if doc_id in contents
+        ]
+        try:
+            outcome = self.write_documents(client_id, documents)
+        except Exception as e:
+            print(f"Error recategorizing documents in Vertex AI: {e}")
+            return {"success": False, "error": str(e)}
+        errors.update(outcome["errors"])
+        return {
+            "success": not errors,
+            "documents_updated": len(outcome["document_ids"]),
+            "documents_skipped": len(set(doc_ids)) - len(targets),
+            "errors": errors or None,
+        }
+
+
+class AsyncVertexContextEngine:
+    """
+    Async counterpart of VertexContextEngine for FastAPI `async def` routes.
+
+    Search and single-document RPCs go through the grpc.aio clients
+    (SearchServiceAsyncClient / DocumentServiceAsyncClient), so hundreds of
+    in-flight requests share one event loop instead of threadpool slots.
+    Configuration, phase mapping, request building and the document catalog
+    are shared with the wrapped sync engine; any attribute not defined here
+    falls through to it.
+    """
+
+    def __init__(self, engine: Optional[VertexContextEngine] = None):
+        self.engine = engine or VertexContextEngine()
+        # grpc.aio clients bind to the running event loop, so create lazily
+        self._client: Optional[discoveryengine.SearchServiceAsyncClient] = None
+        self._doc_client: Optional[discoveryengine.DocumentServiceAsyncClient] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.engine, name)
+
+    @property
+    def client(self) -> discoveryengine.SearchServiceAsyncClient:
+        if self._client is None:
+            self._client = instrument_client(discoveryengine.SearchServiceAsyncClient(
+                client_options=self.engine.client_options
+            ), "vertex_search", VERTEX_SEARCH_METHODS)
+        return self._client
+
+    @property
+    def doc_client(self) -> discoveryengine.DocumentServiceAsyncClient:
+        if self._doc_client is None:
+            self._doc_client = instrument_client(discoveryengine.DocumentServiceAsyncClient(
+                client_options=self.engine.client_options
+            ), "vertex_documents", VERTEX_DOCUMENT_METHODS)
+        return self._doc_client
+
+    async def close(self):
+        """Close the grpc.aio channels (called on app shutdown)."""
+        for client in (self._client, self._doc_client):
+            if client is not None:
+                await client.transport.close()
+        self._client = None
+        self._doc_client = None
+
+    async def _ensure_catalog(self):
+        if not self.engine.catalog.is_bootstrapped:
+            await asyncio.to_thread(self.engine._ensure_catalog)
+
+    async def search(self, request: RAGSearchRequest, use_cache: bool = True) -> List[RAGResult]:
+        """Execute a search against Vertex AI without blocking the event loop."""
+        try:
+            return await self.search_or_raise(request, use_cache=use_cache)
+        except Exception as e:
+            print(f"Vertex Search Error: {e}")
+            return []
+
+    async def search_or_raise(self, request: RAGSearchRequest, use_cache: bool = True) -> List[RAGResult]:
+        """Like search(), but Vertex AI errors propagate to the caller."""
+        cache = self.engine.search_cache
+        cache_key = None
+        if use_cache:
+            cache_key = cache.key_for(request)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+        else:
+            cache.record_bypass()
+
+        req = self.engine.build_search_request(request)
+        response = await self.client.search(req)
+
+        # The async pager only holds the first page; page_size == k so that is all we need
+        results = self.engine.parse_search_results(response.results)
+        if cache_key is not None:
+            cache.set(cache_key, results)
+        return results
+
+    async def search_many(
+        self,
+        requests: List[RAGSearchRequest],
+        max_concurrency: int = 8,
+        use_cache: bool = True
+    ) -> List[Tuple[List[RAGResult], Optional[str], float, bool]]:
+        """
+        Run several searches concurrently with bounded parallelism.
+
+        Identical requests (same normalized signature) are executed once.
+        Returns one (results, error, latency_ms, deduplicated) tuple per
+        request, in request order.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        unique: Dict[Tuple, int] = {}
+        first_index: List[int] = []
+        for i, request in enumerate(requests):
+            first_index.append(unique.setdefault(request_signature(request), i))
+
+        async def run(request: RAGSearchRequest):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    results = await self.search_or_raise(request, use_cache=use_cache)
+                    error = None
+                except Exception as e:
+                    print(f"Vertex Search Error: {e}")
+                    results, error = [], str(e)
+                return results, error, round((time.perf_counter() - started) * 1000, 2)
+
+        unique_indices = sorted(set(first_index))
+        outcomes = await asyncio.gather(*(run(requests[i]) for i in unique_indices))
+        by_index = dict(zip(unique_indices, outcomes))
+
+        return [
+            (*by_index[first_index[i]], first_index[i] != i)
+            for i in range(len(requests))
+        ]
+
+    async def list_documents(
+        self,
+        client_id: str,
+        page: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        await self._ensure_catalog()
+        return self.engine.list_documents(client_id, page, limit, cursor=cursor, fields=fields)
+
+    async def get_client_document_count(self, client_id: str) -> int:
+        await self._ensure_catalog()
+        return self.engine.get_client_document_count(client_id)
+
+    async def get_client_document_counts(self, client_ids: List[str]) -> Dict[str, int]:
+        await self._ensure_catalog()
+        return self.engine.get_client_document_counts(client_ids)
+
+    async def get_client_stats(self, client_id: str) -> Dict[str, Any]:
+        await self._ensure_catalog()
+        return self.engine.get_client_stats(client_id)
+
+    async def create_document(
+        self,
+        client_id: str,
+        content: str,
+        title: Optional[str] = None,
+        category: str = "general",
+        source: Optional[str] = None,
+        tags: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Create a new document in Vertex AI data store."""
+        try:
+            display_title = title or f"{client_id} - {category}"
+            normalized_tags = self.engine._normalize_tags(tags)
+            document, entry = self.engine.build_document(
+                client_id, content, display_title, category, source, normalized_tags
+            )
+            request = discoveryengine.CreateDocumentRequest(
+                parent=self.engine.branch_path,
+                document=document,
+                document_id=document.id
+            )
+            await self.doc_client.create_document(request=request)
+            self.engine.record_documents_written(client_id, [entry])
+
+            return {
+                "success": True,
+                "document_id": document.id,
+                "title": display_title,
+                "client_id": client_id,
+                "category": category,
+                "tags": normalized_tags,
+                "size": len(content)
+            }
+        except Exception as e:
+            print(f"Error creating document in Vertex AI: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def get_document(self, doc_id: str) -> Dict[str, Any]:
+        """Get a single document from Vertex AI data store with full content."""
+        try:
+            request = discoveryengine.GetDocumentRequest(name=self.engine.document_name(doc_id))
+            doc = await self.doc_client.get_document(request=request)
+            document = self.engine.document_to_dict(doc_id, doc)
+            if document:
+                return {"success": True, "document": document}
+            return {"success": False, "error": "Document has no structured data"}
+        except Exception as e:
+            print(f"[get_document] Error getting document from Vertex AI: {e}", flush=True)
+            return {"success": False, "error": str(e)}
+
+    async def delete_document(self, doc_id: str, client_id: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a document from Vertex AI data store."""
+        try:
+            request = discoveryengine.DeleteDocumentRequest(name=self.engine.document_name(doc_id))
+            await self.doc_client.delete_document(request=request)
+            self.engine.record_document_deleted(doc_id, client_id)
+            return {"success": True, "document_id": doc_id}
+        except Exception as e:
+            print(f"Error deleting document from Vertex AI: {e}")
+            return {"success": False, "error": str(e)}
+
+    async def export_documents(
+        self,
+        client_id: str,
+        cursor: Optional[str] = None,
+        batch_size: int = EXPORT_PAGE_SIZE
+    ) -> AsyncIterator[Tuple[Dict[str, Any], str]]:
+        """
+        Stream every document of a client with full content, one batch in
+        memory at a time.
+
+        The client's document IDs come from the catalog in sorted order and are
+        fetched in batches of `batch_size` with concurrent GetDocument calls,
+        so an export costs one read per document of that client rather than a
+        scan of the whole data store. Documents deleted since the catalog
+        snapshot are skipped; a stale catalog is exported as is while it
+        refreshes in the background (see VertexContextEngine._ensure_catalog).
+
+        Yields (document, cursor) pairs; the cursor holds the document's ID, and
+        passing it back resumes with the next ID. Raises InvalidCursor for a
+        bad cursor or one of another client.
+        """
+        after = self.engine.export_position(client_id, cursor)
+        await asyncio.to_thread(self.engine._ensure_catalog)
+        doc_ids = self.engine.catalog.doc_ids(client_id, after=after)
+        semaphore = asyncio.Semaphore(self.engine.bulk_ingestion.max_concurrency)
+
+        async def fetch(doc_id: str):
+            async with semaphore:
+                request = discoveryengine.GetDocumentRequest(name=self.engine.document_name(doc_id))
+                try:
+                    return await self.doc_client.get_document(request=request)
+                except google_exceptions.NotFound:
+                    return None
+
+        for start in range(0, len(doc_ids), batch_size):
+            batch = doc_ids[start:start + batch_size]
+            docs = await asyncio.gather(*(fetch(doc_id) for doc_id in batch))
+            for doc_id, doc in zip(batch, docs):
+                if doc is None or not doc.struct_data or doc.struct_data.get("client_id") != client_id:
+                    continue
+                document = self.engine.document_to_dict(doc_id, doc)
+                yield document, encode_cursor({"k": "export", "c": client_id, "a": doc_id})
+
+    async def import_documents(self, *args, **kwargs) -> Dict[str, Any]:
+        """Import multiple chunks; runs the sync importer off the event loop."""
+        return await asyncio.to_thread(self.engine.import_documents, *args, **kwargs)
+
+    async def replace_documents(self, *args, **kwargs) -> Dict[str, Any]:
+        """Incrementally replace a source; runs off the event loop."""
+        return await asyncio.to_thread(self.engine.replace_documents, *args, **kwargs)
+
+    async def recategorize_documents(self, *args, **kwargs) -> Dict[str, Any]:
+        """Patch category/tags on stored chunks; runs off the event loop."""
+        return await asyncio.to_thread(self.engine.recategorize_documents, *args, **kwargs)
+
+
 # Factory function required by main.py
 def get_vertex_engine():
     return VertexContextEngine()
+
+def get_async_vertex_engine(engine: Optional[VertexContextEngine] = None):
+    return AsyncVertexContextEngine(engine)
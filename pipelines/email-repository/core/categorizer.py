@@ -14,6 +14,8 @@ from dataclasses import dataclass
 
 import google.generativeai as genai
 
+from app.services.metrics import instrument_client, GEMINI_METHODS
+
 logger = logging.getLogger(__name__)
 
 
@@ -112,13 +114,13 @@ class EmailCategorizer:
         """
         genai.configure(api_key=api_key)
 
-        self.model = genai.GenerativeModel(
+        self.model = instrument_client(genai.GenerativeModel(
             model_name=model_name,
             generation_config=genai.GenerationConfig(
                 temperature=temperature,
                 max_output_tokens=max_output_tokens
             )
-        )
+        ), "gemini", GEMINI_METHODS)
 
         logger.info(f"EmailCategorizer initialized with model: {model_name}")
 
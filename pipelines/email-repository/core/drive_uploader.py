@@ -16,6 +16,8 @@ from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
+from app.services.metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +32,9 @@ class UploadResult:
     folder_path: Optional[str] = None
 
 
+@instrument_methods("drive", include=(
+    "upload_screenshot", "upload_batch", "list_folder_contents", "get_folder_stats", "delete_file"
+))
 class DriveUploader:
     """
     Upload email screenshots to Google Drive with organized folder structure.
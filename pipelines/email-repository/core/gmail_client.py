@@ -17,6 +17,8 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.services.metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,6 +52,7 @@ class EmailMessage:
         }
 
 
+@instrument_methods("gmail", include=("list_emails", "get_email_html", "get_email_count", "get_labels"))
 class GmailClient:
     """
     Gmail API client with domain-wide delegation for Google Groups access.
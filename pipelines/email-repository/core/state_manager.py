@@ -10,9 +10,17 @@ from datetime import datetime, timezone
 from typing import Dict, Optional, List, Any
 from google.cloud import firestore
 
+from app.services.metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_methods("firestore", include=(
+    "get_last_sync_time", "update_sync_state", "is_email_processed", "get_processed_email",
+    "mark_email_processed", "mark_email_skipped", "get_processing_stats", "get_sync_history",
+    "get_emails_by_category", "get_emails_by_date_range", "clear_account_state",
+    "get_processing_log",
+))
 class EmailSyncStateManager:
     """
     Manages email sync state in Firestore for incremental processing.
@@ -11,6 +11,7 @@ import re
 
 from app.client_id import normalize_client_id, is_canonical_client_id
 from app.services.vertex_search import get_vertex_engine
+from app.services.metrics import instrument_client, instrumented_transport, BIGQUERY_METHODS
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/figma-feedback", tags=["Figma Feedback"])
@@ -43,7 +44,7 @@ GCP_PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT", "emailpilot-438321")
 
 try:
     from google.cloud import bigquery
-    BQ_CLIENT = bigquery.Client(project=GCP_PROJECT_ID)
+    BQ_CLIENT = instrument_client(bigquery.Client(project=GCP_PROJECT_ID), "bigquery", BIGQUERY_METHODS)
     BQ_AVAILABLE = True
     logger.info(f"✅ BigQuery client initialized for project {GCP_PROJECT_ID}")
 except Exception as e:
@@ -368,7 +369,7 @@ async def fetch_figma_comments_api(file_key: str, token: str) -> List[Dict]:
     url = f"{FIGMA_API_BASE}/files/{file_key}/comments"
     headers = {"X-Figma-Token": token}
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("figma")) as client:
         response = await client.get(url, headers=headers)
 
         if response.status_code == 401:
@@ -465,7 +466,7 @@ async def push_comments_to_firestore(client_id: str, file_key: str, comments: Li
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("orchestrator")) as client:
             response = await client.post(
                 f"{ORCHESTRATOR_URL}/api/design-feedback/ingest",
                 headers={
@@ -622,7 +623,7 @@ async def check_figma_token():
         }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        async with httpx.AsyncClient(timeout=10.0, transport=instrumented_transport("figma")) as client:
             response = await client.get(
                 f"{FIGMA_API_BASE}/me",
                 headers={"X-Figma-Token": FIGMA_API_TOKEN}
@@ -667,7 +668,7 @@ def parse_figma_file_key(url: str) -> Optional[str]:
 
 async def get_asana_workspace_id(token: str) -> str:
     """Get the first Asana workspace ID."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("asana")) as client:
         response = await client.get(
             f"{ASANA_API_BASE}/workspaces",
             headers={"Authorization": f"Bearer {token}"}
@@ -683,7 +684,7 @@ async def get_asana_workspace_id(token: str) -> str:
 
 async def get_asana_projects(token: str, workspace_id: str) -> List[Dict]:
     """Get all projects in a workspace."""
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("asana")) as client:
         response = await client.get(
             f"{ASANA_API_BASE}/projects",
             headers={"Authorization": f"Bearer {token}"},
@@ -701,7 +702,7 @@ async def get_done_tasks_for_project(token: str, project_gid: str, lookback_days
     all_tasks = []
     offset = None
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
+    async with httpx.AsyncClient(timeout=60.0, transport=instrumented_transport("asana")) as client:
         while True:
             params = {
                 "project": project_gid,
@@ -10,6 +10,8 @@ import httpx
 
 from .best_practices import EmailReviewReport
 
+from app.services.metrics import instrumented_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,7 +152,7 @@ class AsanaResultPoster:
         comment_text = self._format_report_as_comment(report, rag_ui_url)
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with httpx.AsyncClient(timeout=self.timeout, transport=instrumented_transport("asana")) as client:
                 # Post comment via orchestrator's Asana endpoint
                 response = await client.post(
                     f"{self.orchestrator_url}/api/asana/tasks/{asana_task_gid}/comment",
@@ -202,7 +204,7 @@ class AsanaResultPoster:
             Result with success status
         """
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with httpx.AsyncClient(timeout=self.timeout, transport=instrumented_transport("asana")) as client:
                 response = await client.put(
                     f"{self.orchestrator_url}/api/asana/tasks/{asana_task_gid}",
                     json={
@@ -14,6 +14,8 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 import httpx
 
+from app.services.metrics import instrumented_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -120,7 +122,8 @@ class FigmaClient:
                     "X-Figma-Token": self.access_token,
                     "Content-Type": "application/json"
                 },
-                timeout=self.timeout
+                timeout=self.timeout,
+                transport=instrumented_transport("figma")
             )
         return self._client
 
@@ -256,7 +259,7 @@ class FigmaClient:
             return None
 
         # Download the image
-        async with httpx.AsyncClient(timeout=60) as download_client:
+        async with httpx.AsyncClient(timeout=60, transport=instrumented_transport("figma")) as download_client:
             response = await download_client.get(image_url)
             response.raise_for_status()
             return response.content
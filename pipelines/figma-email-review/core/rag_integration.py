@@ -12,6 +12,8 @@ from pydantic import BaseModel, Field
 import httpx
 import google.generativeai as genai
 
+from app.services.metrics import instrument_client, instrumented_transport, GEMINI_METHODS
+
 logger = logging.getLogger(__name__)
 
 
@@ -116,7 +118,7 @@ Analyze now:"""
 
         if gemini_api_key:
             genai.configure(api_key=gemini_api_key)
-            self.model = genai.GenerativeModel(gemini_model)
+            self.model = instrument_client(genai.GenerativeModel(gemini_model), "gemini", GEMINI_METHODS)
         else:
             self.model = None
 
@@ -139,7 +141,7 @@ Analyze now:"""
         Returns:
             List of RAGResult objects
         """
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with httpx.AsyncClient(timeout=self.timeout, transport=instrumented_transport("rag")) as client:
             try:
                 response = await client.post(
                     f"{self.base_url}/api/rag/search",
@@ -169,6 +171,46 @@ Analyze now:"""
                 logger.error(f"RAG search failed: {e}")
                 return []
 
+    async def search_rag_batch(
+        self,
+        searches: List[Dict[str, Any]]
+    ) -> Optional[List[List[RAGResult]]]:
+        """
+        Run several searches in one round trip via /api/rag/search/batch.
+
+        Args:
+            searches: List of dicts with query, client_id, phase and k
+
+        Returns:
+            One result list per search (in order), or None if the batch call failed
+        """
+        async with httpx.AsyncClient(timeout=self.timeout, transport=instrumented_transport("rag")) as client:
+            try:
+                response = await client.post(
+                    f"{self.base_url}/api/rag/search/batch",
+                    json={"requests": searches}
+                )
+                response.raise_for_status()
+                data = response.json()
+            except httpx.HTTPError as e:
+                logger.warning(f"RAG batch search failed: {e}")
+                return None
+
+        batches = []
+        for item in data.get("results", []):
+            if item.get("error"):
+                logger.warning(f"RAG batch sub-search {item.get('index')} failed: {item['error']}")
+            batches.append([
+                RAGResult(
+                    content=result.get("content", ""),
+                    metadata=result.get("metadata", {}),
+                    relevance_score=result.get("relevance_score", 0.0),
+                    source=result.get("metadata", {}).get("source")
+                )
+                for result in item.get("results", [])
+            ])
+        return batches
+
     async def get_brand_voice(self, client_id: str) -> List[RAGResult]:
         """
         Fetch brand voice guidelines from RAG.
@@ -179,21 +221,23 @@ Analyze now:"""
         Returns:
             List of brand voice related documents
         """
-        # Search for brand voice related content
-        results = await self.search_rag(
-            query="brand voice guidelines tone messaging style personality",
-            client_id=client_id,
-            phase="STRATEGY",
-            k=5
-        )
-
-        # Also search for brand pillars and values
-        additional = await self.search_rag(
-            query="brand pillars values mission key messages",
-            client_id=client_id,
-            phase="STRATEGY",
-            k=3
-        )
+        searches = [
+            # Brand voice related content
+            {"query": "brand voice guidelines tone messaging style personality",
+             "client_id": client_id, "phase": "STRATEGY", "k": 5},
+            # Brand pillars and values
+            {"query": "brand pillars values mission key messages",
+             "client_id": client_id, "phase": "STRATEGY", "k": 3},
+        ]
+
+        # One round trip when the RAG service supports batching
+        batched = await self.search_rag_batch(searches)
+        if batched is not None and len(batched) == len(searches):
+            results, additional = batched
+        else:
+            results, additional = await asyncio.gather(
+                *(self.search_rag(**search) for search in searches)
+            )
 
         # Combine and deduplicate
         seen_content = set()
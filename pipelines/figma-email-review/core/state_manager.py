@@ -12,9 +12,15 @@ from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
 from google.cloud import firestore
 
+from app.services.metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_methods("firestore", include=(
+    "get_last_review_time", "get_last_reviewed_version", "update_file_state", "save_review_result",
+    "get_review", "get_review_history", "get_file_stats", "clear_client_state",
+))
 class FigmaReviewStateManager:
     """
     Manages review state in Firestore.
@@ -17,6 +17,8 @@ from datetime import datetime
 from pydantic import BaseModel, Field
 import google.generativeai as genai
 
+from app.services.metrics import instrument_client, GEMINI_METHODS
+
 logger = logging.getLogger(__name__)
 
 
@@ -215,7 +217,7 @@ Analyze the email image now:"""
 
         # Configure the API
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+        self.model = instrument_client(genai.GenerativeModel(model_name), "gemini", GEMINI_METHODS)
 
     async def analyze_email_design(
         self,
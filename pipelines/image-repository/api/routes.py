@@ -10,6 +10,7 @@ from typing import Dict, Any, Optional, List
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Response
 from pydantic import BaseModel, Field
 from app.client_id import normalize_client_id, is_canonical_client_id
+from app.services.json_response import FastJSONResponse
 import os
 import importlib
 
@@ -966,12 +967,13 @@ async def search_images(
                 "text_chunk": data.get("text_chunk", "")[:300] + "..." if len(data.get("text_chunk", "")) > 300 else data.get("text_chunk", ""),
             })
 
-        return {
+        # Plain dicts: skip re-validating them against the return annotation
+        return FastJSONResponse({
             "client_id": client_id,
             "query": q,
             "total": len(images),
             "images": images
-        }
+        })
 
     except Exception as e:
         logger.error(f"Image search failed for {client_id}: {e}")
@@ -10,6 +10,8 @@ import logging
 from typing import Optional, Dict, Any, List
 import httpx
 
+from .metrics import instrumented_transport
+
 logger = logging.getLogger(__name__)
 
 # Required scopes for Drive folder access
@@ -71,7 +73,7 @@ class ClerkOAuthClient:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
+            async with httpx.AsyncClient(timeout=10.0, transport=instrumented_transport("clerk")) as client:
                 response = await client.get(url, headers=headers)
 
                 if response.status_code == 404:
@@ -14,9 +14,14 @@ from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from googleapiclient.http import MediaIoBaseDownload
 
+from .metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_methods("drive", include=(
+    "list_images_in_folder", "download_image_bytes", "get_file_metadata", "get_folder_info", "verify_folder_access"
+))
 class GoogleDriveClient:
     """
     Google Drive client for image discovery using service account auth.
@@ -0,0 +1,32 @@
+"""
+Upstream metrics hooks for the core modules.
+
+Inside the RAG service these are app.services.metrics. The standalone Cloud
+Function (cloud_function/) ships without the RAG app, so there they fall back
+to no-ops and the core modules run uninstrumented.
+"""
+
+from typing import Any, Callable, Iterable
+
+import httpx
+
+try:
+    from app.services.metrics import (
+        GEMINI_METHODS,
+        instrument_client,
+        instrument_methods,
+        instrumented_transport,
+    )
+except ImportError:
+    GEMINI_METHODS = ("generate_content", "generate_content_async", "count_tokens", "count_tokens_async")
+
+    def instrument_methods(upstream: str, include: Iterable[str]) -> Callable:
+        return lambda cls: cls
+
+    def instrument_client(client: Any, upstream: str, methods: Iterable[str]) -> Any:
+        return client
+
+    def instrumented_transport(upstream: str, **transport_kwargs) -> httpx.AsyncHTTPTransport:
+        return httpx.AsyncHTTPTransport(**transport_kwargs)
+
+__all__ = ["GEMINI_METHODS", "instrument_client", "instrument_methods", "instrumented_transport"]
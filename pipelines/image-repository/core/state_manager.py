@@ -9,9 +9,16 @@ from datetime import datetime, timezone
 from typing import Dict, Optional, List, Any
 from google.cloud import firestore
 
+from .metrics import instrument_methods
+
 logger = logging.getLogger(__name__)
 
 
+@instrument_methods("firestore", include=(
+    "get_last_sync_time", "update_sync_state", "is_file_processed", "needs_reprocessing",
+    "mark_file_processed", "mark_file_skipped", "get_processing_stats", "get_folder_sync_history",
+    "get_processing_log", "clear_client_state",
+))
 class ImageSyncStateManager:
     """
     Manages sync state in Firestore to enable incremental processing.
@@ -11,6 +11,8 @@ import asyncio
 from typing import Dict, List, Optional, Any
 from PIL import Image
 
+from .metrics import instrument_client, GEMINI_METHODS
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,7 +75,7 @@ class GeminiVisionService:
         import google.generativeai as genai
 
         genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
+        self.model = instrument_client(genai.GenerativeModel(model_name), "gemini", GEMINI_METHODS)
         self.max_concurrent = max_concurrent
 
         # Safety settings to allow marketing content
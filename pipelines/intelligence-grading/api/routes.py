@@ -174,11 +174,11 @@ async def _fetch_client_documents(client_id: str, include_api_data: bool = True)
             all_documents = await _fetch_documents_from_firestore(client_id)
         else:
             # List all documents for this client
-            page = 1
+            cursor = ""
             all_documents = []
 
             while True:
-                result = engine.list_documents(client_id, page=page, limit=100)
+                result = engine.list_documents(client_id, limit=100, cursor=cursor)
                 docs = result.get("documents", [])
 
                 if not docs:
@@ -206,11 +206,9 @@ async def _fetch_client_documents(client_id: str, include_api_data: bool = True)
                     })
 
                 # Check pagination
-                total = result.get("total", 0)
-                limit = result.get("limit", 100)
-                if page * limit >= total:
+                cursor = result.get("next_cursor")
+                if not cursor:
                     break
-                page += 1
 
         logger.info(f"Fetched {len(all_documents)} documents for client {client_id}")
 
@@ -326,11 +324,12 @@ async def _fetch_klaviyo_flows(client_id: str) -> Optional[Dict[str, Any]]:
     try:
         import httpx
         import os
+        from app.services.metrics import instrumented_transport
 
         # Try orchestrator's MCP proxy
         orchestrator_url = os.environ.get("ORCHESTRATOR_URL", "http://localhost:8001")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("orchestrator")) as client:
             # Call MCP get_flows tool via HTTP bridge
             response = await client.post(
                 f"{orchestrator_url}/api/mcp/tools/get_flows",
@@ -385,10 +384,11 @@ async def _fetch_product_data(client_id: str) -> List[Dict[str, Any]]:
     try:
         import httpx
         import os
+        from app.services.metrics import instrumented_transport
 
         product_url = os.environ.get("PRODUCT_SERVICE_URL", "http://localhost:8004")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with httpx.AsyncClient(timeout=30.0, transport=instrumented_transport("product_service")) as client:
             # Fetch product velocity data
             response = await client.get(
                 f"{product_url}/api/v1/clients/{client_id}/product-velocity",
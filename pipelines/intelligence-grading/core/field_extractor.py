@@ -10,6 +10,8 @@ import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 
+from app.services.metrics import instrument_client, GEMINI_METHODS
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,7 +52,7 @@ class FieldExtractor:
             try:
                 import google.generativeai as genai
                 genai.configure(api_key=self.api_key)
-                self._model = genai.GenerativeModel('gemini-2.0-flash')
+                self._model = instrument_client(genai.GenerativeModel('gemini-2.0-flash'), "gemini", GEMINI_METHODS)
                 logger.info("Initialized Gemini model for field extraction")
             except ImportError:
                 logger.warning("google-generativeai not installed, using keyword-based extraction only")
@@ -6,6 +6,7 @@ import os
 import json
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
+from app.services.metrics import instrument_client, GEMINI_METHODS
 
 load_dotenv()
 
@@ -21,7 +22,7 @@ class SmartProcessor:
         self.model = None
         if self.api_key:
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel("gemini-1.5-flash")
+            self.model = instrument_client(genai.GenerativeModel("gemini-1.5-flash"), "gemini", GEMINI_METHODS)
 
     async def process_transcript(self, transcript_text: str, metadata: Dict) -> Optional[Dict[str, Any]]:
         """
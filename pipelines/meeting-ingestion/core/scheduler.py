@@ -5,6 +5,7 @@ Manages initial 60-day scans and weekly recurring scans.
 import os
 from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
+from app.services.metrics import instrument_methods
 
 try:
     from google.cloud import firestore
@@ -13,6 +14,10 @@ except ImportError:
     FIRESTORE_AVAILABLE = False
 
 
+@instrument_methods("firestore", include=(
+    "get_user_state", "mark_initial_scan_started", "mark_client_scanned",
+    "mark_initial_scan_completed", "get_users_due_for_weekly_scan",
+))
 class ScanStateManager:
     """
     Tracks scan state per user in Firestore.
@@ -0,0 +1,146 @@
+"""
+Benchmark the chunking engine against the legacy chunk_text implementation.
+
+Usage:
+    python scripts/benchmark_chunker.py [--sizes-mb 1 20] [--repeat 3]
+
+Reports wall time, throughput, chunk counts, largest chunk and how much of the
+input text survives chunking for these text shapes: regular paragraphs,
+extracted-PDF style text without blank lines, a mix of both, and two shapes
+without sentence punctuation that exercise the whitespace cuts: a CSV export
+and one long paragraph.
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+current_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.services.chunking import iter_chunks, IncrementalChunker
+
+WORDS = (
+    "brand voice customer email campaign subject line launch product offer "
+    "seasonal loyalty segment audience tone friendly bold premium story"
+).split()
+
+
+def legacy_chunk_text(text, min_chunk_size=100, max_chunk_size=2000):
+    """chunk_text as it was before the chunking engine (kept for comparison)."""
+    paragraphs = text.split("\n\n")
+
+    chunks = []
+    current_chunk = ""
+
+    for para in paragraphs:
+        para = para.strip()
+        if not para:
+            continue
+
+        if len(current_chunk) + len(para) > max_chunk_size and current_chunk:
+            if len(current_chunk) >= min_chunk_size:
+                chunks.append(current_chunk.strip())
+            current_chunk = para
+        else:
+            current_chunk += "\n\n" + para if current_chunk else para
+
+    if current_chunk and len(current_chunk) >= min_chunk_size:
+        chunks.append(current_chunk.strip())
+
+    if not chunks and text.strip():
+        chunks.append(text.strip())
+
+    return chunks
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 24))).capitalize() + rng.choice(".!?")
+
+
+def make_text(size_bytes, shape, seed=42):
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        if shape == "csv":
+            # Spreadsheet export: one row per line, no punctuation, no blank lines
+            row = len(parts)
+            block = f"{row},sku-{row},{' '.join(rng.choice(WORDS) for _ in range(3))},{rng.randint(1, 500)}.99\n"
+        elif shape == "paragraph":
+            # A single paragraph of unpunctuated words
+            block = " ".join(rng.choice(WORDS) for _ in range(200)) + " "
+        elif shape == "paragraphs" or (shape == "mixed" and rng.random() < 0.7):
+            # Mostly normal paragraphs plus some short headings
+            count = rng.choice([1, 3, 6, 12])
+            block = " ".join(sentence(rng) for _ in range(count)) + "\n\n"
+        else:
+            # pypdf-style output: lines joined with single newlines, no blank lines
+            block = "\n".join(sentence(rng) for _ in range(200)) + "\n"
+        parts.append(block)
+        total += len(block)
+    return "".join(parts)
+
+
+def measure(fn, repeat):
+    best = None
+    chunks = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        chunks = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, chunks
+
+
+def retained_chars(text, chunks):
+    """Non-whitespace characters of the input that appear in the output."""
+    kept = sum(len("".join(c.split())) for c in chunks)
+    total = len("".join(text.split()))
+    return kept / total if total else 1.0
+
+
+def run(size_mb, shape, repeat):
+    text = make_text(int(size_mb * 1024 * 1024), shape)
+
+    def streamed():
+        # Fed in 4KB pieces, the way page-by-page ingestion feeds it
+        chunker = IncrementalChunker()
+        out = []
+        for start in range(0, len(text), 4096):
+            out.extend(chunker.feed(text[start:start + 4096]))
+        out.extend(chunker.finish())
+        return out
+
+    candidates = [
+        ("legacy chunk_text", lambda: legacy_chunk_text(text)),
+        ("iter_chunks", lambda: list(iter_chunks(text))),
+        ("iter_chunks content-def", lambda: list(iter_chunks(text, content_defined=True))),
+        ("IncrementalChunker 4KB", streamed),
+    ]
+    print(f"\n{size_mb:g} MB, {shape} ({len(text):,} chars)")
+    print(f"  {'implementation':<24}{'time':>10}{'MB/s':>10}{'chunks':>10}{'max chunk':>12}{'retained':>10}")
+    for name, fn in candidates:
+        elapsed, chunks = measure(fn, repeat)
+        print(
+            f"  {name:<24}{elapsed * 1000:>8.0f}ms{size_mb / elapsed:>10.1f}{len(chunks):>10,}"
+            f"{max(len(c) for c in chunks):>12,}{retained_chars(text, chunks):>10.2%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 20])
+    parser.add_argument("--shapes", nargs="+", default=["paragraphs", "pdf", "mixed", "csv", "paragraph"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size_mb in args.sizes_mb:
+        for shape in args.shapes:
+            run(size_mb, shape, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Benchmark request latency through the auth + tracking middleware stack.
+
+Usage:
+    python scripts/benchmark_middleware.py [--requests 5000] [--concurrency 50]
+
+Compares the previous stack (GlobalAuthMiddleware on BaseHTTPMiddleware plus
+an @app.middleware("http") tracking layer that wrote os.environ) with the
+current single pure-ASGI GlobalAuthMiddleware. Requests authenticate with the
+internal service key so no JWKS fetch is involved, and are driven straight
+through the ASGI interface (no HTTP server or client in the measurement).
+Reports sequential mean/p50/p99 latency and concurrent throughput for a small
+JSON route, and time to first body byte for a streamed response.
+"""
+
+import argparse
+import asyncio
+import hmac
+import os
+import pathlib
+import statistics
+import sys
+import time
+
+current_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+SERVICE_KEY = "benchmark-key"
+os.environ["GLOBAL_AUTH_ENABLED"] = "true"
+os.environ["INTERNAL_SERVICE_KEY"] = SERVICE_KEY
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware import GlobalAuthMiddleware, INTERNAL_SERVICE_USER
+from app.services.ai.tracker import _tracking_context, get_current_tracking_context
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The internal-key path of GlobalAuthMiddleware before it became pure ASGI."""
+
+    async def dispatch(self, request: Request, call_next):
+        svc_key = request.headers.get("X-Internal-Service-Key")
+        if svc_key and hmac.compare_digest(svc_key, SERVICE_KEY):
+            request.state.user = INTERNAL_SERVICE_USER
+        return await call_next(request)
+
+
+class LegacyTrackingContext:
+    """TrackingContext as it was: ContextVar plus per-request os.environ writes."""
+
+    def __init__(self, user_id=None, org_id=None):
+        self.metadata = {k: v for k, v in {"user_id": user_id, "org_id": org_id}.items() if v is not None}
+        self.token = None
+
+    async def __aenter__(self):
+        self.token = _tracking_context.set({**_tracking_context.get(), **self.metadata})
+        if "user_id" in self.metadata:
+            os.environ["LANGCHAIN_METADATA_USER_ID"] = self.metadata["user_id"]
+        if "org_id" in self.metadata:
+            os.environ["LANGCHAIN_METADATA_ORG_ID"] = self.metadata["org_id"]
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        _tracking_context.reset(self.token)
+        os.environ.pop("LANGCHAIN_METADATA_USER_ID", None)
+        os.environ.pop("LANGCHAIN_METADATA_ORG_ID", None)
+
+
+def add_routes(app: FastAPI):
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True, "tracking": get_current_tracking_context()}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def body():
+            for _ in range(20):
+                yield b"x" * 1024
+                await asyncio.sleep(0.001)
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+
+def legacy_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(LegacyAuthMiddleware)
+
+    @app.middleware("http")
+    async def tracking_context_middleware(request: Request, call_next):
+        user = getattr(request.state, "user", None) or {}
+        async with LegacyTrackingContext(user_id=user.get("user_id"), org_id=user.get("org_id")):
+            return await call_next(request)
+
+    add_routes(app)
+    return app
+
+
+def current_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(GlobalAuthMiddleware)
+    add_routes(app)
+    return app
+
+
+async def call(app: FastAPI, path: str):
+    """One request straight through the ASGI app; returns (total, time to first body byte)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-internal-service-key", SERVICE_KEY.encode())],
+        "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    status = None
+    first_byte = None
+    request_sent = False
+    response_done = asyncio.Event()
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, first_byte
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            return
+        if message.get("body") and first_byte is None:
+            first_byte = time.perf_counter() - start
+        if not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    assert status == 200, status
+    return time.perf_counter() - start, first_byte
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int):
+    for _ in range(200):  # warm up
+        await call(app, "/api/ping")
+
+    latencies = [(await call(app, "/api/ping"))[0] for _ in range(requests)]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call(app, "/api/ping")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    throughput = requests / (time.perf_counter() - start)
+
+    first_bytes = [(await call(app, "/api/stream"))[1] for _ in range(50)]
+    return throughput, latencies, first_bytes
+
+
+def report(name: str, throughput: float, latencies, first_bytes):
+    latencies = sorted(latencies)
+    print(
+        f"{name:<10} mean {statistics.mean(latencies) * 1e6:7.1f} us"
+        f"  p50 {latencies[len(latencies) // 2] * 1e6:7.1f} us"
+        f"  p99 {latencies[int(len(latencies) * 0.99)] * 1e6:7.1f} us"
+        f"  {throughput:>7.0f} req/s concurrent"
+        f"  stream TTFB {statistics.median(first_bytes) * 1e6:7.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, factory in (("legacy", legacy_app), ("pure-asgi", current_app)):
+        throughput, latencies, first_bytes = asyncio.run(measure(factory(), args.requests, args.concurrency))
+        report(name, throughput, latencies, first_bytes)
+
+
+if __name__ == "__main__":
+    main()
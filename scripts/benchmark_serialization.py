@@ -0,0 +1,215 @@
+"""
+Benchmark JSON serialization and response compression for the hot routes.
+
+Usage:
+    python scripts/benchmark_serialization.py [--requests 2000]
+
+Builds two apps serving the same payloads as /api/rag/search (20 results of
+2000 characters) and /api/images/search/{client_id} (50 images):
+
+- before: FastAPI's default JSONResponse, response_model / return-annotation
+  validation, no compression
+- after:  routes return FastJSONResponse (orjson, no re-validation) behind
+  CompressionMiddleware
+
+Requests are driven straight through the ASGI interface. Reports the
+serialization time alone, the mean/p50 request time, and the bytes on the
+wire for identity, gzip and (when the brotli package is installed) br.
+"""
+
+import argparse
+import asyncio
+import json
+import pathlib
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+current_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.middleware import CompressionMiddleware, brotli
+from app.models.schemas import RAGResult, RAGSearchRequest
+from app.services.json_response import ORJSON_AVAILABLE, FastJSONResponse
+
+WORDS = (
+    "brand voice warm artisanal heritage campaign subscribers email flow product launch "
+    "seasonal holiday promotion discount loyal customers cheese creamery handcrafted story "
+    "open rate click through segment audience cadence subject line preview text hero image"
+).split()
+
+
+def prose(rng: random.Random, chars: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)[:chars]
+
+
+def search_results(rng: random.Random) -> List[RAGResult]:
+    return [
+        RAGResult(
+            content=prose(rng, 2000),
+            metadata={
+                "client_id": "rogue-creamery",
+                "category": rng.choice(["brand_voice", "product_spec", "past_campaign"]),
+                "source": f"doc_{i}.pdf",
+                "title": prose(rng, 40),
+                "tags": ["q4", "email"],
+            },
+            relevance_score=round(rng.random(), 3),
+        )
+        for i in range(20)
+    ]
+
+
+def image_results(rng: random.Random) -> Dict[str, Any]:
+    images = [
+        {
+            "doc_id": f"img-{i:04d}",
+            "title": prose(rng, 40),
+            "description": prose(rng, 200),
+            "mood": "warm",
+            "setting": "kitchen",
+            "visual_tags": rng.sample(WORDS, 8),
+            "dominant_colors": ["#f4e1c1", "#7a4b2a", "#ffffff"],
+            "drive_link": f"https://drive.google.com/file/d/{i:020d}/view",
+            "thumbnail_link": f"/api/images/thumbnail/{i:020d}",
+            "marketing_use_case": prose(rng, 80),
+            "text_chunk": prose(rng, 300) + "...",
+        }
+        for i in range(50)
+    ]
+    return {"client_id": "rogue-creamery", "query": "holiday", "total": len(images), "images": images}
+
+
+def before_app(results: List[RAGResult], images: Dict[str, Any]) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/rag/search", response_model=List[RAGResult])
+    async def search(request: RAGSearchRequest):
+        return results
+
+    @app.get("/api/images/search/{client_id}")
+    async def search_images(client_id: str, q: str) -> Dict[str, Any]:
+        return images
+
+    return app
+
+
+def after_app(results: List[RAGResult], images: Dict[str, Any]) -> FastAPI:
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware)
+
+    @app.post("/api/rag/search", response_model=List[RAGResult])
+    async def search(request: RAGSearchRequest):
+        return FastJSONResponse(results)
+
+    @app.get("/api/images/search/{client_id}")
+    async def search_images(client_id: str, q: str) -> Dict[str, Any]:
+        return FastJSONResponse(images)
+
+    return app
+
+
+SEARCH_BODY = json.dumps({"query": "brand voice", "client_id": "rogue-creamery", "phase": "BRIEF", "k": 20}).encode()
+ROUTES = {
+    "/api/rag/search": ("POST", "/api/rag/search", b"", SEARCH_BODY),
+    "/api/images/search/{client_id}": ("GET", "/api/images/search/rogue-creamery", b"q=holiday", b""),
+}
+
+
+async def call(app: FastAPI, route: str, encoding: str):
+    """One request through the ASGI app; returns (seconds, body bytes on the wire)."""
+    method, path, query, body = ROUTES[route]
+    headers = [(b"host", b"bench"), (b"content-type", b"application/json")]
+    if encoding != "identity":
+        headers.append((b"accept-encoding", encoding.encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": query,
+        "headers": headers, "client": ("127.0.0.1", 1234), "server": ("bench", 80),
+    }
+    received = bytearray()
+    request_sent = False
+    done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            received.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start, len(received)
+
+
+async def measure(app: FastAPI, route: str, encoding: str, requests: int):
+    for _ in range(50):  # warm up
+        await call(app, route, encoding)
+    samples = [await call(app, route, encoding) for _ in range(requests)]
+    latencies = sorted(seconds for seconds, _ in samples)
+    return statistics.mean(latencies), latencies[len(latencies) // 2], samples[-1][1]
+
+
+def serialization_us(encode, rounds: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        encode()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    results, images = search_results(rng), image_results(rng)
+    results_adapter = TypeAdapter(List[RAGResult])
+    dict_adapter = TypeAdapter(Dict[str, Any])
+
+    print(f"orjson: {'yes' if ORJSON_AVAILABLE else 'no (stdlib json fallback)'}, "
+          f"brotli: {'yes' if brotli is not None else 'no (gzip only)'}\n")
+
+    print("Serialization only (us per payload)")
+    print(f"  rag search    validate + pydantic dump_json (before) "
+          f"{serialization_us(lambda: results_adapter.dump_json(results_adapter.validate_python(results))):8.1f}")
+    print(f"                FastJSONResponse.render (after)         "
+          f"{serialization_us(lambda: FastJSONResponse(results).body):8.1f}")
+    print(f"  image search  validate + pydantic dump_json (before) "
+          f"{serialization_us(lambda: dict_adapter.dump_json(dict_adapter.validate_python(images))):8.1f}")
+    print(f"                FastJSONResponse.render (after)         "
+          f"{serialization_us(lambda: FastJSONResponse(images).body):8.1f}")
+    print(f"  (untyped dict route: jsonable_encoder + json.dumps    "
+          f"{serialization_us(lambda: json.dumps(jsonable_encoder(images)).encode(), 200):8.1f})")
+
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    print("\nEnd to end through ASGI")
+    for route in ROUTES:
+        print(f"  {route}")
+        for name, factory in (("before", before_app), ("after", after_app)):
+            app = factory(results, images)
+            for encoding in (["identity"] if name == "before" else encodings):
+                mean, p50, size = asyncio.run(measure(app, route, encoding, args.requests))
+                print(f"    {name:<6} {encoding:<8} mean {mean * 1e6:7.1f} us  p50 {p50 * 1e6:7.1f} us  "
+                      f"{size:>7} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@ import json
 import sys
 import os
 import pathlib
-import time
 
 # Add the parent directory to sys.path to allow importing from app
 current_dir = pathlib.Path(__file__).parent.resolve()
@@ -47,7 +46,10 @@ def ingest():
         
     total = len(lines)
     print(f"Found {total} records to ingest.")
-    
+
+    # Group records per client so each client is written with bulk ImportDocuments
+    # batches instead of one CreateDocument RPC per record.
+    documents_by_client = {}
     for i, line in enumerate(lines):
         if not line.strip():
             continue
@@ -55,41 +57,27 @@ def ingest():
         try:
             record = json.loads(line)
             
-            # Map JSONL fields to create_document args
+            # Map JSONL fields to document fields
             client_id = record.get("client_id")
             content = record.get("text_chunk")
             title = record.get("title")
             category = record.get("category", "general")
             source = record.get("source")
-            doc_id_override = record.get("id") # The script generates IDs, but we can rely on content hash if needed, 
-                                             # OR we could modify create_document to accept an ID. 
-                                             # checking vertex_search.py: create_document generates its own ID based on content hash.
-                                             # Let's rely on that for now to avoid modifying the service code, 
-                                             # unless we really need the exact ID from the jsonl.
+            # Document IDs are {client_id}-{md5[:8]} of the source and the content (document_id_for),
+            # matching the API upload path
             
             if not client_id or not content:
                 print(f"Skipping record {i}: Missing client_id or content")
                 continue
 
-            print(f"[{i+1}/{total}] Ingesting: {title} ({client_id})...")
-            
-            # Note: create_document writes to: projects/.../branches/default_branch/documents/
-            result = engine.create_document(
+            documents_by_client.setdefault(client_id, []).append(engine.build_document(
                 client_id=client_id,
                 content=content,
-                title=title,
+                title=title or f"{client_id} - {category}",
                 category=category,
-                source=source
-            )
-            
-            if result.get("success"):
-                success_count += 1
-            else:
-                print(f"Failed to ingest record {i}: {result.get('error')}")
-                error_count += 1
-                
-            # Rate limiting to be safe
-            time.sleep(0.1)
+                source=source,
+                normalized_tags=engine._normalize_tags(record.get("tags"))
+            ))
 
         except json.JSONDecodeError:
             print(f"Skipping line {i}: Invalid JSON")
@@ -98,6 +86,23 @@ def ingest():
             print(f"Error processing line {i}: {e}")
             error_count += 1
 
+    for client_id, documents in documents_by_client.items():
+        print(f"Ingesting {len(documents)} records for {client_id}...")
+        try:
+            outcome = engine.write_documents(client_id, documents)
+        except Exception as e:
+            print(f"Failed to ingest records for {client_id}: {e}")
+            error_count += len(documents)
+            continue
+
+        success_count += len(outcome["document_ids"])
+        error_count += len(outcome["errors"])
+        for doc_id, message in outcome["errors"].items():
+            print(f"Failed to ingest {doc_id}: {message}")
+        for operation in outcome["operations"]:
+            print(f"  Operation {operation.get('name', '-')}: "
+                  f"{operation.get('success_count', 0)} ok, {operation.get('failure_count', 0)} failed")
+
     print(f"\nIngestion Complete.")
     print(f"Success: {success_count}")
     print(f"Errors: {error_count}")
@@ -0,0 +1,100 @@
+"""
+Profile the cold-start import cost of each pipeline router.
+
+Usage:
+    python scripts/profile_pipeline_imports.py [--top 8] [--budget-seconds 2.5]
+
+Each pipeline's api/routes.py is imported in a fresh interpreter with
+`-X importtime`, after FastAPI and the loader itself are already imported,
+so the numbers are what that pipeline adds to a cold start. Prints wall
+time, module count and the top-level packages that cost the most. With
+--budget-seconds the script exits non-zero when any pipeline is over budget.
+
+The running service reports the same wall-time numbers (as measured in
+process, in load order) at GET /api/pipelines/status.
+"""
+
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+
+current_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.append(str(current_dir.parent))
+
+from app.services.pipeline_routers import PIPELINES
+
+MARKER = "--- pipeline import starts ---"
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+from app.services.pipeline_routers import PIPELINES, import_pipeline_router
+spec = next(s for s in PIPELINES if s.name == {name!r})
+before = set(sys.modules)
+print({marker!r}, file=sys.stderr, flush=True)
+start = time.perf_counter()
+error = None
+try:
+    import_pipeline_router(spec)
+except Exception as e:
+    error = str(e)
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "modules": len(set(sys.modules) - before),
+    "error": error,
+}}))
+"""
+
+
+def profile(name: str):
+    child = CHILD.format(root=str(current_dir.parent), name=name, marker=MARKER)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", child],
+        capture_output=True, text=True, cwd=current_dir.parent
+    )
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+
+    # "import time: self [us] | cumulative | imported package", after the marker
+    packages = {}
+    seen_marker = False
+    for line in result.stderr.splitlines():
+        if line.strip() == MARKER:
+            seen_marker = True
+            continue
+        if not seen_marker or not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0) + int(fields[0])
+    summary["packages"] = sorted(packages.items(), key=lambda kv: -kv[1])
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=8, help="packages listed per pipeline")
+    parser.add_argument("--budget-seconds", type=float, default=None)
+    args = parser.parse_args()
+
+    over_budget = []
+    for spec in PIPELINES:
+        summary = profile(spec.name)
+        status = f"FAILED: {summary['error']}" if summary["error"] else "ok"
+        print(f"\n{spec.name} ({spec.prefix}): {summary['seconds']:.2f}s, "
+              f"{summary['modules']} modules, {status}")
+        for package, micros in summary["packages"][:args.top]:
+            print(f"    {package:<32} {micros / 1e6:6.3f}s")
+        if args.budget_seconds is not None and summary["seconds"] > args.budget_seconds:
+            over_budget.append(spec.name)
+
+    if over_budget:
+        print(f"\nOver the {args.budget_seconds:.2f}s budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
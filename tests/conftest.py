@@ -0,0 +1,135 @@
+"""
+Shared fixtures: a VertexContextEngine wired to in-memory fakes of the
+Discovery Engine search and document service clients.
+"""
+
+from types import SimpleNamespace
+from typing import Dict, List
+from unittest import mock
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from app.services import vertex_search
+from app.services.document_catalog import DocumentCatalog
+from app.services.search_cache import SearchResultCache
+
+
+class _Operation:
+    """Completed long-running operation as returned by import/purge_documents."""
+
+    def __init__(self, name: str, response, metadata):
+        self.operation = SimpleNamespace(name=name)
+        self.metadata = metadata
+        self._response = response
+
+    def result(self, timeout=None):
+        return self._response
+
+
+class FakeDocumentServiceClient:
+    """In-memory document store speaking the DocumentServiceClient calls the engine makes."""
+
+    def __init__(self, *args, **kwargs):
+        self.documents: Dict[str, object] = {}
+        self.calls: List[str] = []
+
+    def _store(self, document):
+        self.documents[document.name.split("/")[-1]] = document
+
+    def create_document(self, request):
+        self.calls.append("create_document")
+        request.document.name = f"{request.parent}/documents/{request.document_id}"
+        self._store(request.document)
+        return request.document
+
+    def update_document(self, request):
+        self.calls.append("update_document")
+        self._store(request.document)
+        return request.document
+
+    def get_document(self, request):
+        self.calls.append("get_document")
+        doc_id = request.name.split("/")[-1]
+        if doc_id not in self.documents:
+            raise google_exceptions.NotFound(request.name)
+        return self.documents[doc_id]
+
+    def delete_document(self, request):
+        self.calls.append("delete_document")
+        doc_id = request.name.split("/")[-1]
+        if self.documents.pop(doc_id, None) is None:
+            raise google_exceptions.NotFound(request.name)
+
+    def list_documents(self, request):
+        self.calls.append("list_documents")
+        return list(self.documents.values())
+
+    def import_documents(self, request):
+        self.calls.append("import_documents")
+        batch = list(request.inline_source.documents)
+        for document in batch:
+            document.name = f"{request.parent}/documents/{document.id}"
+            self._store(document)
+        return _Operation(
+            "operations/import",
+            SimpleNamespace(error_samples=[]),
+            SimpleNamespace(success_count=len(batch), failure_count=0),
+        )
+
+    def purge_documents(self, request):
+        self.calls.append("purge_documents")
+        names = list(request.inline_source.documents)
+        assert names, "purge without inline names would wipe the data store"
+        purged = sum(self.documents.pop(name.split("/")[-1], None) is not None for name in names)
+        return _Operation(
+            "operations/purge",
+            SimpleNamespace(purge_count=purged),
+            SimpleNamespace(failure_count=0),
+        )
+
+
+class FakeSearchServiceClient:
+    """Answers every search with the stored documents of the filtered client."""
+
+    def __init__(self, *args, **kwargs):
+        self.documents: Dict[str, object] = {}
+        self.searches = 0
+
+    @staticmethod
+    def serving_config_path(project, location, data_store, serving_config):
+        return f"projects/{project}/locations/{location}/dataStores/{data_store}/servingConfigs/{serving_config}"
+
+    def search(self, request):
+        self.searches += 1
+        client_id = request.filter.split('"')[1]
+        return SimpleNamespace(results=[
+            SimpleNamespace(document=document)
+            for document in self.documents.values()
+            if dict(document.struct_data).get("client_id") == client_id
+        ])
+
+
+@pytest.fixture
+def fake_store():
+    return FakeDocumentServiceClient()
+
+
+@pytest.fixture
+def engine(tmp_path, fake_store):
+    """VertexContextEngine over the fakes, with a fresh catalog and search cache."""
+    search_client = FakeSearchServiceClient()
+    # Searches see whatever the document service holds
+    search_client.documents = fake_store.documents
+    with mock.patch.object(vertex_search.discoveryengine, "DocumentServiceClient", return_value=fake_store), \
+            mock.patch.object(vertex_search.discoveryengine, "SearchServiceClient", return_value=search_client):
+        engine = vertex_search.VertexContextEngine(
+            project_id="test-project",
+            location="us",
+            data_store_id="test-store",
+            catalog=DocumentCatalog(path=tmp_path / "catalog.json", persist_delay_seconds=60),
+            search_cache=SearchResultCache(),
+        )
+    engine.fake_search = search_client
+    yield engine
+    engine.catalog.persist()
@@ -0,0 +1,96 @@
+"""Chunking engine: lossless, bounded, incremental and edit-local."""
+
+import random
+
+import pytest
+
+from app.services.chunking import IncrementalChunker, iter_chunks
+
+WORDS = "brand voice customer email campaign launch product offer seasonal loyalty audience tone".split()
+MAX = 400
+MIN = 50
+
+
+def _prose(seed=7, paragraphs=60):
+    rng = random.Random(seed)
+
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))).capitalize() + rng.choice(".!?")
+
+    return "\n\n".join(" ".join(sentence() for _ in range(rng.randint(1, 12))) for _ in range(paragraphs))
+
+
+def _csv(rows=2000):
+    return "".join(f"{i},sku-{i},{WORDS[i % len(WORDS)]},{i % 97}.99\n" for i in range(rows))
+
+
+def _long_paragraph(words=5000):
+    rng = random.Random(3)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+SHAPES = {"prose": _prose(), "csv": _csv(), "paragraph": _long_paragraph()}
+
+
+def _chunks(text, content_defined):
+    return list(iter_chunks(text, MIN, MAX, overlap=0, content_defined=content_defined))
+
+
+def _squash(text):
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("content_defined", [False, True])
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_chunks_join_back_to_the_text(shape, content_defined):
+    text = SHAPES[shape]
+
+    assert _squash("".join(_chunks(text, content_defined))) == _squash(text)
+
+
+@pytest.mark.parametrize("content_defined", [False, True])
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_no_chunk_exceeds_max_size(shape, content_defined):
+    # A short fragment may be carried into the next chunk (see module docstring)
+    assert max(len(chunk) for chunk in _chunks(SHAPES[shape], content_defined)) <= MAX + MIN
+
+
+@pytest.mark.parametrize("content_defined", [False, True])
+def test_unpunctuated_runs_are_cut_at_max_size(content_defined):
+    for shape in ("csv", "paragraph"):
+        assert max(len(chunk) for chunk in _chunks(SHAPES[shape], content_defined)) <= MAX
+
+
+@pytest.mark.parametrize("piece_size", [1, 7, 64, 1000])
+@pytest.mark.parametrize("content_defined", [False, True])
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_incremental_feed_matches_whole_text(shape, content_defined, piece_size):
+    text = SHAPES[shape]
+    chunker = IncrementalChunker(MIN, MAX, overlap=0, content_defined=content_defined)
+    fed = []
+    for start in range(0, len(text), piece_size):
+        fed.extend(chunker.feed(text[start:start + piece_size]))
+    fed.extend(chunker.finish())
+
+    assert fed == _chunks(text, content_defined)
+
+
+def test_paragraph_edit_only_changes_nearby_chunks():
+    paragraphs = _prose(seed=11, paragraphs=120).split("\n\n")
+    edited = list(paragraphs)
+    edited[60] = "An entirely rewritten paragraph about the spring launch."
+
+    before = _chunks("\n\n".join(paragraphs), content_defined=True)
+    after = _chunks("\n\n".join(edited), content_defined=True)
+
+    prefix = next(i for i, (a, b) in enumerate(zip(before, after)) if a != b)
+    suffix = next(i for i, (a, b) in enumerate(zip(reversed(before), reversed(after))) if a != b)
+    # Everything outside a small window around the edit chunks exactly as before
+    assert len(before) - prefix - suffix <= 5
+    assert len(after) - prefix - suffix <= 5
+    assert prefix > len(before) // 3 and suffix > len(before) // 3
+
+
+def test_overlap_must_leave_room():
+    with pytest.raises(ValueError):
+        IncrementalChunker(MIN, MAX, overlap=MAX // 2)
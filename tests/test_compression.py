@@ -0,0 +1,100 @@
+"""CompressionMiddleware and the orjson-backed JSON responses."""
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import middleware
+from app.middleware import CompressionMiddleware, negotiate_encoding
+from app.models.schemas import RAGResult
+from app.services.json_response import FastJSONResponse, ndjson_line
+
+LARGE = {"documents": [{"id": f"doc-{i}", "content": "x" * 50} for i in range(100)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return FastJSONResponse(LARGE)
+
+    @app.get("/small")
+    async def small():
+        return FastJSONResponse({"ok": True})
+
+    @app.get("/image")
+    async def image():
+        return PlainTextResponse("x" * 1000, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        lines = (ndjson_line({"n": i, "pad": "y" * 40}) for i in range(50))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    return TestClient(app)
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+    assert response.json() == LARGE
+
+
+def test_small_and_binary_bodies_pass_through(client):
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    image = client.get("/image", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["vary"]
+    assert "content-encoding" not in image.headers
+    assert "vary" not in image.headers
+
+
+def test_identity_client_gets_the_plain_body(client):
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+
+def test_streamed_ndjson_is_compressed_line_for_line(client):
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line)["n"] for line in lines] == list(range(50))
+
+
+def test_negotiation_respects_q_values(monkeypatch):
+    monkeypatch.setattr(middleware, "brotli", None)
+
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, deflate") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding("identity") is None
+
+
+def test_fast_json_renders_models_and_datetimes():
+    content = {
+        "results": [RAGResult(content="hello", metadata={"client_id": "acme"}, score=0.5)],
+        "at": datetime(2024, 1, 2, 3, 4, 5),
+        "tags": {"brand"},
+    }
+
+    rendered = json.loads(FastJSONResponse(content).body)
+
+    assert rendered["results"][0]["content"] == "hello"
+    assert rendered["at"].startswith("2024-01-02T03:04:05")
+    assert rendered["tags"] == ["brand"]
+    assert ndjson_line({"a": 1}).endswith(b"\n")
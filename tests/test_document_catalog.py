@@ -0,0 +1,81 @@
+"""DocumentCatalog: persistence, reconcile against the store, versions and staleness."""
+
+import threading
+
+from app.services.document_catalog import DocumentCatalog
+
+
+def _seed(engine, count, client_id="acme"):
+    chunks = [f"Document body {i:02d}" for i in range(count)]
+    engine.import_documents(client_id, chunks, "Doc", category="product", source="seed.txt")
+
+
+def test_catalog_survives_a_restart(engine, tmp_path):
+    engine.reconcile_catalog()
+    _seed(engine, 3)
+    engine.catalog.persist()
+
+    reloaded = DocumentCatalog(path=tmp_path / "catalog.json", persist_delay_seconds=60)
+
+    assert reloaded.count("acme") == 3
+    assert reloaded.is_bootstrapped
+    assert {e["id"] for e in reloaded.entries("acme")} == {e["id"] for e in engine.catalog.entries("acme")}
+
+
+def test_catalog_lists_a_client_without_scanning_the_store(engine, fake_store):
+    engine.reconcile_catalog()
+    _seed(engine, 5)
+    engine.import_documents("globex", ["Other client"], "Other", source="other.txt")
+    fake_store.calls.clear()
+
+    listing = engine.list_documents("acme")
+
+    assert listing["total"] == 5
+    assert "list_documents" not in fake_store.calls
+
+
+def test_reconcile_keeps_writes_made_during_the_scan(engine, fake_store, monkeypatch):
+    _seed(engine, 2)
+    list_documents = fake_store.list_documents
+
+    def list_then_write(request):
+        scanned = list_documents(request)
+        # Lands after the scan read the store, before replace_all
+        engine.import_documents("acme", ["Written mid-scan"], "Late", source="late.txt")
+        return scanned
+    monkeypatch.setattr(fake_store, "list_documents", list_then_write)
+
+    engine.reconcile_catalog()
+
+    assert engine.catalog.count("acme") == 3
+
+
+def test_version_moves_on_writes_and_when_stale(engine):
+    engine.reconcile_catalog()
+    _seed(engine, 1)
+    before = engine.client_version("acme")
+    engine.import_documents("acme", ["Another"], "Doc", source="more.txt")
+    after = engine.client_version("acme")
+    assert before != after
+
+    engine.catalog._last_reconciled_at -= engine.catalog.max_staleness_seconds + 1
+    assert engine.catalog.is_stale
+    assert engine.client_version("acme") != after
+
+
+def test_stale_catalog_read_refreshes_in_background(engine, fake_store):
+    engine.reconcile_catalog()
+    engine.catalog._last_reconciled_at -= engine.catalog.max_staleness_seconds + 1
+    # Written by "another instance": in the store, not in this catalog
+    document, _ = engine.build_document("acme", "Elsewhere", "Remote", "product", "remote.txt", [])
+    document.name = engine.document_name(document.id)
+    fake_store.documents[document.id] = document
+
+    # Served from the stale catalog while the refresh runs
+    engine.list_documents("acme")
+    for thread in threading.enumerate():
+        if thread.name == "document-catalog-refresh":
+            thread.join(timeout=5)
+
+    assert not engine.catalog.is_stale
+    assert engine.list_documents("acme")["total"] == 1
@@ -0,0 +1,79 @@
+"""AsyncVertexContextEngine.export_documents: catalog-driven export with resumable cursors."""
+
+import asyncio
+
+import pytest
+
+from app.services import vertex_search
+from app.services.cursors import InvalidCursor, encode_cursor
+
+
+class AsyncDocumentClient:
+    """grpc.aio-style facade over the in-memory document store."""
+
+    def __init__(self, store):
+        self.store = store
+
+    async def get_document(self, request):
+        return self.store.get_document(request)
+
+
+@pytest.fixture
+def async_engine(engine, fake_store):
+    async_engine = vertex_search.AsyncVertexContextEngine(engine)
+    async_engine._doc_client = AsyncDocumentClient(fake_store)
+    engine.reconcile_catalog()
+    engine.import_documents("acme", [f"Body {i:02d}" for i in range(7)], "Doc", source="doc.txt")
+    engine.import_documents("globex", ["Other client"], "Other", source="other.txt")
+    return async_engine
+
+
+def _export(async_engine, cursor=None, batch_size=3, limit=None):
+    async def collect():
+        exported = []
+        async for document, next_cursor in async_engine.export_documents("acme", cursor, batch_size=batch_size):
+            exported.append((document, next_cursor))
+            if limit is not None and len(exported) == limit:
+                break
+        return exported
+    return asyncio.run(collect())
+
+
+def test_export_reads_only_the_clients_documents(async_engine, fake_store):
+    fake_store.calls.clear()
+
+    exported = _export(async_engine)
+
+    ids = [document["id"] for document, _ in exported]
+    assert ids == sorted(async_engine.catalog.doc_ids("acme"))
+    assert len(ids) == 7
+    assert {document["content"] for document, _ in exported} == {f"Body {i:02d}" for i in range(7)}
+    assert "list_documents" not in fake_store.calls
+    assert fake_store.calls.count("get_document") == 7
+
+
+def test_export_resumes_after_the_last_cursor(async_engine):
+    everything = [document["id"] for document, _ in _export(async_engine)]
+    first = _export(async_engine, limit=4)
+
+    rest = _export(async_engine, cursor=first[-1][1])
+
+    assert [document["id"] for document, _ in first + rest] == everything
+
+
+def test_export_skips_documents_deleted_since_the_snapshot(async_engine, fake_store):
+    doc_ids = async_engine.catalog.doc_ids("acme")
+    # Deleted behind the catalog's back
+    del fake_store.documents[doc_ids[2]]
+
+    exported = [document["id"] for document, _ in _export(async_engine)]
+
+    assert exported == doc_ids[:2] + doc_ids[3:]
+
+
+def test_export_rejects_foreign_and_old_cursors(async_engine):
+    with pytest.raises(InvalidCursor):
+        async_engine.export_position("acme", encode_cursor({"k": "export", "c": "globex", "a": "x"}))
+    with pytest.raises(InvalidCursor):
+        async_engine.export_position("acme", encode_cursor({"k": "export", "c": "acme", "t": "token", "o": 3}))
+    assert async_engine.export_position("acme", None) is None
@@ -0,0 +1,105 @@
+"""Conditional GET: ETag matching, 304s and ETags across CompressionMiddleware encodings."""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware import CompressionMiddleware
+from app.services.http_cache import etag_matches, make_etag, not_modified, set_cache_headers
+from app.services.json_response import FastJSONResponse
+
+BODY = {"documents": [{"id": f"doc-{i}", "content": "x" * 50} for i in range(100)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/strong")
+    async def strong(request: Request):
+        etag = make_etag("strong", 1)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = FastJSONResponse(BODY)
+        set_cache_headers(response, etag)
+        return response
+
+    @app.get("/weak")
+    async def weak(request: Request):
+        etag = make_etag("weak", 1, weak=True)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        response = FastJSONResponse(BODY)
+        set_cache_headers(response, etag)
+        return response
+
+    return TestClient(app)
+
+
+def test_compressed_representation_gets_its_own_strong_etag(client):
+    plain = client.get("/strong", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/strong", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert "Accept-Encoding" in gzipped.headers["vary"]
+    assert "Accept-Encoding" in plain.headers["vary"]
+    assert gzipped.json() == plain.json() == BODY
+
+
+def test_304_echoes_the_variant_the_client_holds(client):
+    gzip_etag = client.get("/strong", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+
+    revalidated = client.get("/strong", headers={"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == gzip_etag
+    assert "content-encoding" not in revalidated.headers
+
+
+def test_weak_etag_is_shared_by_all_encodings(client):
+    plain = client.get("/weak", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/weak", headers={"Accept-Encoding": "gzip"})
+
+    assert plain.headers["etag"].startswith('W/"')
+    assert gzipped.headers["etag"] == plain.headers["etag"]
+    revalidated = client.get("/weak", headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]})
+    assert revalidated.status_code == 304
+
+
+def test_changed_etag_returns_the_body(client):
+    response = client.get("/strong", headers={"If-None-Match": make_etag("strong", 0)})
+
+    assert response.status_code == 200
+    assert response.json() == BODY
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("*", True),
+    ('"other", "abc"', True),
+    ('W/"abc"', True),
+    ('"abc-gzip"', True),
+    ('"abc-deflate"', False),
+    ('"abcd"', False),
+])
+def test_if_none_match_uses_weak_comparison(header, matches):
+    assert etag_matches(_request(header), '"abc"') is matches
+
+
+def test_catalog_version_etag_changes_only_on_writes(engine):
+    engine.reconcile_catalog()
+    engine.import_documents("acme", ["First"], "Doc", source="a.txt")
+    etag = make_etag("documents", "acme", engine.client_version("acme"), weak=True)
+
+    assert etag_matches(_request(etag), make_etag("documents", "acme", engine.client_version("acme"), weak=True))
+    engine.import_documents("globex", ["Other"], "Doc", source="b.txt")
+    assert etag_matches(_request(etag), make_etag("documents", "acme", engine.client_version("acme"), weak=True))
+    engine.import_documents("acme", ["Second"], "Doc", source="c.txt")
+    assert not etag_matches(_request(etag), make_etag("documents", "acme", engine.client_version("acme"), weak=True))
@@ -0,0 +1,135 @@
+"""VertexContextEngine.replace_documents: diffing a re-upload against the stored chunks."""
+
+from app.services import vertex_search
+
+CLIENT = "acme"
+SOURCE = "brand-guide.pdf"
+
+
+def _replace(engine, chunks, **kwargs):
+    kwargs.setdefault("category", "brand_voice")
+    return engine.replace_documents(CLIENT, chunks, "Brand Guide", source=SOURCE, **kwargs)
+
+
+def _writes(store):
+    return [call for call in store.calls if call in ("create_document", "update_document", "import_documents")]
+
+
+def test_first_replace_writes_every_chunk(engine, fake_store):
+    result = _replace(engine, ["alpha", "beta", "gamma"])
+
+    assert result["success"]
+    assert result["documents_created"] == 3
+    assert result["documents_unchanged"] == 0
+    assert result["documents_deleted"] == 0
+    assert set(fake_store.documents) == set(result["document_ids"])
+    assert engine.catalog.count(CLIENT) == 3
+
+
+def test_replace_writes_changed_skips_unchanged_and_deletes_removed(engine, fake_store):
+    first = _replace(engine, ["alpha", "beta", "gamma"])
+    alpha, beta, gamma = first["document_ids"]
+    fake_store.calls.clear()
+
+    result = _replace(engine, ["alpha", "beta edited", "gamma"])
+
+    assert result["success"]
+    assert result["documents_unchanged"] == 2
+    assert result["documents_created"] == 1
+    assert result["documents_deleted"] == 1
+    edited = engine.document_id_for(CLIENT, "beta edited", SOURCE)
+    assert result["written_document_ids"] == [edited]
+    assert result["document_ids"] == [alpha, edited, gamma]
+    assert result["stale_document_ids"] is None
+    assert set(fake_store.documents) == {alpha, edited, gamma}
+    assert beta not in {entry["id"] for entry in engine.catalog.entries(CLIENT)}
+    # One write for the edited chunk; the fresh catalog is trusted for the rest
+    assert _writes(fake_store) == ["update_document"]
+    assert "get_document" not in fake_store.calls
+
+
+def test_replace_rewrites_recategorized_chunks(engine, fake_store):
+    _replace(engine, ["alpha", "beta"])
+
+    result = _replace(engine, ["alpha", "beta"], category="product")
+
+    assert result["documents_created"] == 2
+    assert result["documents_unchanged"] == 0
+    assert {entry["category"] for entry in engine.catalog.entries(CLIENT)} == {"product"}
+
+
+def test_replace_writes_chunk_missing_from_store_despite_catalog(engine, fake_store):
+    first = _replace(engine, ["alpha", "beta"])
+    alpha = first["document_ids"][0]
+    # Deleted behind the catalog's back (e.g. by another instance), which a
+    # stale catalog may not have caught up with
+    del fake_store.documents[alpha]
+    engine.catalog._last_reconciled_at -= engine.catalog.max_staleness_seconds + 1
+
+    result = _replace(engine, ["alpha", "beta"])
+
+    assert result["documents_unchanged"] == 1
+    assert alpha in result["written_document_ids"]
+    assert alpha in fake_store.documents
+
+
+def test_replace_keeps_stale_chunks_when_a_write_fails(engine, fake_store, monkeypatch):
+    first = _replace(engine, ["alpha", "beta"])
+    beta = first["document_ids"][1]
+
+    def failing_update(request):
+        raise RuntimeError("write rejected")
+    monkeypatch.setattr(fake_store, "update_document", failing_update)
+
+    result = _replace(engine, ["alpha", "beta edited"])
+
+    assert result["documents_deleted"] == 0
+    assert beta in fake_store.documents
+    assert result["stale_document_ids"] == [beta]
+    assert result["failed_document_ids"] == [engine.document_id_for(CLIENT, "beta edited", SOURCE)]
+
+
+def test_replace_bulk_deletes_removed_chunks_with_inline_purge(engine, fake_store):
+    chunks = [f"chunk {i}" for i in range(12)]
+    _replace(engine, chunks)
+    fake_store.calls.clear()
+
+    result = _replace(engine, chunks[:2])
+
+    assert result["documents_deleted"] == 10
+    assert result["documents_unchanged"] == 2
+    assert "purge_documents" in fake_store.calls
+    assert len(fake_store.documents) == 2
+
+
+def test_replace_other_source_is_untouched(engine, fake_store):
+    other = engine.replace_documents(CLIENT, ["alpha"], "Other", category="brand_voice", source="other.pdf")
+    _replace(engine, ["alpha", "beta"])
+
+    _replace(engine, ["beta"])
+
+    assert other["document_ids"][0] in fake_store.documents
+
+
+def test_unchanged_ids_verifies_fresh_catalog_when_always(engine, fake_store, monkeypatch):
+    monkeypatch.setattr(vertex_search, "REPLACE_VERIFY_UNCHANGED", "always")
+    first = _replace(engine, ["alpha", "beta"])
+    alpha = first["document_ids"][0]
+    del fake_store.documents[alpha]
+
+    result = _replace(engine, ["alpha", "beta"])
+
+    assert alpha in result["written_document_ids"]
+    assert alpha in fake_store.documents
+
+
+def test_unchanged_ids_never_verifies_stale_catalog_when_never(engine, fake_store, monkeypatch):
+    monkeypatch.setattr(vertex_search, "REPLACE_VERIFY_UNCHANGED", "never")
+    _replace(engine, ["alpha"])
+    engine.catalog._last_reconciled_at -= engine.catalog.max_staleness_seconds + 1
+    fake_store.calls.clear()
+
+    result = _replace(engine, ["alpha"])
+
+    assert result["documents_unchanged"] == 1
+    assert "get_document" not in fake_store.calls
@@ -0,0 +1,85 @@
+"""Search result cache: hits for repeated searches, invalidation on writes."""
+
+from app.models.schemas import RAGResult, RAGSearchRequest
+from app.services.search_cache import SearchResultCache
+
+
+def _search(engine, client_id, query="brand voice"):
+    return engine.search(RAGSearchRequest(query=query, client_id=client_id))
+
+
+def test_repeated_search_is_served_from_cache(engine):
+    engine.create_document("acme", "Our voice is warm.", category="brand_voice")
+
+    first = _search(engine, "acme")
+    second = _search(engine, "acme", query="  Brand   VOICE ")
+
+    assert engine.fake_search.searches == 1
+    assert [r.content for r in second] == [r.content for r in first]
+
+
+def test_write_invalidates_only_that_clients_results(engine):
+    engine.create_document("acme", "Our voice is warm.", category="brand_voice")
+    engine.create_document("globex", "Globex sells widgets.", category="product")
+    _search(engine, "acme")
+    _search(engine, "globex")
+
+    engine.import_documents("acme", ["New guideline."], "Guide", category="brand_voice")
+    acme = _search(engine, "acme")
+    _search(engine, "globex")
+
+    # acme searched again, globex still cached
+    assert engine.fake_search.searches == 3
+    assert "New guideline." in {r.content for r in acme}
+
+
+def test_delete_and_replace_invalidate(engine):
+    created = engine.create_document("acme", "Old text.", category="brand_voice")
+    _search(engine, "acme")
+
+    engine.delete_document(created["document_id"], "acme")
+    assert _search(engine, "acme") == []
+    assert engine.fake_search.searches == 2
+
+    engine.replace_documents("acme", ["Fresh text."], "Doc", category="brand_voice", source="doc.txt")
+    assert [r.content for r in _search(engine, "acme")] == ["Fresh text."]
+    assert engine.fake_search.searches == 3
+
+
+def test_use_cache_false_bypasses(engine):
+    _search(engine, "acme")
+    engine.search(RAGSearchRequest(query="brand voice", client_id="acme"), use_cache=False)
+
+    assert engine.fake_search.searches == 2
+    assert engine.search_cache.stats()["bypasses"] == 1
+
+
+def test_same_query_is_cached_per_client(engine):
+    engine.create_document("acme", "Acme voice.", category="brand_voice")
+    engine.create_document("globex", "Globex voice.", category="brand_voice")
+
+    acme = _search(engine, "acme")
+    globex = _search(engine, "globex")
+
+    assert engine.fake_search.searches == 2
+    assert {r.content for r in acme}.isdisjoint({r.content for r in globex})
+
+
+def test_result_computed_before_a_write_is_never_served_after_it():
+    cache = SearchResultCache(maxsize=8, ttl_seconds=60)
+    request = RAGSearchRequest(query="brand voice", client_id="acme")
+    # A search starts, the client writes, then the search stores its result
+    key = cache.key_for(request)
+    cache.invalidate_client("acme")
+    cache.set(key, [RAGResult(content="stale", metadata={}, score=1.0)])
+
+    assert cache.get(cache.key_for(request)) is None
+
+
+def test_cache_is_bounded():
+    cache = SearchResultCache(maxsize=2, ttl_seconds=60)
+    for query in ("one", "two", "three"):
+        cache.set(cache.key_for(RAGSearchRequest(query=query, client_id="acme")), [])
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get(cache.key_for(RAGSearchRequest(query="one", client_id="acme"))) is None